@@ -0,0 +1,249 @@
+"""
+Benchmark de los flujos principales (comando bench).
+
+Cada iteración recorre los flujos elegidos a través de las vistas reales,
+con el cliente de pruebas de Django:
+
+- ventas: crear venta (POST ventas_form) -> confirmarla -> listado
+- compras: crear compra confirmada (POST compra_crear)
+- transferencias: primera página AJAX de movimientos de stock
+- dashboard: dashboard de informes
+- estadisticas: JSON combinado de la home (home_stats)
+
+Por cada request se mide la duración y las consultas (rendimiento.medir)
+y el resultado se resume por vista: requests/seg, p50/p95/p99 y consultas
+por request. Con varios hilos cada uno usa su propio cliente y su propia
+conexión a la base.
+
+    datos = crear_escenario(escala=1)
+    resultado = ejecutar(datos, iteraciones=50, hilos=4)
+    resultado.resumen()    # dict listo para json.dump
+"""
+import platform
+import subprocess
+import threading
+import time
+from collections import defaultdict
+
+import django
+from django.conf import settings
+from django.db import connection, connections
+from django.test import Client
+from django.urls import resolve, reverse
+
+from gestionVentas.models import Venta
+
+from .rendimiento import medir, percentil
+
+FLUJOS = ('ventas', 'compras', 'transferencias', 'dashboard', 'estadisticas')
+
+
+class Muestra:
+    __slots__ = ('vista', 'duracion_ms', 'consultas', 'ok')
+
+    def __init__(self, vista, duracion_ms, consultas, ok):
+        self.vista = vista
+        self.duracion_ms = duracion_ms
+        self.consultas = consultas
+        self.ok = ok
+
+
+# -------------------------
+# FLUJOS
+# -------------------------
+class Sesion:
+    """Un cliente logueado que recorre los flujos y acumula las muestras."""
+
+    def __init__(self, datos, numero=0):
+        self.datos = datos
+        self.numero = numero
+        self.muestras = []
+        self.client = Client()
+        self.client.force_login(datos.usuario)
+
+    def _request(self, vista, metodo, url, esperado, **kwargs):
+        with medir() as medicion:
+            response = getattr(self.client, metodo)(url, **kwargs)
+        self.muestras.append(Muestra(
+            vista, medicion.duracion_ms, medicion.consultas, response.status_code == esperado,
+        ))
+        return response
+
+    def _producto(self, iteracion):
+        # cada hilo rota por productos distintos para no pelear siempre por la misma fila
+        productos = self.datos.productos
+        return productos[(self.numero * 7 + iteracion) % len(productos)]
+
+    def ventas(self, iteracion):
+        producto = self._producto(iteracion)
+        cliente = self.datos.clientes[iteracion % len(self.datos.clientes)]
+        response = self._request('ventas_form', 'post', reverse('ventas_crear'), 302, data={
+            'cliente': cliente.pk,
+            'metodo_pago': 'EFECTIVO',
+            'producto_0': producto.pk,
+            'cantidad_0': 1,
+            'precio_0': producto.precioUnitario,
+        })
+        if response.status_code == 302:
+            venta_id = resolve(response.url).kwargs['id']
+            self._request('venta_confirmar', 'post', reverse('venta_confirmar', args=[venta_id]), 302)
+            # la vista redirige también si falla: se verifica fuera de la medición
+            if not Venta.objects.filter(pk=venta_id, estado=Venta.ESTADO_CONFIRMADA).exists():
+                self.muestras[-1].ok = False
+        self._request('ventas_list', 'get', reverse('ventas_list'), 200)
+
+    def compras(self, iteracion):
+        producto = self._producto(iteracion)
+        proveedor = self.datos.proveedores[iteracion % len(self.datos.proveedores)]
+        self._request('compra_crear', 'post', reverse('compra_crear'), 302, data={
+            'proveedor': proveedor.pk,
+            'metodo_pago': 'TRANSFERENCIA',
+            'estado': 'CONFIRMADA',
+            'producto_0': producto.pk,
+            'cantidad_0': 2,
+            'precio_0': producto.precioUnitario,
+        })
+
+    def transferencias(self, iteracion):
+        self._request(
+            'transferencias_stock_ajax', 'get', reverse('transferencias_stock_ajax'), 200,
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+
+    def dashboard(self, iteracion):
+        self._request('dashboard_informes', 'get', reverse('gestionInformes:dashboard'), 200)
+
+    def estadisticas(self, iteracion):
+        self._request('home_stats', 'get', reverse('stats_home_combined'), 200)
+
+    def recorrer(self, flujos, iteraciones):
+        for iteracion in range(iteraciones):
+            for flujo in flujos:
+                getattr(self, flujo)(iteracion)
+
+
+# -------------------------
+# EJECUCIÓN
+# -------------------------
+class Resultado:
+    def __init__(self, muestras, duracion, hilos, iteraciones, flujos):
+        self.muestras = muestras
+        self.duracion = duracion
+        self.hilos = hilos
+        self.iteraciones = iteraciones
+        self.flujos = flujos
+
+    def por_vista(self):
+        agrupadas = defaultdict(list)
+        for muestra in self.muestras:
+            agrupadas[muestra.vista].append(muestra)
+
+        filas = {}
+        for vista, muestras in agrupadas.items():
+            duraciones = sorted(m.duracion_ms for m in muestras)
+            consultas = [m.consultas for m in muestras]
+            filas[vista] = {
+                'requests': len(muestras),
+                'errores': sum(1 for m in muestras if not m.ok),
+                # requests de esta vista por segundo de corrida (con todos los flujos mezclados)
+                'rps': round(len(muestras) / self.duracion, 2),
+                'p50_ms': round(percentil(duraciones, 50), 2),
+                'p95_ms': round(percentil(duraciones, 95), 2),
+                'p99_ms': round(percentil(duraciones, 99), 2),
+                'max_ms': round(duraciones[-1], 2),
+                'consultas_promedio': round(sum(consultas) / len(consultas), 2),
+                'consultas_max': max(consultas),
+            }
+        return filas
+
+    def resumen(self):
+        return {
+            'hilos': self.hilos,
+            'iteraciones': self.iteraciones,
+            'flujos': list(self.flujos),
+            'duracion_s': round(self.duracion, 3),
+            'requests': len(self.muestras),
+            'errores': sum(1 for m in self.muestras if not m.ok),
+            'rps': round(len(self.muestras) / self.duracion, 2),
+            'vistas': self.por_vista(),
+        }
+
+
+def ejecutar(datos, iteraciones=20, hilos=1, flujos=FLUJOS, calentamiento=1):
+    """
+    Corre `iteraciones` vueltas de `flujos` en cada hilo sobre `datos`
+    (un Escenario de fabricas). Las vueltas de calentamiento no se miden.
+    """
+    if calentamiento:
+        Sesion(datos).recorrer(flujos, calentamiento)
+
+    if hilos == 1:
+        sesiones = [Sesion(datos)]
+        inicio = time.perf_counter()
+        sesiones[0].recorrer(flujos, iteraciones)
+        duracion = time.perf_counter() - inicio
+    else:
+        sesiones = [None] * hilos
+        errores = []
+        listos = threading.Barrier(hilos + 1)
+
+        def trabajar(numero):
+            try:
+                sesiones[numero] = Sesion(datos, numero)
+                listos.wait()
+                sesiones[numero].recorrer(flujos, iteraciones)
+            except Exception as e:
+                errores.append(e)
+                listos.abort()
+            finally:
+                # cada hilo abre su propia conexión
+                connections.close_all()
+
+        threads = [threading.Thread(target=trabajar, args=(n,)) for n in range(hilos)]
+        for thread in threads:
+            thread.start()
+        try:
+            listos.wait()
+        except threading.BrokenBarrierError:
+            pass
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        duracion = time.perf_counter() - inicio
+        if errores:
+            raise errores[0]
+
+    muestras = [m for sesion in sesiones for m in sesion.muestras]
+    return Resultado(muestras, duracion, hilos, iteraciones, flujos)
+
+
+def entorno():
+    """Datos de la corrida para comparar resultados entre commits."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'base': connection.vendor,
+    }
+
+
+def comparar(anterior, actual):
+    """[(vista, {campo: (anterior, actual)})] de las vistas presentes en los dos resúmenes."""
+    filas = []
+    for vista, datos in actual['vistas'].items():
+        previo = anterior.get('vistas', {}).get(vista)
+        if not previo:
+            continue
+        filas.append((vista, {
+            campo: (previo[campo], datos[campo])
+            for campo in ('rps', 'p50_ms', 'p95_ms', 'consultas_promedio')
+        }))
+    return filas
@@ -0,0 +1,271 @@
+"""
+Búsqueda de texto en productos, clientes y proveedores.
+
+    productos = buscar(Productos.objects.filter(activo=True), 'mouse logi')
+
+- SQLite: cada modelo tiene una tabla virtual FTS5 de contenido externo
+  (ej. gestionProductos_productos_fts) que unos triggers mantienen
+  sincronizada con la tabla original, también ante bulk_create() o
+  update(). La relevancia es bm25 con un peso por columna.
+- PostgreSQL: to_tsvector / ts_rank sobre las mismas columnas y pesos.
+- Cualquier otro caso (o SQLite sin FTS5): icontains por columna.
+
+Cada palabra del texto se busca como prefijo y deben aparecer todas
+("mou logi" encuentra "Mouse Logitech").
+"""
+import re
+
+from django.apps import apps
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+class Indice:
+    """Columnas indexadas de un modelo con su peso (A > B > C > D, como en PostgreSQL)."""
+
+    PESOS_BM25 = {'A': 10.0, 'B': 5.0, 'C': 2.0, 'D': 1.0}
+
+    def __init__(self, modelo, campos):
+        self.modelo = modelo
+        self.campos = campos
+
+    @property
+    def model(self):
+        return apps.get_model(self.modelo)
+
+    @property
+    def tabla_origen(self):
+        return self.model._meta.db_table
+
+    @property
+    def tabla(self):
+        return f"{self.tabla_origen}_fts"
+
+    @property
+    def columnas(self):
+        return [self.model._meta.get_field(campo).column for campo, _ in self.campos]
+
+    @property
+    def pesos_bm25(self):
+        return [self.PESOS_BM25[peso] for _, peso in self.campos]
+
+
+INDICES = {
+    indice.modelo: indice
+    for indice in (
+        Indice('gestionProductos.Productos', (
+            ('codProducto', 'A'), ('nombre', 'B'), ('descripcion', 'D'),
+        )),
+        Indice('gestionClientes.Cliente', (
+            ('dni', 'A'), ('nombre', 'B'), ('apellido', 'B'), ('email', 'C'),
+        )),
+        Indice('gestionProveedores.Proveedor', (
+            ('razon_social', 'A'), ('cuit', 'A'), ('nombre', 'C'), ('apellido', 'C'), ('email', 'C'),
+        )),
+    )
+}
+
+
+def _terminos(texto):
+    return re.findall(r'\w+', texto or '')
+
+
+# -------------------------
+# BÚSQUEDA
+# -------------------------
+def buscar(queryset, texto, ordenar=True):
+    """
+    Filtra `queryset` por `texto`. Con ordenar=True ordena por relevancia
+    (anotada como `relevancia`, mayor es mejor); con ordenar=False conserva
+    el orden del queryset, útil para listados paginados por cursor.
+    """
+    terminos = _terminos(texto)
+    if not terminos:
+        return queryset
+
+    indice = INDICES[queryset.model._meta.label]
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite' and _tabla_fts_existe(connection, indice.tabla):
+        return _buscar_fts5(queryset, indice, terminos, ordenar)
+    if connection.vendor == 'postgresql':
+        return _buscar_postgres(queryset, indice, terminos, ordenar)
+    return _buscar_icontains(queryset, indice, terminos)
+
+
+def _buscar_fts5(queryset, indice, terminos, ordenar):
+    consulta = ' '.join(f'"{termino}"*' for termino in terminos)
+    queryset = queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM "{indice.tabla}" WHERE "{indice.tabla}" MATCH %s', [consulta]
+    ))
+    if not ordenar:
+        return queryset
+
+    opts = queryset.model._meta
+    pesos = ', '.join(map(str, indice.pesos_bm25))
+    # bm25 es negativo y menor cuanto más relevante: se invierte el signo
+    return queryset.annotate(relevancia=RawSQL(
+        f'SELECT -bm25("{indice.tabla}", {pesos}) FROM "{indice.tabla}" '
+        f'WHERE "{indice.tabla}" MATCH %s AND rowid = "{opts.db_table}"."{opts.pk.column}"',
+        [consulta],
+    )).order_by('-relevancia', 'pk')
+
+
+def _buscar_postgres(queryset, indice, terminos, ordenar):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    vector = SearchVector(*[
+        SearchVector(campo, weight=peso, config='simple') for campo, peso in indice.campos
+    ])
+    consulta = SearchQuery(
+        ' & '.join(f"{termino}:*" for termino in terminos), search_type='raw', config='simple'
+    )
+    queryset = queryset.annotate(documento_busqueda=vector).filter(documento_busqueda=consulta)
+    if not ordenar:
+        return queryset
+    return queryset.annotate(
+        relevancia=SearchRank(vector, consulta)
+    ).order_by('-relevancia', 'pk')
+
+
+def _buscar_icontains(queryset, indice, terminos):
+    for termino in terminos:
+        condicion = Q()
+        for campo, _ in indice.campos:
+            condicion |= Q(**{f"{campo}__icontains": termino})
+        queryset = queryset.filter(condicion)
+    return queryset
+
+
+# -------------------------
+# TABLAS FTS5 (SQLite)
+# -------------------------
+_tablas_fts = {}
+
+
+def _tabla_fts_existe(connection, tabla):
+    clave = (connection.alias, tabla)
+    if clave not in _tablas_fts:
+        _tablas_fts[clave] = tabla in connection.introspection.table_names()
+    return _tablas_fts[clave]
+
+
+def fts5_disponible(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(opcion == 'ENABLE_FTS5' for opcion, in cursor.fetchall())
+
+
+def _sql_triggers(indice):
+    origen, tabla = indice.tabla_origen, indice.tabla
+    pk = indice.model._meta.pk.column
+    columnas = ', '.join(f'"{c}"' for c in indice.columnas)
+    nuevos = ', '.join(f'new."{c}"' for c in indice.columnas)
+    viejos = ', '.join(f'old."{c}"' for c in indice.columnas)
+    borrar = (
+        f'INSERT INTO "{tabla}"("{tabla}", rowid, {columnas}) '
+        f'VALUES (\'delete\', old."{pk}", {viejos});'
+    )
+    insertar = f'INSERT INTO "{tabla}"(rowid, {columnas}) VALUES (new."{pk}", {nuevos});'
+    return {
+        f"{tabla}_ai": f'AFTER INSERT ON "{origen}" BEGIN {insertar} END',
+        f"{tabla}_ad": f'AFTER DELETE ON "{origen}" BEGIN {borrar} END',
+        f"{tabla}_au": f'AFTER UPDATE OF {columnas} ON "{origen}" BEGIN {borrar} {insertar} END',
+    }
+
+
+def crear_indice(connection, modelo):
+    """
+    Crea la tabla FTS5 de `modelo` ('app.Modelo') según la definición
+    actual y los triggers que falten, y reconstruye el índice si hubo que
+    crear algo. Es idempotente. Las migraciones no la usan: tienen su SQL
+    congelado (ver migracion_fts5).
+    """
+    if not fts5_disponible(connection):
+        return False
+    indice = INDICES[modelo]
+    _tablas_fts.pop((connection.alias, indice.tabla), None)
+    if indice.tabla in connection.introspection.table_names():
+        return reparar_triggers(connection, modelo)
+
+    columnas = ', '.join(f'"{c}"' for c in indice.columnas)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE "{indice.tabla}" USING fts5({columnas}, '
+            f'content=\'{indice.tabla_origen}\', '
+            f'content_rowid=\'{indice.model._meta.pk.column}\', '
+            f'tokenize=\'unicode61 remove_diacritics 2\')'
+        )
+    reparar_triggers(connection, modelo)
+    return True
+
+
+def reparar_triggers(connection, modelo):
+    """
+    Crea los triggers que falten de la tabla FTS5 existente de `modelo` y,
+    si creó alguno, reconstruye el índice. Hace falta después de las
+    migraciones: al alterar una tabla SQLite Django la recrea y los
+    triggers se pierden con la vieja.
+    """
+    indice = INDICES[modelo]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            [f"{indice.tabla}%"],
+        )
+        existentes = {nombre for nombre, in cursor.fetchall()}
+        faltantes = {
+            nombre: cuerpo for nombre, cuerpo in _sql_triggers(indice).items()
+            if nombre not in existentes
+        }
+        if not faltantes:
+            return False
+        for nombre, cuerpo in faltantes.items():
+            cursor.execute(f'CREATE TRIGGER "{nombre}" {cuerpo}')
+        cursor.execute(f'INSERT INTO "{indice.tabla}"("{indice.tabla}") VALUES (\'rebuild\')')
+    return True
+
+
+def borrar_indice(connection, modelo):
+    if connection.vendor != 'sqlite':
+        return
+    indice = INDICES[modelo]
+    _tablas_fts.pop((connection.alias, indice.tabla), None)
+    with connection.cursor() as cursor:
+        for nombre in _sql_triggers(indice):
+            cursor.execute(f'DROP TRIGGER IF EXISTS "{nombre}"')
+        cursor.execute(f'DROP TABLE IF EXISTS "{indice.tabla}"')
+
+
+def migracion_fts5(sql, sql_reverso):
+    """
+    Operación de migración que ejecuta las sentencias `sql` (al revertir,
+    `sql_reverso`) solo en SQLite con FTS5; en otras bases no hace nada.
+    Las sentencias se escriben literales en cada migración, así no
+    dependen de cómo estén definidos los modelos al momento de aplicarla.
+    """
+    from django.db import migrations
+
+    def ejecutar(sentencias):
+        def operacion(apps, schema_editor):
+            if not fts5_disponible(schema_editor.connection):
+                return
+            _tablas_fts.clear()
+            for sentencia in sentencias:
+                schema_editor.execute(sentencia, params=None)
+        return operacion
+
+    return migrations.RunPython(ejecutar(sql), ejecutar(sql_reverso))
+
+
+def reparar_indices(sender, using, **kwargs):
+    """Receptor de post_migrate: recrea los triggers que una migración haya borrado."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    tablas = connection.introspection.table_names()
+    for modelo, indice in INDICES.items():
+        if indice.tabla in tablas:
+            reparar_triggers(connection, modelo)
@@ -0,0 +1,159 @@
+"""
+Exportación de listados a CSV (o XLSX) sin cargar el queryset en memoria.
+
+Las filas llegan como un iterable (normalmente
+`queryset.values_list(...).iterator(chunk_size=...)`) y se escriben a
+medida que se leen:
+
+- CSV: StreamingHttpResponse; el encabezado sale antes de ejecutar la
+  consulta, así el primer byte llega enseguida y la memoria no crece con
+  la cantidad de filas.
+- XLSX (si openpyxl está instalado): hoja write_only volcada a un archivo
+  temporal en disco; el archivo se envía al terminar de escribirlo.
+
+Las vistas pasan una función `generar(parametros)` que arma
+(encabezados, filas) a partir de los filtros, y no las filas: así la misma
+exportación puede escribirse más tarde a un archivo desde una tarea en
+segundo plano (gestionTareas.tareas.exportar_o_encolar).
+"""
+import csv
+import datetime
+import decimal
+import tempfile
+
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .fechas import FechaInvalida
+
+CHUNK_SIZE = 2000
+
+FORMATO_CSV = 'csv'
+FORMATO_XLSX = 'xlsx'
+FORMATOS = (FORMATO_CSV, FORMATO_XLSX)
+
+# Excel y LibreOffice toman como fórmula un texto que empieza así
+INICIOS_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+class ExportacionInvalida(ValueError):
+    pass
+
+
+class _Eco:
+    """Objeto tipo archivo que devuelve lo escrito en lugar de guardarlo."""
+
+    def write(self, valor):
+        return valor
+
+
+def _valor(valor):
+    if isinstance(valor, datetime.datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.localtime(valor)
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    if isinstance(valor, decimal.Decimal):
+        return str(valor)
+    if valor is None:
+        return ''
+    if isinstance(valor, str) and valor.startswith(INICIOS_FORMULA):
+        # texto cargado por usuarios (nombres, observaciones): se exporta como texto
+        return "'" + valor
+    return valor
+
+
+def nombre_archivo(nombre, extension):
+    return f"{nombre}_{timezone.localdate():%Y%m%d}.{extension}"
+
+
+def respuesta_csv(nombre, encabezados, filas):
+    escritor = csv.writer(_Eco())
+
+    def generar():
+        # BOM para que Excel abra el archivo como UTF-8
+        yield '\ufeff' + escritor.writerow(encabezados)
+        # se envían bloques de filas y no una por una: menos escrituras al socket
+        bloque = []
+        for fila in filas:
+            bloque.append(escritor.writerow([_valor(v) for v in fila]))
+            if len(bloque) >= CHUNK_SIZE:
+                yield ''.join(bloque)
+                bloque = []
+        if bloque:
+            yield ''.join(bloque)
+
+    response = StreamingHttpResponse(generar(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo(nombre, "csv")}"'
+    return response
+
+
+def escribir_csv(archivo, encabezados, filas):
+    """Escribe en un archivo de texto abierto con newline=''."""
+    escritor = csv.writer(archivo)
+    archivo.write('\ufeff')
+    escritor.writerow(encabezados)
+    for fila in filas:
+        escritor.writerow([_valor(v) for v in fila])
+
+
+def escribir_xlsx(archivo, nombre, encabezados, filas):
+    """Escribe en un archivo binario (ruta o abierto); requiere openpyxl."""
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(nombre[:31])
+    hoja.append(list(encabezados))
+    for fila in filas:
+        hoja.append([_valor(v) for v in fila])
+    libro.save(archivo)
+
+
+def respuesta_xlsx(nombre, encabezados, filas):
+    archivo = tempfile.TemporaryFile()
+    escribir_xlsx(archivo, nombre, encabezados, filas)
+    archivo.seek(0)
+    return FileResponse(
+        archivo,
+        as_attachment=True,
+        filename=nombre_archivo(nombre, 'xlsx'),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+def leer_pedido(parametros, generar):
+    """
+    Quita `formato` de `parametros` (los filtros del GET) y devuelve
+    (formato, encabezados, filas). Lanza ExportacionInvalida si el formato
+    o los filtros no son válidos; las filas se leen recién al iterarlas.
+    """
+    formato = parametros.pop('formato', FORMATO_CSV)
+    if formato not in FORMATOS:
+        raise ExportacionInvalida(f'Formato no soportado: {formato}')
+    try:
+        encabezados, filas = generar(parametros)
+    except FechaInvalida as e:
+        raise ExportacionInvalida(str(e))
+    return formato, encabezados, filas
+
+
+def exportar(request, nombre, generar):
+    """
+    Responde en el formato pedido con ?formato=csv|xlsx (CSV por defecto).
+    `generar(parametros)` devuelve (encabezados, filas) para los filtros
+    del GET.
+    """
+    try:
+        formato, encabezados, filas = leer_pedido(request.GET.dict(), generar)
+    except ExportacionInvalida as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    if formato == FORMATO_XLSX:
+        try:
+            return respuesta_xlsx(nombre, encabezados, filas)
+        except ImportError:
+            return JsonResponse(
+                {'error': 'La exportación a XLSX requiere openpyxl'}, status=400
+            )
+    return respuesta_csv(nombre, encabezados, filas)
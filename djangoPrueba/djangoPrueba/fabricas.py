@@ -0,0 +1,191 @@
+"""
+Datos de prueba realistas armados con bulk_create.
+
+    datos = crear_escenario(escala=1)
+    datos.usuario, datos.productos[0], datos.ventas[-1], ...
+
+La escala multiplica la cantidad de filas de cada tabla (escala=1: 30
+productos, 200 ventas; escala=10: 300 productos, 2000 ventas). Los tests
+de cantidad de consultas corren con las dos escalas y esperan los mismos
+números: una consulta por fila se nota enseguida.
+"""
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+
+from gestionClientes.models import Cliente
+from gestionCompras.models import Compra, DetalleCompra
+from gestionInformes.resumenes import reconstruir, reconstruir_contadores
+from gestionProductos.historial import registrar
+from gestionProductos.models import ActualizacionPrecios, Categoria, Marca, MovimientoStock, Productos
+from gestionProveedores.models import ProductoProveedor, Proveedor
+from gestionUsuarios.models import Rol, Usuario
+from gestionVentas.models import DetalleVenta, Venta
+
+ESTADOS = ('PENDIENTE', 'CONFIRMADA', 'CANCELADA')
+METODOS_PAGO = ('EFECTIVO', 'TARJETA', 'TRANSFERENCIA', 'MERCADOPAGO')
+IVAS = (Decimal('21.00'), Decimal('10.50'), Decimal('27.00'), Decimal('0.00'))
+
+# filas por unidad de escala
+CANTIDADES = {
+    'marcas': 5,
+    'categorias': 5,
+    'productos': 30,
+    'proveedores': 6,
+    'clientes': 25,
+    'ventas': 200,
+    'compras': 40,
+    'lineas': 2,  # detalles por venta o compra
+}
+
+
+class Escenario:
+    def __init__(self, escala):
+        self.escala = escala
+
+    def cantidad(self, tabla):
+        return CANTIDADES[tabla] * self.escala
+
+
+def crear_escenario(escala=1):
+    datos = Escenario(escala)
+    _crear_usuarios(datos)
+    _crear_catalogo(datos)
+    _crear_terceros(datos)
+    _crear_ventas(datos)
+    _crear_compras(datos)
+    # tablas derivadas que normalmente mantienen las signals
+    reconstruir()
+    reconstruir_contadores()
+    return datos
+
+
+def _crear_usuarios(datos):
+    datos.roles = Rol.objects.bulk_create([
+        Rol(nombre='Administrador', descripcion='Acceso total'),
+        Rol(nombre='Vendedor', descripcion='Ventas y clientes'),
+    ])
+    datos.usuario = User.objects.create_user(
+        'admin', 'admin@example.com', 'clave', is_staff=True, is_superuser=True
+    )
+    vendedores = User.objects.bulk_create([
+        User(username=f'vendedor{i}', email=f'vendedor{i}@example.com') for i in range(3)
+    ])
+    datos.perfiles = Usuario.objects.bulk_create([
+        Usuario(user=user, rol=datos.roles[i % 2])
+        for i, user in enumerate([datos.usuario, *vendedores])
+    ])
+    datos.perfil = datos.perfiles[0]
+
+
+def _crear_catalogo(datos):
+    datos.marcas = Marca.objects.bulk_create([
+        Marca(nombre=f'Marca {i}') for i in range(datos.cantidad('marcas'))
+    ])
+    datos.categorias = Categoria.objects.bulk_create([
+        Categoria(descripcion=f'Categoría {i}') for i in range(datos.cantidad('categorias'))
+    ])
+    datos.productos = Productos.objects.bulk_create([
+        Productos(
+            codProducto=f'P{i:05d}',
+            nombre=f'Producto {i}',
+            descripcion=f'Descripción del producto {i}',
+            precioUnitario=Decimal(100 + i * 7 % 900) + Decimal('0.50'),
+            idMarca=datos.marcas[i % len(datos.marcas)],
+            idCategoria=datos.categorias[i % len(datos.categorias)],
+            iva=IVAS[i % len(IVAS)],
+            stock=500,
+            activo=i % 10 != 0,
+        )
+        for i in range(datos.cantidad('productos'))
+    ])
+    lote = ActualizacionPrecios.objects.create(descripcion='Alta de prueba')
+    registrar(Productos.objects.all(), lote.fecha, lote)
+
+
+def _crear_terceros(datos):
+    datos.proveedores = Proveedor.objects.bulk_create([
+        Proveedor(
+            nombre=f'Nombre {i}', apellido=f'Apellido {i}', razon_social=f'Proveedor {i} SA',
+            cuit=f'30-{10000000 + i}-1', telefono=f'11{i:08d}', email=f'proveedor{i}@example.com',
+        )
+        for i in range(datos.cantidad('proveedores'))
+    ])
+    ProductoProveedor.objects.bulk_create([
+        ProductoProveedor(producto=producto, proveedor=datos.proveedores[i % len(datos.proveedores)])
+        for i, producto in enumerate(datos.productos)
+    ])
+    datos.clientes = Cliente.objects.bulk_create([
+        Cliente(
+            nombre=f'Nombre {i}', apellido=f'Apellido {i}', dni=f'{20000000 + i}',
+            email=f'cliente{i}@example.com', telefono=f'11{i:08d}',
+        )
+        for i in range(datos.cantidad('clientes'))
+    ])
+
+
+def _lineas(datos, indice):
+    for j in range(CANTIDADES['lineas']):
+        yield datos.productos[(indice * CANTIDADES['lineas'] + j) % len(datos.productos)], j + 1
+
+
+def _crear_ventas(datos):
+    ventas = [
+        Venta(
+            cliente=datos.clientes[i % len(datos.clientes)],
+            usuario=datos.perfiles[i % len(datos.perfiles)],
+            metodo_pago=METODOS_PAGO[i % len(METODOS_PAGO)],
+            estado=ESTADOS[i % len(ESTADOS)],
+        )
+        for i in range(datos.cantidad('ventas'))
+    ]
+    detalles = []
+    for i, venta in enumerate(ventas):
+        lineas = []
+        for producto, cantidad in _lineas(datos, i):
+            detalle = DetalleVenta(venta=venta, producto=producto, cantidad=cantidad)
+            detalle.calcular_importes()
+            lineas.append(detalle)
+        venta.total = sum(d.subtotal for d in lineas)
+        venta.iva_total = sum(d.iva_monto for d in lineas)
+        venta.total_con_iva = sum(d.subtotal_con_iva for d in lineas)
+        detalles.extend(lineas)
+
+    datos.ventas = Venta.objects.bulk_create(ventas)
+    DetalleVenta.objects.bulk_create(detalles)
+    MovimientoStock.objects.bulk_create([
+        MovimientoStock.desde_detalle_venta(detalle)
+        for detalle in detalles if detalle.venta.estado == 'CONFIRMADA'
+    ])
+
+
+def _crear_compras(datos):
+    compras = [
+        Compra(
+            proveedor=datos.proveedores[i % len(datos.proveedores)],
+            metodo_pago=METODOS_PAGO[i % len(METODOS_PAGO)],
+            estado=ESTADOS[i % len(ESTADOS)],
+        )
+        for i in range(datos.cantidad('compras'))
+    ]
+    detalles = []
+    for i, compra in enumerate(compras):
+        lineas = []
+        for producto, cantidad in _lineas(datos, i):
+            detalle = DetalleCompra(
+                compra=compra, producto=producto, cantidad=cantidad * 10,
+                precio_unitario=(producto.precioUnitario * Decimal('0.6')).quantize(Decimal('0.01')),
+            )
+            detalle.calcular_importes()
+            lineas.append(detalle)
+        compra.total = sum(d.subtotal for d in lineas)
+        compra.iva_total = sum(d.iva_monto for d in lineas)
+        compra.total_con_iva = sum(d.subtotal_con_iva for d in lineas)
+        detalles.extend(lineas)
+
+    datos.compras = Compra.objects.bulk_create(compras)
+    DetalleCompra.objects.bulk_create(detalles)
+    MovimientoStock.objects.bulk_create([
+        MovimientoStock.desde_detalle_compra(detalle)
+        for detalle in detalles if detalle.compra.estado == 'CONFIRMADA'
+    ])
@@ -0,0 +1,94 @@
+"""
+Rangos de fechas para filtrar campos DateTimeField.
+
+Los filtros del tipo `fecha__date__gte` envuelven la columna en una función
+y la base no puede usar el índice. Acá cada día se convierte en límites
+datetime aware, en la zona horaria actual, con un intervalo semiabierto
+[inicio, fin): `fecha >= inicio AND fecha < fin`.
+"""
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+class FechaInvalida(ValueError):
+    pass
+
+
+def parsear_fecha(valor):
+    """'AAAA-MM-DD' → date. Vacío → None. Cualquier otra cosa → FechaInvalida."""
+    if not valor:
+        return None
+    if isinstance(valor, datetime.datetime):
+        return valor.date()
+    if isinstance(valor, datetime.date):
+        return valor
+    try:
+        fecha = parse_date(valor)
+    except ValueError:
+        fecha = None
+    if fecha is None:
+        raise FechaInvalida(f"Fecha inválida: {valor}")
+    return fecha
+
+
+def inicio_del_dia(fecha):
+    """Medianoche (aware, zona horaria actual) del día dado."""
+    return timezone.make_aware(datetime.datetime.combine(fecha, datetime.time.min))
+
+
+def rango_mes(dt):
+    """Devuelve (primer día del mes, primer día del mes siguiente) como datetime aware."""
+    inicio = inicio_del_dia(dt.date().replace(day=1))
+    if dt.month == 12:
+        return inicio, inicio_del_dia(datetime.date(dt.year + 1, 1, 1))
+    return inicio, inicio_del_dia(datetime.date(dt.year, dt.month + 1, 1))
+
+
+class RangoFechas:
+    """
+    Rango de días [desde, hasta], ambos inclusive y opcionales.
+
+    - inicio / fin: límites datetime del intervalo semiabierto [inicio, fin).
+    - filtrar(queryset, campo): aplica el rango sobre un DateTimeField.
+    - filtrar_dias(queryset, campo): aplica el rango sobre un DateField.
+    """
+
+    def __init__(self, desde=None, hasta=None):
+        self.desde = parsear_fecha(desde)
+        self.hasta = parsear_fecha(hasta)
+        if self.desde and self.hasta and self.desde > self.hasta:
+            raise FechaInvalida('La fecha desde no puede ser mayor que la fecha hasta')
+
+    @classmethod
+    def desde_request(cls, params, param_desde='fecha_desde', param_hasta='fecha_hasta'):
+        return cls(params.get(param_desde, ''), params.get(param_hasta, ''))
+
+    def __bool__(self):
+        return bool(self.desde or self.hasta)
+
+    def __repr__(self):
+        return f"RangoFechas({self.desde}, {self.hasta})"
+
+    @property
+    def inicio(self):
+        return inicio_del_dia(self.desde) if self.desde else None
+
+    @property
+    def fin(self):
+        return inicio_del_dia(self.hasta + datetime.timedelta(days=1)) if self.hasta else None
+
+    def filtrar(self, queryset, campo):
+        if self.desde:
+            queryset = queryset.filter(**{f"{campo}__gte": self.inicio})
+        if self.hasta:
+            queryset = queryset.filter(**{f"{campo}__lt": self.fin})
+        return queryset
+
+    def filtrar_dias(self, queryset, campo):
+        if self.desde:
+            queryset = queryset.filter(**{f"{campo}__gte": self.desde})
+        if self.hasta:
+            queryset = queryset.filter(**{f"{campo}__lte": self.hasta})
+        return queryset
@@ -0,0 +1,26 @@
+"""
+Cálculo de importes de las líneas de venta y de compra.
+
+Todos los montos se redondean a 2 decimales con ROUND_HALF_UP en el
+mismo lugar, así una venta y una compra con la misma cantidad y precio
+guardan el mismo subtotal.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+CENTAVO = Decimal('0.01')
+
+
+def redondear(valor):
+    return Decimal(valor).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+def calcular_subtotal(cantidad, precio_unitario):
+    if not cantidad or not precio_unitario:
+        return Decimal('0.00')
+    return redondear(Decimal(cantidad) * Decimal(precio_unitario))
+
+
+def calcular_iva(base, porcentaje):
+    """(iva_monto, subtotal_con_iva) de un subtotal con el porcentaje de IVA dado."""
+    iva_monto = redondear(base * Decimal(str(porcentaje or 0)) / Decimal('100'))
+    return iva_monto, redondear(base + iva_monto)
@@ -0,0 +1,175 @@
+"""
+Paginación por cursor (keyset) para los listados.
+
+En lugar de COUNT(*) + OFFSET, cada página se pide a partir de la clave
+de orden de la última fila vista, por ejemplo (fecha_venta, idVenta).
+El último campo del orden debe ser único (la PK) para desempatar.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def _serializar(valor):
+    # isoformat completo: el cursor necesita los microsegundos para comparar por igualdad
+    if isinstance(valor, (datetime.datetime, datetime.date)):
+        return valor.isoformat()
+    if isinstance(valor, decimal.Decimal):
+        return str(valor)
+    raise TypeError(f"Tipo no soportado en cursor: {type(valor).__name__}")
+
+
+class PaginaCursor:
+    """Página devuelta por CursorPaginator (se itera como una lista)."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return self.paginator.codificar(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return self.paginator.codificar(self.object_list[0])
+        return None
+
+    @property
+    def count(self):
+        return self.paginator.count
+
+
+class CursorPaginator:
+    """
+    Pagina un queryset por cursor.
+
+    - ordering: campos de orden, ej. ('-fecha_venta', '-idVenta').
+    - contar: si es True, `count` devuelve el total exacto; si es False,
+      `count` es None y no se ejecuta ningún COUNT.
+    - clave_version: función sin argumentos que devuelve la versión de los
+      datos (ej. la generación del modelo, que cambia al guardar o borrar).
+      Con ella el total se cachea bajo esa versión; sin ella no se cachea.
+    """
+
+    SIGUIENTE = 'siguiente'
+    ANTERIOR = 'anterior'
+
+    def __init__(self, queryset, ordering, per_page=10, contar=False, clave_version=None,
+                 cache_timeout=60):
+        self.queryset = queryset
+        self.ordering = [
+            (campo.lstrip('-'), campo.startswith('-')) for campo in ordering
+        ]
+        self.per_page = per_page
+        self.contar = contar
+        self.clave_version = clave_version
+        self.cache_timeout = cache_timeout
+
+    # -------------------------
+    # TOKENS
+    # -------------------------
+    def codificar(self, obj):
+        valores = [getattr(obj, campo) for campo, _ in self.ordering]
+        crudo = json.dumps(valores, default=_serializar, separators=(',', ':'))
+        return base64.urlsafe_b64encode(crudo.encode()).decode()
+
+    def decodificar(self, token):
+        try:
+            valores = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            raise CursorInvalido('Cursor inválido')
+        if not isinstance(valores, list) or len(valores) != len(self.ordering):
+            raise CursorInvalido('Cursor inválido')
+        return valores
+
+    # -------------------------
+    # CONSULTAS
+    # -------------------------
+    @cached_property
+    def count(self):
+        if not self.contar:
+            return None
+        if self.clave_version is None:
+            return self.queryset.count()
+        sql, params = self.queryset.query.sql_with_params()
+        version = self.clave_version()
+        clave = 'paginacion:count:' + hashlib.md5(f"{sql}|{params!r}|{version}".encode()).hexdigest()
+        total = cache.get(clave)
+        if total is None:
+            total = self.queryset.count()
+            cache.set(clave, total, self.cache_timeout)
+        return total
+
+    def _filtro_desde(self, valores, hacia_atras):
+        """Q para las filas posteriores (o anteriores) a la clave dada."""
+        filtro = Q()
+        for i, (campo, desc) in enumerate(self.ordering):
+            lookup = 'lt' if desc != hacia_atras else 'gt'
+            condicion = Q(**{f"{campo}__{lookup}": valores[i]})
+            for j in range(i):
+                condicion &= Q(**{self.ordering[j][0]: valores[j]})
+            filtro |= condicion
+        return filtro
+
+    def _orden(self, hacia_atras):
+        return [
+            f"{'-' if desc != hacia_atras else ''}{campo}" for campo, desc in self.ordering
+        ]
+
+    def page(self, cursor=None, direccion=SIGUIENTE):
+        """Devuelve la página siguiente (o anterior) al cursor. Sin cursor: la primera."""
+        valores = self.decodificar(cursor) if cursor else None
+        hacia_atras = valores is not None and direccion == self.ANTERIOR
+
+        queryset = self.queryset
+        if valores is not None:
+            try:
+                queryset = queryset.filter(self._filtro_desde(valores, hacia_atras))
+            except (ValueError, TypeError, ValidationError):
+                raise CursorInvalido('Cursor inválido')
+        queryset = queryset.order_by(*self._orden(hacia_atras))
+
+        filas = list(queryset[:self.per_page + 1])
+        hay_mas = len(filas) > self.per_page
+        filas = filas[:self.per_page]
+
+        if hacia_atras:
+            filas.reverse()
+            return PaginaCursor(filas, self, has_next=True, has_previous=hay_mas)
+        return PaginaCursor(filas, self, has_next=hay_mas, has_previous=valores is not None)
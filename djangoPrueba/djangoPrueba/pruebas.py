@@ -0,0 +1,72 @@
+"""
+Utilidades compartidas por los tests de las apps.
+"""
+import re
+
+from django import test
+from django.core.cache import cache
+from django.db import connection
+
+from .fabricas import crear_escenario
+
+
+class TestCase(test.TestCase):
+    """Base de los tests de las apps: cada test empieza con la caché vacía."""
+
+    def setUp(self):
+        super().setUp()
+        # los tests revierten la base pero no la caché: un total o una
+        # estadística cacheada por otro test no debe verse en este
+        cache.clear()
+
+
+class PlanConsultaMixin:
+    """
+    Asserts sobre el plan de ejecución (EXPLAIN QUERY PLAN de SQLite).
+    Sirven para que un cambio en una consulta o en los índices que la haga
+    volver a recorrer toda la tabla rompa un test.
+    """
+
+    def plan(self, queryset):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Los planes esperados están escritos para SQLite.')
+        return queryset.explain()
+
+    def assertUsaIndice(self, queryset, indice):
+        plan = self.plan(queryset)
+        self.assertRegex(plan, rf'USING (COVERING )?INDEX {indice}\b', f"Plan sin {indice}:\n{plan}")
+        self.assertNoRecorreTabla(queryset, plan)
+
+    def assertNoRecorreTabla(self, queryset, plan=None):
+        plan = plan or self.plan(queryset)
+        tabla = re.escape(queryset.model._meta.db_table)
+        self.assertNotRegex(plan, rf'SCAN {tabla}(?!\w| USING)', f"Recorrido completo:\n{plan}")
+
+
+class ConsultasVistasMixin:
+    """
+    Tests de cantidad de consultas por vista sobre los datos de fabricas.
+
+    Cada clase se corre con escala=1 y con una subclase con escala=10 que
+    espera los mismos números: si una vista hace una consulta por fila, el
+    test con más datos falla. Los números incluyen las consultas de sesión
+    y usuario del login.
+    """
+    escala = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_escenario(cls.escala)
+
+    def setUp(self):
+        # TestCase vacía la caché: las estadísticas cacheadas ocultarían sus consultas
+        super().setUp()
+        self.client.force_login(self.datos.usuario)
+
+    def assertConsultas(self, cantidad, url, **extra):
+        with self.assertNumQueries(cantidad):
+            response = self.client.get(url, **extra)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return response
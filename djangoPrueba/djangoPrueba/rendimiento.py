@@ -0,0 +1,231 @@
+"""
+Medición de consultas SQL y tiempos por request.
+
+    with medir() as medicion:
+        ...
+    medicion.consultas, medicion.tiempo_db_ms, medicion.consulta_mas_lenta
+
+RendimientoMiddleware mide una muestra de los requests (ver
+settings.RENDIMIENTO) y por cada uno:
+
+- agrega la cabecera Server-Timing (visible en las herramientas de
+  desarrollo del navegador): tiempo total, tiempo en la base y consulta
+  más lenta;
+- escribe una línea JSON en un log rotativo;
+
+y la vista /stats/perf/ resume ese log con p50/p95 por nombre de URL.
+
+Costo: los requests fuera de la muestra solo pagan un random(); en los
+medidos, dos perf_counter() por consulta. No se guarda el texto de cada
+consulta, solo el de la más lenta.
+"""
+import json
+import logging
+import math
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+LARGO_MAXIMO_SQL = 500
+
+CONFIGURACION = {
+    'MUESTREO': 1.0,
+    'CABECERA': True,
+    'LOG': None,
+    'LOG_MAX_BYTES': 5 * 1024 * 1024,
+    'LOG_BACKUPS': 3,
+}
+
+
+def configuracion():
+    return {**CONFIGURACION, **getattr(settings, 'RENDIMIENTO', {})}
+
+
+# -------------------------
+# MEDICIÓN
+# -------------------------
+class Medicion:
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_db = 0.0
+        self.consulta_mas_lenta = None
+        self.tiempo_mas_lenta = 0.0
+        self._inicio = time.perf_counter()
+        self._fin = None
+
+    @property
+    def duracion_ms(self):
+        fin = self._fin if self._fin is not None else time.perf_counter()
+        return (fin - self._inicio) * 1000
+
+    @property
+    def tiempo_db_ms(self):
+        return self.tiempo_db * 1000
+
+    @property
+    def tiempo_mas_lenta_ms(self):
+        return self.tiempo_mas_lenta * 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper de Django: se llama en lugar de cursor.execute
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.consultas += 1
+            self.tiempo_db += duracion
+            if duracion > self.tiempo_mas_lenta:
+                self.tiempo_mas_lenta = duracion
+                self.consulta_mas_lenta = sql
+
+    def terminar(self):
+        self._fin = time.perf_counter()
+
+
+@contextmanager
+def medir():
+    """Cuenta consultas y tiempo en la base (todas las conexiones) dentro del bloque."""
+    medicion = Medicion()
+    with ExitStack() as pila:
+        for connection in connections.all():
+            pila.enter_context(connection.execute_wrapper(medicion))
+        try:
+            yield medicion
+        finally:
+            medicion.terminar()
+
+
+def server_timing(medicion):
+    partes = [
+        f'total;dur={medicion.duracion_ms:.1f}',
+        f'db;dur={medicion.tiempo_db_ms:.1f};desc="{medicion.consultas} consultas"',
+    ]
+    if medicion.consulta_mas_lenta:
+        partes.append(f'sql-max;dur={medicion.tiempo_mas_lenta_ms:.1f}')
+    return ', '.join(partes)
+
+
+# -------------------------
+# LOG
+# -------------------------
+_loggers = {}
+
+
+def logger():
+    """Logger con un RotatingFileHandler sobre RENDIMIENTO['LOG'] (None si no hay log)."""
+    config = configuracion()
+    if not config['LOG']:
+        return None
+    ruta = Path(config['LOG'])
+    if ruta not in _loggers:
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            ruta, maxBytes=config['LOG_MAX_BYTES'], backupCount=config['LOG_BACKUPS'],
+            encoding='utf-8', delay=True,
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        nuevo = logging.getLogger(f'djangoPrueba.rendimiento.{len(_loggers)}')
+        nuevo.handlers = [handler]
+        nuevo.setLevel(logging.INFO)
+        nuevo.propagate = False
+        _loggers[ruta] = nuevo
+    return _loggers[ruta]
+
+
+def registrar(request, response, medicion):
+    log = logger()
+    if log is None:
+        return
+    match = getattr(request, 'resolver_match', None)
+    log.info(json.dumps({
+        'fecha': time.time(),
+        'vista': match.view_name if match else None,
+        'funcion': match._func_path if match else None,
+        'metodo': request.method,
+        'ruta': request.path,
+        'estado': response.status_code,
+        'duracion_ms': round(medicion.duracion_ms, 2),
+        'db_ms': round(medicion.tiempo_db_ms, 2),
+        'consultas': medicion.consultas,
+        'sql_max_ms': round(medicion.tiempo_mas_lenta_ms, 2),
+        'sql_max': (medicion.consulta_mas_lenta or '')[:LARGO_MAXIMO_SQL],
+    }, ensure_ascii=False))
+
+
+def leer_registros():
+    """Registros del log actual y de sus copias rotadas (más viejas primero)."""
+    config = configuracion()
+    if not config['LOG']:
+        return
+    ruta = Path(config['LOG'])
+    archivos = [ruta.with_name(f"{ruta.name}.{n}") for n in range(config['LOG_BACKUPS'], 0, -1)]
+    for archivo in [*archivos, ruta]:
+        if not archivo.exists():
+            continue
+        with open(archivo, encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    yield json.loads(linea)
+                except ValueError:
+                    # línea cortada por una rotación o escritura concurrente
+                    continue
+
+
+# -------------------------
+# RESUMEN
+# -------------------------
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not valores_ordenados:
+        return None
+    rango = math.ceil(p / 100 * len(valores_ordenados))
+    return valores_ordenados[max(rango, 1) - 1]
+
+
+def resumen_por_vista(registros):
+    """Cantidad y p50/p95 de duración, tiempo en la base y consultas por nombre de URL."""
+    por_vista = {}
+    for registro in registros:
+        datos = por_vista.setdefault(registro.get('vista') or '(sin ruta)', {
+            'duracion_ms': [], 'db_ms': [], 'consultas': [],
+        })
+        for campo, valores in datos.items():
+            valores.append(registro.get(campo) or 0)
+
+    filas = []
+    for vista, datos in por_vista.items():
+        fila = {'vista': vista, 'requests': len(datos['consultas'])}
+        for campo, valores in datos.items():
+            valores.sort()
+            fila[f'{campo}_p50'] = percentil(valores, 50)
+            fila[f'{campo}_p95'] = percentil(valores, 95)
+        fila['consultas_max'] = datos['consultas'][-1]
+        filas.append(fila)
+    return sorted(filas, key=lambda fila: fila['duracion_ms_p95'], reverse=True)
+
+
+# -------------------------
+# MIDDLEWARE
+# -------------------------
+class RendimientoMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = configuracion()
+        if config['MUESTREO'] <= 0 or random.random() >= config['MUESTREO']:
+            return self.get_response(request)
+
+        with medir() as medicion:
+            response = self.get_response(request)
+        # en respuestas streaming se mide hasta que la vista devuelve, no el envío
+        if config['CABECERA']:
+            response['Server-Timing'] = server_timing(medicion)
+        registrar(request, response, medicion)
+        return response
@@ -0,0 +1,168 @@
+"""
+Lecturas de informes y estadísticas desde una base réplica.
+
+Con el alias BASE_REPORTES['ALIAS'] configurado en DATABASES (ver
+settings), las vistas marcadas con @lectura_reportes leen de esa base;
+todo lo demás, y todas las escrituras, van a 'default'. Sin el alias todo
+sigue yendo a 'default'.
+
+    @login_required
+    @lectura_reportes
+    def dashboard_informes(request): ...
+
+La réplica va atrasada: una copia de SQLite que actualiza el comando
+snapshot_reportes, o la replicación de Postgres. Para que quien acaba de
+escribir (ej. confirmar una venta) vea su cambio en los informes,
+LecturaPropiaMiddleware deja una cookie cuando un request escribe y,
+mientras dura (BASE_REPORTES['FIJAR_PRINCIPAL'] segundos), las lecturas
+de ese navegador van a 'default'. En código, en_principal() hace lo mismo
+para un bloque.
+"""
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+CONFIGURACION = {
+    'ALIAS': 'reporting',
+    'FIJAR_PRINCIPAL': 60,
+    'COOKIE': 'db_principal',
+}
+
+_reportes = ContextVar('replicas_reportes', default=False)
+_principal = ContextVar('replicas_principal', default=False)
+# dict {'escribio': bool} del request en curso (None fuera del middleware)
+_escrituras = ContextVar('replicas_escrituras', default=None)
+
+
+def configuracion():
+    return {**CONFIGURACION, **getattr(settings, 'BASE_REPORTES', {})}
+
+
+def alias_reportes():
+    """Alias de la réplica, o None si no está configurada."""
+    alias = configuracion()['ALIAS']
+    return alias if alias in settings.DATABASES else None
+
+
+def en_reportes():
+    """True si las lecturas del contexto actual van a la réplica."""
+    return _reportes.get() and not _principal.get() and alias_reportes() is not None
+
+
+# -------------------------
+# CONTEXTO
+# -------------------------
+@contextmanager
+def lecturas_de_reportes():
+    token = _reportes.set(True)
+    try:
+        yield
+    finally:
+        _reportes.reset(token)
+
+
+@contextmanager
+def en_principal():
+    """Lee de 'default' dentro del bloque aunque se esté en una vista de informes."""
+    token = _principal.set(True)
+    try:
+        yield
+    finally:
+        _principal.reset(token)
+
+
+def lectura_reportes(vista):
+    """Decorador de vistas de solo lectura que pueden leer de la réplica."""
+    @wraps(vista)
+    def envuelta(request, *args, **kwargs):
+        with lecturas_de_reportes():
+            return vista(request, *args, **kwargs)
+    return envuelta
+
+
+# -------------------------
+# ROUTER
+# -------------------------
+class ReportesRouter:
+    def db_for_read(self, model, **hints):
+        if en_reportes():
+            return alias_reportes()
+        return None
+
+    def db_for_write(self, model, **hints):
+        escrituras = _escrituras.get()
+        if escrituras is not None:
+            escrituras['escribio'] = True
+        # la réplica nunca recibe escrituras
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # la réplica tiene los mismos datos que 'default'
+        bases = {DEFAULT_DB_ALIAS, configuracion()['ALIAS']}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == configuracion()['ALIAS']:
+            return False
+        return None
+
+
+# -------------------------
+# MIDDLEWARE
+# -------------------------
+class LecturaPropiaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if alias_reportes() is None:
+            return self.get_response(request)
+
+        config = configuracion()
+        escrituras = {'escribio': False}
+        token_escrituras = _escrituras.set(escrituras)
+        token_principal = _principal.set(config['COOKIE'] in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            _principal.reset(token_principal)
+            _escrituras.reset(token_escrituras)
+
+        if escrituras['escribio']:
+            response.set_cookie(
+                config['COOKIE'], '1', max_age=config['FIJAR_PRINCIPAL'],
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+# -------------------------
+# COPIA DE SQLITE
+# -------------------------
+def copiar_sqlite():
+    """
+    Copia 'default' sobre la réplica con la API de backup de SQLite: una
+    copia consistente sin frenar las escrituras. Sirve para una réplica
+    SQLite que se actualiza cada tanto (comando snapshot_reportes).
+    """
+    alias = alias_reportes()
+    if alias is None:
+        raise ImproperlyConfigured(f"No hay una base '{configuracion()['ALIAS']}' configurada")
+    origen, destino = connections[DEFAULT_DB_ALIAS], connections[alias]
+    if origen.vendor != 'sqlite' or destino.vendor != 'sqlite':
+        raise ImproperlyConfigured('La copia solo aplica a bases SQLite')
+
+    origen.ensure_connection()
+    # conexión aparte: se escribe sobre el archivo que las vistas solo leen
+    copia = sqlite3.connect(destino.settings_dict['NAME'], timeout=30)
+    try:
+        origen.connection.backup(copia)
+    finally:
+        copia.close()
@@ -10,22 +10,52 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
-# Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
+def _env_bool(nombre, defecto):
+    valor = os.environ.get(nombre)
+    if valor is None:
+        return defecto
+    return valor.strip().lower() in ('1', 'true', 'si', 'sí', 'yes', 'on')
+
+
+def _env_int(nombre, defecto):
+    valor = os.environ.get(nombre)
+    return defecto if valor in (None, '') else int(valor)
+
+
+# Entorno
+#
+# DJANGO_ENTORNO: 'desarrollo' (por defecto) o 'produccion'. Define los
+# valores por defecto de DEBUG, las conexiones persistentes y el modo WAL
+# de SQLite; cada uno se puede cambiar con su propia variable.
+
+ENTORNOS = ('desarrollo', 'produccion')
+ENTORNO = os.environ.get('DJANGO_ENTORNO', 'desarrollo')
+if ENTORNO not in ENTORNOS:
+    raise ImproperlyConfigured(f"DJANGO_ENTORNO debe ser uno de {', '.join(ENTORNOS)}")
+PRODUCCION = ENTORNO == 'produccion'
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-a#4^odvmnh5t9=1r(@u76i%%qu@(3a1f5i)2v)f$1p0*n#ef_!'
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    if PRODUCCION:
+        raise ImproperlyConfigured('Falta DJANGO_SECRET_KEY')
+    SECRET_KEY = 'django-insecure-a#4^odvmnh5t9=1r(@u76i%%qu@(3a1f5i)2v)f$1p0*n#ef_!'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Con DEBUG cada conexión guarda todas sus consultas en memoria.
+DEBUG = _env_bool('DJANGO_DEBUG', not PRODUCCION)
 
-ALLOWED_HOSTS = []
+# DJANGO_ALLOWED_HOSTS: lista separada por comas
+ALLOWED_HOSTS = [h.strip() for h in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if h.strip()]
 
 # Application definition
 
@@ -42,11 +72,16 @@ INSTALLED_APPS = [
     'gestionVentas',
     'gestionUsuarios',
     'gestionCompras',
-    'gestionInformes'
+    'gestionInformes',
+    'gestionTareas',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # primero, para medir también las consultas de sesión y autenticación
+    'djangoPrueba.rendimiento.RendimientoMiddleware',
+    # antes de sesiones: una sesión guardada también cuenta como escritura
+    'djangoPrueba.replicas.LecturaPropiaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -77,15 +112,169 @@ WSGI_APPLICATION = 'djangoPrueba.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# DJANGO_DB_ENGINE: 'sqlite' (por defecto) o 'postgres'.
+#   sqlite: DJANGO_DB_NAME (ruta del archivo, por defecto db.sqlite3).
+#   postgres: DJANGO_DB_NAME, DJANGO_DB_USER, DJANGO_DB_PASSWORD,
+#             DJANGO_DB_HOST, DJANGO_DB_PORT (requiere psycopg).
+# DJANGO_DB_CONN_MAX_AGE: segundos que se reutiliza una conexión entre
+#   requests (0 = una por request; por defecto 60 en producción). Antes de
+#   reutilizarla se verifica que siga viva (CONN_HEALTH_CHECKS).
+#
+# SQLite: cada conexión nueva aplica SQLITE_PRAGMAS y las transacciones
+# empiezan con BEGIN IMMEDIATE, así quien va a escribir toma el lock al
+# empezar y espera hasta DJANGO_SQLITE_BUSY_TIMEOUT (ms) si está ocupado,
+# en vez de fallar con "database is locked" al pasar de leer a escribir.
+# El modo WAL (los lectores no bloquean al que escribe) queda guardado en
+# el archivo, por eso por defecto solo se activa en producción
+# (DJANGO_SQLITE_JOURNAL=WAL para activarlo en desarrollo).
+
+DB_ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgres': 'django.db.backends.postgresql',
+}
+_db_engine = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+if _db_engine not in DB_ENGINES:
+    raise ImproperlyConfigured(f"DJANGO_DB_ENGINE debe ser uno de {', '.join(DB_ENGINES)}")
+
+_sqlite_journal = os.environ.get('DJANGO_SQLITE_JOURNAL', 'WAL' if PRODUCCION else '').upper()
+SQLITE_PRAGMAS = {
+    'journal_mode': _sqlite_journal,
+    # en WAL, NORMAL no pierde consistencia y evita un fsync por commit
+    'synchronous': 'NORMAL' if _sqlite_journal == 'WAL' else '',
+    'busy_timeout': _env_int('DJANGO_SQLITE_BUSY_TIMEOUT', 5000),
+    'mmap_size': _env_int('DJANGO_SQLITE_MMAP_SIZE', 128 * 1024 * 1024),
+    # negativo: en KiB (64 MB por conexión)
+    'cache_size': _env_int('DJANGO_SQLITE_CACHE_SIZE', -64000),
+}
+
+if _db_engine == 'sqlite':
+    _db_options = {
+        'init_command': '; '.join(
+            f'PRAGMA {pragma}={valor}' for pragma, valor in SQLITE_PRAGMAS.items() if valor != ''
+        ),
+        'transaction_mode': 'IMMEDIATE',
+    }
+    _db_config = {'NAME': os.environ.get('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3')}
+else:
+    _db_options = {}
+    _db_config = {
+        'NAME': os.environ.get('DJANGO_DB_NAME', 'djangoprueba'),
+        'USER': os.environ.get('DJANGO_DB_USER', ''),
+        'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+        'HOST': os.environ.get('DJANGO_DB_HOST', ''),
+        'PORT': os.environ.get('DJANGO_DB_PORT', ''),
+    }
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DB_ENGINES[_db_engine],
+        **_db_config,
+        'OPTIONS': _db_options,
+        'CONN_MAX_AGE': _env_int('DJANGO_DB_CONN_MAX_AGE', 60 if PRODUCCION else 0),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Réplica de lectura para informes y estadísticas (djangoPrueba.replicas)
+#
+# DJANGO_DB_REPORTING_NAME: SQLite: archivo de la copia que actualiza
+#   periódicamente el comando snapshot_reportes. Postgres: base de la
+#   réplica (por defecto, la misma que DJANGO_DB_NAME).
+# DJANGO_DB_REPORTING_HOST / DJANGO_DB_REPORTING_PORT: réplica de Postgres.
+# DJANGO_DB_REPORTING_RETRASO: segundos que, después de escribir, un
+#   navegador sigue leyendo de 'default'; debe cubrir el atraso de la
+#   réplica (el intervalo entre copias en SQLite).
+# Sin DJANGO_DB_REPORTING_NAME ni _HOST todo se lee de 'default'.
+
+_reporting = {
+    clave: os.environ[f'DJANGO_DB_REPORTING_{clave}']
+    for clave in ('NAME', 'HOST', 'PORT') if os.environ.get(f'DJANGO_DB_REPORTING_{clave}')
+}
+if _reporting:
+    DATABASES['reporting'] = {
+        **DATABASES['default'],
+        **_reporting,
+        # en los tests la réplica es la misma base de prueba
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['djangoPrueba.replicas.ReportesRouter']
+
+BASE_REPORTES = {
+    'ALIAS': 'reporting',
+    'FIJAR_PRINCIPAL': _env_int('DJANGO_DB_REPORTING_RETRASO', 60),
+    'COOKIE': 'db_principal',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# DJANGO_CACHE_BACKEND: 'locmem' (desarrollo, por defecto), 'file' o 'redis'.
+# DJANGO_CACHE_LOCATION: carpeta (file) o URL redis://host:puerto/db (redis).
+#
+# En producción es obligatorio 'file' o 'redis': las generaciones de
+# estadísticas, los totales de los listados y la búsqueda se invalidan en
+# la caché, y con locmem cada proceso (worker de gunicorn, procesar_tareas)
+# tendría la suya y no vería las invalidaciones de los demás.
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'djangoPrueba'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHE_BACKENDS_COMPARTIDOS = ('file', 'redis')
+_cache_nombre = os.environ.get('DJANGO_CACHE_BACKEND', '' if PRODUCCION else 'locmem')
+if PRODUCCION and _cache_nombre not in CACHE_BACKENDS_COMPARTIDOS:
+    raise ImproperlyConfigured(
+        f"En producción DJANGO_CACHE_BACKEND debe ser uno de {', '.join(CACHE_BACKENDS_COMPARTIDOS)}"
+    )
+if _cache_nombre not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"DJANGO_CACHE_BACKEND debe ser uno de {', '.join(CACHE_BACKENDS)}")
+_cache_backend, _cache_location = CACHE_BACKENDS[_cache_nombre]
+
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', _cache_location),
+        'TIMEOUT': 300,
     }
 }
 
 
+# Instrumentación de rendimiento (djangoPrueba.rendimiento)
+#
+# MUESTREO: fracción de requests medidos (0 desactiva, 1 mide todos).
+# Se puede cambiar sin tocar el código con DJANGO_RENDIMIENTO_MUESTREO.
+# LOG: archivo JSON lines con las mediciones (lo lee /stats/perf/). Solo
+# se escribe si se define DJANGO_RENDIMIENTO_LOG, así tests y bench no
+# llenan un archivo dentro del proyecto.
+
+RENDIMIENTO = {
+    'MUESTREO': float(os.environ.get('DJANGO_RENDIMIENTO_MUESTREO', '1.0' if DEBUG else '0.05')),
+    'CABECERA': True,
+    'LOG': os.environ.get('DJANGO_RENDIMIENTO_LOG') or None,
+    'LOG_MAX_BYTES': 5 * 1024 * 1024,
+    'LOG_BACKUPS': 3,
+}
+
+
+# Cola de tareas en segundo plano (gestionTareas.cola)
+#
+# Los trabajadores se corren con `manage.py procesar_tareas`.
+# UMBRAL_ADMIN: desde cuántas ventas seleccionadas las acciones del admin
+# se encolan en lugar de ejecutarse en el request.
+
+TAREAS = {
+    'DIRECTORIO': BASE_DIR / 'archivos' / 'tareas',
+    'INTERVALO': 2,
+    'TIEMPO_COLGADA': 10 * 60,
+    'DIAS_ARCHIVOS': 7,
+    'UMBRAL_ADMIN': _env_int('DJANGO_TAREAS_UMBRAL_ADMIN', 50),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -28,6 +28,7 @@ urlpatterns = [
     path('', include("gestionUsuarios.urls")),
     path('compras/', include("gestionCompras.urls")),
     path('informes/', include('gestionInformes.urls')),
+    path('tareas/', include('gestionTareas.urls')),
 
 
 
@@ -36,5 +37,6 @@ urlpatterns = [
     path('stats/providers/active/', views.count_active_providers, name='stats_active_providers'),
     path('stats/monthly-balance/', views.monthly_balance, name='stats_monthly_balance'),
     path('stats/home/', views.home_stats, name='stats_home_combined'),
+    path('stats/perf/', views.perf_stats, name='stats_perf'),
 
 ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+from djangoPrueba.busqueda import migracion_fts5
+
+
+# DDL congelado: no depende de la definición actual del modelo
+CREAR = [
+    """
+    CREATE VIRTUAL TABLE "gestionClientes_cliente_fts" USING fts5(
+        "dni", "nombre", "apellido", "email",
+        content='gestionClientes_cliente', content_rowid='idCliente',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER "gestionClientes_cliente_fts_ai" AFTER INSERT ON "gestionClientes_cliente" BEGIN
+        INSERT INTO "gestionClientes_cliente_fts"(rowid, "dni", "nombre", "apellido", "email") VALUES (new."idCliente", new."dni", new."nombre", new."apellido", new."email");
+    END
+    """,
+    """
+    CREATE TRIGGER "gestionClientes_cliente_fts_ad" AFTER DELETE ON "gestionClientes_cliente" BEGIN
+        INSERT INTO "gestionClientes_cliente_fts"("gestionClientes_cliente_fts", rowid, "dni", "nombre", "apellido", "email") VALUES ('delete', old."idCliente", old."dni", old."nombre", old."apellido", old."email");
+    END
+    """,
+    """
+    CREATE TRIGGER "gestionClientes_cliente_fts_au" AFTER UPDATE OF "dni", "nombre", "apellido", "email" ON "gestionClientes_cliente" BEGIN
+        INSERT INTO "gestionClientes_cliente_fts"("gestionClientes_cliente_fts", rowid, "dni", "nombre", "apellido", "email") VALUES ('delete', old."idCliente", old."dni", old."nombre", old."apellido", old."email");
+        INSERT INTO "gestionClientes_cliente_fts"(rowid, "dni", "nombre", "apellido", "email") VALUES (new."idCliente", new."dni", new."nombre", new."apellido", new."email");
+    END
+    """,
+    """INSERT INTO "gestionClientes_cliente_fts"("gestionClientes_cliente_fts") VALUES ('rebuild')""",
+]
+
+BORRAR = [
+    'DROP TRIGGER IF EXISTS "gestionClientes_cliente_fts_ai"',
+    'DROP TRIGGER IF EXISTS "gestionClientes_cliente_fts_ad"',
+    'DROP TRIGGER IF EXISTS "gestionClientes_cliente_fts_au"',
+    'DROP TABLE IF EXISTS "gestionClientes_cliente_fts"',
+]
+
+
+class Migration(migrations.Migration):
+    """Tabla FTS5 y triggers para la búsqueda de texto (solo SQLite, ver djangoPrueba.busqueda)."""
+
+    dependencies = [
+        ('gestionClientes', '0001_initial'),
+    ]
+
+    operations = [
+        migracion_fts5(CREAR, BORRAR),
+    ]
@@ -1,3 +1,23 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from djangoPrueba.pruebas import ConsultasVistasMixin, TestCase
+
+
+class ConsultasClientesTests(ConsultasVistasMixin, TestCase):
+    """Cantidad de consultas por vista; no debe depender de la cantidad de filas."""
+
+    def test_listado(self):
+        self.assertConsultas(3, reverse('clientes_list'))
+
+    def test_detalle(self):
+        self.assertConsultas(3, reverse('cliente_detalle', args=[self.datos.clientes[1].pk]))
+
+    def test_editar(self):
+        self.assertConsultas(3, reverse('cliente_editar', args=[self.datos.clientes[1].pk]))
+
+    def test_admin(self):
+        self.assertConsultas(5, reverse('admin:gestionClientes_cliente_changelist'))
+
+
+class ConsultasClientesEscalaTests(ConsultasClientesTests):
+    escala = 10
@@ -7,14 +7,18 @@ from django.contrib import messages
 
 from .models import Cliente
 from .forms import ClienteForm
+from djangoPrueba.busqueda import buscar
 
 # ============================================================
 # CLIENTES
 # ============================================================
 @login_required
 def clientes_list(request):
-    """Lista todos los clientes"""
+    """Lista todos los clientes (con ?q= filtra por nombre, DNI o email y ordena por relevancia)"""
     clientes = Cliente.objects.all().order_by('-fecha_registro')
+    query = request.GET.get('q')
+    if query:
+        clientes = buscar(clientes, query)
     return render(request, "list.html", {"clientes": clientes})
 
 @login_required
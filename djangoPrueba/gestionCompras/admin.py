@@ -44,6 +44,7 @@ class CompraAdmin(admin.ModelAdmin):
     )
 
     list_filter = ("proveedor", "metodo_pago", "estado", "fecha_compra")
+    list_select_related = ("proveedor",)
     search_fields = ("proveedor__nombre", "idCompra")
 
     readonly_fields = (
@@ -81,10 +82,39 @@ class CompraAdmin(admin.ModelAdmin):
 
         return ro
 
-    # Recalcular totales
-    def save_model(self, request, obj, form, change):
-        super().save_model(request, obj, form, change)
-        obj.calcular_totales()
+    # Una compra confirmada ya sumó stock y está en los resúmenes: se anula
+    # (CANCELADA), no se borra
+    def has_delete_permission(self, request, obj=None):
+        if obj is not None and obj.estado == Compra.ESTADO_CONFIRMADA:
+            return False
+        return super().has_delete_permission(request, obj)
+
+    def get_deleted_objects(self, objs, request):
+        eliminables, cantidades, permisos, protegidas = super().get_deleted_objects(objs, request)
+        protegidas = list(protegidas) + [
+            f"{compra} (confirmada)" for compra in objs if compra.estado == Compra.ESTADO_CONFIRMADA
+        ]
+        return eliminables, cantidades, permisos, protegidas
+
+    # Guardar detalles en lote: los nuevos van por bulk_create y los
+    # totales se recalculan una sola vez en save_related
+    def save_formset(self, request, form, formset, change):
+        if formset.model is not DetalleCompra:
+            return super().save_formset(request, form, formset, change)
+
+        detalles = formset.save(commit=False)
+        for obj in formset.deleted_objects:
+            obj.delete()
+
+        nuevos = []
+        for detalle in detalles:
+            if detalle.pk:
+                detalle.save(actualizar_totales=False)
+            else:
+                detalle.calcular_importes()
+                nuevos.append(detalle)
+        DetalleCompra.objects.bulk_create(nuevos)
+        formset.save_m2m()
 
     def save_related(self, request, form, formsets, change):
         super().save_related(request, form, formsets, change)
@@ -104,8 +134,11 @@ class DetalleCompraAdmin(admin.ModelAdmin):
         "producto",
         "cantidad",
         "precio_unitario",
+        "subtotal",
         "iva_porcentaje",
         "iva_monto",
         "subtotal_con_iva",
     )
-    readonly_fields = ("iva_porcentaje", "iva_monto", "subtotal_con_iva")
+    readonly_fields = ("subtotal", "iva_porcentaje", "iva_monto", "subtotal_con_iva")
+    # Compra.__str__ usa proveedor
+    list_select_related = ("compra__proveedor", "producto")
@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionCompras', '0004_remove_compra_usuario'),
+        ('gestionProveedores', '0005_indices_consultas_frecuentes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compra',
+            index=models.Index(fields=['estado', 'fecha_compra'], name='compra_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compra',
+            index=models.Index(fields=['fecha_compra', 'idCompra'], name='compra_fecha_idx'),
+        ),
+    ]
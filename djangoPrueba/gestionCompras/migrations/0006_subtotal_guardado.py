@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 19:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def calcular_subtotales(apps, schema_editor):
+    # un solo UPDATE; antes de crear el índice para no mantenerlo fila por fila
+    DetalleCompra = apps.get_model('gestionCompras', 'DetalleCompra')
+    DetalleCompra.objects.update(subtotal=F('cantidad') * F('precio_unitario'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionCompras', '0005_indices_consultas_frecuentes'),
+        ('gestionProductos', '0010_historialprecio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detallecompra',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(calcular_subtotales, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='detallecompra',
+            index=models.Index(fields=['producto', 'compra', 'cantidad', 'subtotal'], name='detcompra_prod_compra_sub_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionCompras', '0006_subtotal_guardado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='compra',
+            name='iva_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='compra',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='compra',
+            name='total_con_iva',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='detallecompra',
+            name='iva_monto',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='detallecompra',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='detallecompra',
+            name='subtotal_con_iva',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+    ]
@@ -1,8 +1,14 @@
-from django.db import models
+from collections import defaultdict
+from django.db import models, transaction
+from django.db.models import Case, F, Sum, When
+from django.core.exceptions import ValidationError
+from django.utils import timezone
 from decimal import Decimal
+from djangoPrueba.importes import calcular_iva, calcular_subtotal
 from gestionProveedores.models import Proveedor
 from gestionUsuarios.models import Usuario
-from gestionProductos.models import Productos
+from gestionProductos.models import Productos, MovimientoStock
+from .signals import compra_estado_cambiado
 
 
 class Compra(models.Model):
@@ -14,23 +20,33 @@ class Compra(models.Model):
         ('MERCADOPAGO', 'MercadoPago'),
     ]
 
+    ESTADO_PENDIENTE = 'PENDIENTE'
+    ESTADO_CONFIRMADA = 'CONFIRMADA'
+    ESTADO_CANCELADA = 'CANCELADA'
     ESTADO_CHOICES = [
-        ('PENDIENTE', 'Pendiente'),
-        ('CONFIRMADA', 'Confirmada'),
-        ('CANCELADA', 'Cancelada'),
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_CONFIRMADA, 'Confirmada'),
+        (ESTADO_CANCELADA, 'Cancelada'),
     ]
 
+    # Transiciones válidas y su efecto sobre el stock (+1 suma, -1 resta, 0 nada)
+    TRANSICIONES = {
+        (ESTADO_PENDIENTE, ESTADO_CONFIRMADA): 1,
+        (ESTADO_PENDIENTE, ESTADO_CANCELADA): 0,
+        (ESTADO_CONFIRMADA, ESTADO_CANCELADA): -1,
+    }
+
     idCompra = models.AutoField(primary_key=True)
     proveedor = models.ForeignKey(Proveedor, on_delete=models.PROTECT, related_name='compras')
 
     fecha_compra = models.DateTimeField(auto_now_add=True)
     metodo_pago = models.CharField(max_length=20, choices=METODO_PAGO_CHOICES, default='EFECTIVO')
 
-    estado = models.CharField(max_length=15, choices=ESTADO_CHOICES, default='PENDIENTE')
+    estado = models.CharField(max_length=15, choices=ESTADO_CHOICES, default=ESTADO_PENDIENTE)
 
-    total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    total_con_iva = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    iva_total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_con_iva = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    iva_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
     observaciones = models.TextField(null=True, blank=True, max_length=200)
 
@@ -38,36 +54,160 @@ class Compra(models.Model):
         verbose_name = 'Compra'
         verbose_name_plural = 'Compras'
         ordering = ['-fecha_compra']
+        indexes = [
+            # filtros por estado + rango de fechas (listado, contadores, informes)
+            models.Index(fields=['estado', 'fecha_compra'], name='compra_estado_fecha_idx'),
+            # listado sin filtro paginado por (fecha_compra, idCompra)
+            models.Index(fields=['fecha_compra', 'idCompra'], name='compra_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"Compra #{self.idCompra} - {self.proveedor.nombre}"
 
-    # Cálculo de totales
+    # Cálculo de totales (una sola agregación en SQL)
     def calcular_totales(self):
-        detalles = self.detalles.all()
-        self.total = sum(det.subtotal for det in detalles)
-        self.total_con_iva = sum(det.subtotal_con_iva for det in detalles)
-        self.iva_total = sum(det.iva_monto for det in detalles)
-        self.save(update_fields=['total', 'total_con_iva', 'iva_total'])
+        totales = self.detalles.aggregate(
+            total=Sum('subtotal'),
+            iva_total=Sum('iva_monto'),
+            total_con_iva=Sum('subtotal_con_iva'),
+        )
+        self.total = totales['total'] or Decimal('0')
+        self.iva_total = totales['iva_total'] or Decimal('0')
+        self.total_con_iva = totales['total_con_iva'] or Decimal('0')
+        # update directo: evita el save() con la lógica de stock
+        Compra.objects.filter(pk=self.pk).update(
+            total=self.total,
+            iva_total=self.iva_total,
+            total_con_iva=self.total_con_iva,
+        )
 
-    # Manejo del stock según estado
-    def save(self, *args, **kwargs):
-        if self.pk:
-            old = Compra.objects.get(pk=self.pk)
+    def agregar_detalles(self, lineas):
+        """
+        Alta de detalles en lote. `lineas` es una lista de dicts con
+        producto_id, cantidad, precio_unitario y observacion (opcional).
+
+        Busca todos los productos en una consulta, inserta con bulk_create y
+        recalcula los totales una sola vez. Sirve para la vista, el admin y
+        futuras importaciones.
+        """
+        productos = Productos.objects.in_bulk({int(l['producto_id']) for l in lineas})
 
-            # PENDIENTE → CONFIRMADA = sumar stock
-            if old.estado == "PENDIENTE" and self.estado == "CONFIRMADA":
-                for det in self.detalles.all():
-                    det.producto.stock += det.cantidad
-                    det.producto.save()
+        detalles = []
+        for linea in lineas:
+            producto = productos.get(int(linea['producto_id']))
+            if producto is None:
+                raise ValidationError(f"Producto inexistente: {linea['producto_id']}")
 
-            # CONFIRMADA → CANCELADA = restar stock
-            if old.estado == "CONFIRMADA" and self.estado == "CANCELADA":
-                for det in self.detalles.all():
-                    det.producto.stock -= det.cantidad
-                    det.producto.save()
+            detalle = DetalleCompra(
+                compra=self,
+                producto=producto,
+                cantidad=int(linea['cantidad']),
+                precio_unitario=Decimal(linea['precio_unitario']),
+                observacion=linea.get('observacion') or '',
+            )
+            if detalle.cantidad <= 0:
+                raise ValidationError(f"La cantidad de '{producto.nombre}' debe ser mayor a cero.")
+            detalle.calcular_importes()
+            detalles.append(detalle)
+
+        with transaction.atomic():
+            DetalleCompra.objects.bulk_create(detalles)
+            self.calcular_totales()
+        return detalles
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Recordar el estado leído para detectar cambios en save()
+        instancia._estado_original = instancia.__dict__.get('estado')
+        return instancia
+
+    def save(self, *args, **kwargs):
+        # Un cambio de estado hecho con save() (ej. desde el admin) pasa por cambiar_estado
+        estado_original = getattr(self, '_estado_original', None)
+        nuevo_estado = self.estado
+        update_fields = kwargs.get('update_fields')
+        cambia_estado = update_fields is None or 'estado' in update_fields
+        if self.pk and estado_original and cambia_estado and nuevo_estado != estado_original:
+            self.estado = estado_original
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                self.cambiar_estado(nuevo_estado)
+            return
 
         super().save(*args, **kwargs)
+        self._estado_original = self.estado
+
+    def clean(self):
+        estado_original = getattr(self, '_estado_original', None)
+        if (self.pk and estado_original and self.estado != estado_original
+                and (estado_original, self.estado) not in self.TRANSICIONES):
+            raise ValidationError({
+                'estado': f"No se puede pasar una compra de {estado_original} a {self.estado}."
+            })
+
+    # Máquina de estados
+    def confirmar(self):
+        """PENDIENTE → CONFIRMADA: suma el stock de todas las líneas."""
+        self.cambiar_estado(self.ESTADO_CONFIRMADA)
+
+    def cancelar(self):
+        """PENDIENTE → CANCELADA, o CONFIRMADA → CANCELADA (resta el stock sumado)."""
+        self.cambiar_estado(self.ESTADO_CANCELADA)
+
+    def cambiar_estado(self, nuevo_estado):
+        """
+        Aplica una transición de estado y su efecto sobre el stock en una
+        transacción: bloquea la compra y los productos, y actualiza el stock
+        de todos los productos con un único UPDATE.
+        """
+        with transaction.atomic():
+            actual = (
+                Compra.objects.select_for_update()
+                .values_list('estado', flat=True)
+                .get(pk=self.pk)
+            )
+            signo = self.TRANSICIONES.get((actual, nuevo_estado))
+            if signo is None:
+                raise ValidationError(
+                    f"No se puede pasar una compra de {actual} a {nuevo_estado}."
+                )
+
+            Compra.objects.filter(pk=self.pk, estado=actual).update(estado=nuevo_estado)
+            if signo:
+                self._aplicar_stock(signo)
+
+            compra_estado_cambiado.send(
+                sender=Compra, compras=[self],
+                estado_anterior=actual, estado_nuevo=nuevo_estado,
+            )
+
+        self.estado = nuevo_estado
+        self._estado_original = nuevo_estado
+
+    def _aplicar_stock(self, signo):
+        detalles = list(self.detalles.all())
+
+        # Un producto repetido en varias líneas se aplica una sola vez
+        deltas = defaultdict(int)
+        for det in detalles:
+            deltas[det.producto_id] += signo * det.cantidad
+
+        if deltas:
+            list(Productos.objects.select_for_update().filter(pk__in=list(deltas)).values_list('pk'))
+            Productos.objects.filter(pk__in=list(deltas)).update(
+                stock=Case(
+                    *[When(pk=prod_id, then=F('stock') + delta) for prod_id, delta in deltas.items()],
+                    default=F('stock'),
+                )
+            )
+
+        anulacion = signo < 0
+        fecha = timezone.now() if anulacion else None
+        MovimientoStock.objects.bulk_create([
+            MovimientoStock.desde_detalle_compra(det, anulacion=anulacion, fecha=fecha)
+            for det in detalles
+        ])
 
 
 class DetalleCompra(models.Model):
@@ -78,33 +218,39 @@ class DetalleCompra(models.Model):
 
     cantidad = models.IntegerField(default=1)
     precio_unitario = models.DecimalField(max_digits=9, decimal_places=2)
+    # cantidad * precio_unitario, guardado para sumar en SQL (ver calcular_importes)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
 
     iva_porcentaje = models.DecimalField(max_digits=4, decimal_places=2, default=0)
-    iva_monto = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    subtotal_con_iva = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    iva_monto = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    subtotal_con_iva = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
     observacion = models.TextField(max_length=100, null=True, blank=True)
 
     class Meta:
         verbose_name = 'Detalle de compra'
         verbose_name_plural = 'Detalles de compra'
+        indexes = [
+            # compras de un producto y sus unidades y costo sumados sin leer la tabla
+            models.Index(
+                fields=['producto', 'compra', 'cantidad', 'subtotal'], name='detcompra_prod_compra_sub_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Detalle #{self.idDetalleCompra} - Compra #{self.compra.idCompra}"
 
-    @property
-    def subtotal(self):
-        if not self.cantidad or not self.precio_unitario:
-            return Decimal('0')
-        return self.cantidad * self.precio_unitario
-
-    def save(self, *args, **kwargs):
+    def calcular_importes(self):
+        """Completa subtotal, IVA y subtotal con IVA a partir del producto (sin tocar la base)."""
         self.iva_porcentaje = self.producto.iva or 0
-        base = self.subtotal
-        self.iva_monto = (base * self.iva_porcentaje) / 100
-        self.subtotal_con_iva = base + self.iva_monto
+        self.subtotal = calcular_subtotal(self.cantidad, self.precio_unitario)
+        self.iva_monto, self.subtotal_con_iva = calcular_iva(self.subtotal, self.iva_porcentaje)
+
+    def save(self, *args, actualizar_totales=True, **kwargs):
+        self.calcular_importes()
 
         super().save(*args, **kwargs)
 
         # actualizar totales del encabezado
-        self.compra.calcular_totales()
+        if actualizar_totales:
+            self.compra.calcular_totales()
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Se envía dentro de la transacción que cambia el estado de una o más compras.
+# Argumentos: compras (lista de Compra), estado_anterior, estado_nuevo
+compra_estado_cambiado = Signal()
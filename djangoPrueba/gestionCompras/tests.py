@@ -1,3 +1,93 @@
-from django.test import TestCase
+from datetime import datetime, timezone
+from decimal import Decimal
 
-# Create your tests here.
+from django.urls import reverse
+
+from djangoPrueba.pruebas import ConsultasVistasMixin, PlanConsultaMixin, TestCase
+from gestionProductos.models import Productos
+from gestionVentas.models import DetalleVenta
+from .models import Compra, DetalleCompra
+
+
+class IndicesComprasTests(PlanConsultaMixin, TestCase):
+    """Las consultas frecuentes sobre compras usan índices."""
+
+    desde = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    hasta = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+    def test_estado_y_rango_de_fechas(self):
+        self.assertUsaIndice(
+            Compra.objects.filter(
+                estado=Compra.ESTADO_CONFIRMADA, fecha_compra__gte=self.desde, fecha_compra__lt=self.hasta
+            ),
+            'compra_estado_fecha_idx',
+        )
+
+    def test_contador_por_estado(self):
+        self.assertUsaIndice(
+            Compra.objects.filter(estado=Compra.ESTADO_PENDIENTE), 'compra_estado_fecha_idx'
+        )
+
+    def test_listado_paginado_sin_filtros(self):
+        self.assertUsaIndice(
+            Compra.objects.order_by('-fecha_compra', '-idCompra')[:11], 'compra_fecha_idx'
+        )
+
+    def test_unidades_y_costo_de_un_producto(self):
+        self.assertUsaIndice(
+            DetalleCompra.objects.filter(producto_id=1).values('compra_id', 'cantidad', 'subtotal'),
+            'detcompra_prod_compra_sub_idx',
+        )
+
+
+class ConsultasComprasTests(ConsultasVistasMixin, TestCase):
+    """Cantidad de consultas por vista; no debe depender de la cantidad de filas."""
+
+    def test_listado(self):
+        self.assertConsultas(6, reverse('compras_list'))
+
+    def test_detalle(self):
+        self.assertConsultas(5, reverse('compra_detalle', args=[self.datos.compras[1].pk]))
+
+    def test_nueva(self):
+        self.assertConsultas(3, reverse('compra_crear'))
+
+    def test_exportaciones(self):
+        self.assertConsultas(3, reverse('compras_exportar'))
+        self.assertConsultas(3, reverse('compras_exportar_detalles'))
+
+    def test_productos_de_proveedor(self):
+        self.assertConsultas(
+            3, reverse('productos_por_proveedor', args=[self.datos.proveedores[1].pk])
+        )
+
+    def test_admin(self):
+        for modelo, cantidad in [('compra', 6), ('detallecompra', 5)]:
+            with self.subTest(modelo=modelo):
+                self.assertConsultas(cantidad, reverse(f'admin:gestionCompras_{modelo}_changelist'))
+
+
+class ConsultasComprasEscalaTests(ConsultasComprasTests):
+    escala = 10
+
+
+class ImportesDetalleTests(TestCase):
+    def test_mismos_importes_que_una_venta(self):
+        producto = Productos(precioUnitario=Decimal('10.00'), iva=Decimal('10.50'))
+        compra = DetalleCompra(producto=producto, cantidad=3, precio_unitario=Decimal('33.35'))
+        venta = DetalleVenta(producto=producto, cantidad=3, precio_unitario=Decimal('33.35'))
+        compra.calcular_importes()
+        venta.calcular_importes()
+        self.assertEqual(
+            (compra.subtotal, compra.iva_monto, compra.subtotal_con_iva),
+            (venta.subtotal, venta.iva_monto, venta.subtotal_con_iva),
+        )
+        self.assertEqual(compra.subtotal_con_iva, Decimal('110.56'))
+
+    def test_subtotal_entra_en_el_campo(self):
+        detalle = DetalleCompra(
+            producto=Productos(iva=Decimal('21.00')), cantidad=50, precio_unitario=Decimal('9999999.99')
+        )
+        detalle.calcular_importes()
+        # max_digits del subtotal y del subtotal con IVA
+        detalle.clean_fields(exclude=['compra', 'producto'])
@@ -3,6 +3,8 @@ from . import views
 
 urlpatterns = [
     path('', views.compras_list, name='compras_list'),
+    path('exportar/', views.compras_exportar, name='compras_exportar'),
+    path('exportar/detalles/', views.compras_exportar_detalles, name='compras_exportar_detalles'),
     path('nueva/', views.compra_crear, name='compra_crear'),
     path('<int:pk>/', views.compra_detalle, name='compra_detalle'),
     path('<int:pk>/cambiar-estado/', views.compra_cambiar_estado, name='compra_cambiar_estado'),
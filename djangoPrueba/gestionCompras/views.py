@@ -3,16 +3,47 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.db import transaction
-from django.db.models import Sum, Q
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from decimal import Decimal
-import json
-from datetime import datetime, timedelta
+from django.core.exceptions import ValidationError
 
 from .models import Compra, DetalleCompra
 from gestionProveedores.models import Proveedor
-from gestionProductos.models import Productos
 from gestionProveedores.models import ProductoProveedor
+from djangoPrueba.paginacion import CursorPaginator, CursorInvalido
+from djangoPrueba.fechas import RangoFechas, FechaInvalida, parsear_fecha
+from djangoPrueba.exportacion import CHUNK_SIZE
+from gestionTareas.tareas import exportar_o_encolar
+from gestionInformes.estadisticas import generacion_de, resumen_por_estado, resumen_por_estado_sin_filtros
+
+def _rango_compras(fecha_desde, fecha_hasta):
+    """
+    Rango de fechas del listado de compras: con una sola fecha se toma ese
+    día y un rango invertido se recorta a la fecha desde.
+    Devuelve (rango, mensaje de error o None).
+    """
+    if not (fecha_desde or fecha_hasta):
+        return RangoFechas(), None
+    try:
+        desde = parsear_fecha(fecha_desde or fecha_hasta)
+        hasta = parsear_fecha(fecha_hasta or fecha_desde)
+    except FechaInvalida:
+        return RangoFechas(), 'Formato de fecha inválido.'
+    
+    # Validar que fecha_hasta >= fecha_desde
+    if hasta < desde:
+        return RangoFechas(desde, desde), 'La fecha hasta no puede ser anterior a la fecha desde.'
+    return RangoFechas(desde, hasta), None
+
+
+def _filtrar_compras(compras, estado, proveedor, rango):
+    """Filtros del listado de compras (los usan también las exportaciones)."""
+    if estado:
+        compras = compras.filter(estado=estado)
+    
+    if proveedor:
+        compras = compras.filter(proveedor_id=proveedor)
+    
+    return rango.filtrar(compras, 'fecha_compra')
+
 
 @login_required
 def compras_list(request):
@@ -28,95 +59,32 @@ def compras_list(request):
     fecha_desde = request.GET.get('fecha_desde', '')
     fecha_hasta = request.GET.get('fecha_hasta', '')
     
-    # Filtrar por estado
-    if estado_filtro:
-        compras = compras.filter(estado=estado_filtro)
-    
-    # Filtrar por proveedor
-    if proveedor_filtro:
-        compras = compras.filter(proveedor_id=proveedor_filtro)
-    
-    # Filtrar por fechas
-    if fecha_desde and fecha_hasta:
-        try:
-            fecha_desde_obj = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-            fecha_hasta_obj = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
-            
-            # Validar que fecha_hasta >= fecha_desde
-            if fecha_hasta_obj < fecha_desde_obj:
-                messages.error(request, 'La fecha hasta no puede ser anterior a la fecha desde.')
-                fecha_hasta = fecha_desde
-                fecha_hasta_obj = fecha_desde_obj
-            
-            # Si las fechas son iguales, ajustar fecha_hasta a las 23:59:59
-            if fecha_desde_obj == fecha_hasta_obj:
-                # Crear datetime con hora 00:00:00 para fecha_desde
-                fecha_desde_dt = datetime.combine(fecha_desde_obj, datetime.min.time())
-                # Crear datetime con hora 23:59:59 para fecha_hasta
-                fecha_hasta_dt = datetime.combine(fecha_hasta_obj, datetime.max.time())
-                
-                compras = compras.filter(
-                    fecha_compra__gte=fecha_desde_dt,
-                    fecha_compra__lte=fecha_hasta_dt
-                )
-            else:
-                # Si son fechas diferentes, filtrar normalmente
-                compras = compras.filter(
-                    fecha_compra__date__gte=fecha_desde_obj,
-                    fecha_compra__date__lte=fecha_hasta_obj
-                )
-                
-        except ValueError:
-            messages.error(request, 'Formato de fecha inválido.')
-    elif fecha_desde:
-        # Solo fecha_desde, usar todo el día
-        try:
-            fecha_desde_obj = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-            fecha_desde_dt = datetime.combine(fecha_desde_obj, datetime.min.time())
-            fecha_hasta_dt = datetime.combine(fecha_desde_obj, datetime.max.time())
-            
-            compras = compras.filter(
-                fecha_compra__gte=fecha_desde_dt,
-                fecha_compra__lte=fecha_hasta_dt
-            )
-            fecha_hasta = fecha_desde
-        except ValueError:
-            messages.error(request, 'Formato de fecha inválido.')
-    elif fecha_hasta:
-        # Solo fecha_hasta, usar todo el día
-        try:
-            fecha_hasta_obj = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
-            fecha_desde_dt = datetime.combine(fecha_hasta_obj, datetime.min.time())
-            fecha_hasta_dt = datetime.combine(fecha_hasta_obj, datetime.max.time())
-            
-            compras = compras.filter(
-                fecha_compra__gte=fecha_desde_dt,
-                fecha_compra__lte=fecha_hasta_dt
-            )
-            fecha_desde = fecha_hasta
-        except ValueError:
-            messages.error(request, 'Formato de fecha inválido.')
+    rango, error = _rango_compras(fecha_desde, fecha_hasta)
+    if error:
+        messages.error(request, error)
+    if rango:
+        fecha_desde, fecha_hasta = rango.desde.isoformat(), rango.hasta.isoformat()
     
-    # Calcular estadísticas basadas en los filtros aplicados
-    stats = {
-        'pendientes': compras.filter(estado='PENDIENTE').count(),
-        'confirmadas': compras.filter(estado='CONFIRMADA').count(),
-        'canceladas': compras.filter(estado='CANCELADA').count(),
-        'total': compras.filter(estado='CONFIRMADA').aggregate(Sum('total_con_iva'))['total_con_iva__sum'] or 0
-    }
+    compras = _filtrar_compras(compras, estado_filtro, proveedor_filtro, rango)
     
-    # Configurar paginación
-    paginator = Paginator(compras, 10)  # 10 compras por página
-    page = request.GET.get('page')
+    # Calcular estadísticas basadas en los filtros aplicados (sin filtros: contadores)
+    if estado_filtro or proveedor_filtro or fecha_desde or fecha_hasta:
+        stats = resumen_por_estado(compras)
+    else:
+        stats = resumen_por_estado_sin_filtros(Compra)
     
+    # Paginación por cursor sobre (fecha_compra, idCompra), 10 compras por página
+    paginator = CursorPaginator(
+        compras, ordering=('-fecha_compra', '-idCompra'), per_page=10, contar=True,
+        clave_version=lambda: generacion_de(Compra),
+    )
     try:
-        compras_paginadas = paginator.page(page)
-    except PageNotAnInteger:
-        # Si la página no es un entero, mostrar la primera página
-        compras_paginadas = paginator.page(1)
-    except EmptyPage:
-        # Si la página está fuera de rango, mostrar la última página
-        compras_paginadas = paginator.page(paginator.num_pages)
+        compras_paginadas = paginator.page(
+            request.GET.get('cursor'),
+            request.GET.get('direccion', CursorPaginator.SIGUIENTE),
+        )
+    except CursorInvalido:
+        compras_paginadas = paginator.page()
     
     context = {
         'compras': compras_paginadas,
@@ -130,6 +98,57 @@ def compras_list(request):
     return render(request, 'compras/compras_list.html', context)
 
 
+def _compras_a_exportar(parametros):
+    rango, _ = _rango_compras(parametros.get('fecha_desde', ''), parametros.get('fecha_hasta', ''))
+    return _filtrar_compras(
+        Compra.objects.all(), parametros.get('estado', ''), parametros.get('proveedor', ''), rango
+    )
+
+
+def exportacion_compras(parametros):
+    """Encabezados y filas de la exportación de compras (también la usa la tarea en segundo plano)."""
+    filas = _compras_a_exportar(parametros).order_by('-fecha_compra', '-idCompra').values_list(
+        'idCompra', 'fecha_compra', 'proveedor__cuit', 'proveedor__razon_social', 'metodo_pago',
+        'estado', 'total', 'iva_total', 'total_con_iva', 'observaciones',
+    ).iterator(chunk_size=CHUNK_SIZE)
+    
+    encabezados = [
+        'Compra', 'Fecha', 'CUIT proveedor', 'Razón social', 'Método de pago', 'Estado',
+        'Total', 'IVA', 'Total con IVA', 'Observaciones',
+    ]
+    return encabezados, filas
+
+
+@login_required
+def compras_exportar(request):
+    """Exporta las compras del listado, con los mismos filtros, en CSV (o XLSX)."""
+    return exportar_o_encolar(request, 'compras', exportacion_compras)
+
+
+def exportacion_compras_detalles(parametros):
+    """Una fila por producto comprado de las compras filtradas."""
+    compras = _compras_a_exportar(parametros)
+    filas = DetalleCompra.objects.filter(compra__in=compras).order_by(
+        '-compra__fecha_compra', '-compra_id', 'idDetalleCompra'
+    ).values_list(
+        'compra_id', 'compra__fecha_compra', 'compra__estado', 'compra__proveedor__cuit',
+        'producto__codProducto', 'producto__nombre', 'cantidad', 'precio_unitario',
+        'iva_porcentaje', 'iva_monto', 'subtotal_con_iva', 'observacion',
+    ).iterator(chunk_size=CHUNK_SIZE)
+    
+    encabezados = [
+        'Compra', 'Fecha', 'Estado', 'CUIT proveedor', 'Código', 'Producto', 'Cantidad',
+        'Precio unitario', 'IVA %', 'IVA', 'Subtotal con IVA', 'Observación',
+    ]
+    return encabezados, filas
+
+
+@login_required
+def compras_exportar_detalles(request):
+    """Exporta una fila por producto comprado de las compras del listado filtrado."""
+    return exportar_o_encolar(request, 'compras_detalles', exportacion_compras_detalles)
+
+
 @login_required
 def compra_crear(request):
     """Crea una nueva compra"""
@@ -145,16 +164,15 @@ def compra_crear(request):
                 
                 # Validar proveedor
                 proveedor = get_object_or_404(Proveedor, pk=proveedor_id)
-                # Crear la compra
+                # Crear la compra (siempre pendiente; se confirma al final si corresponde)
                 compra = Compra.objects.create(
                     proveedor=proveedor,
                     metodo_pago=metodo_pago,
                     observaciones=observaciones,
-                    estado=estado
                 )
                 
                 # Procesar los productos
-                productos_agregados = 0
+                lineas = []
                 
                 # Iterar sobre los datos POST para encontrar productos
                 for key in request.POST.keys():
@@ -169,58 +187,45 @@ def compra_crear(request):
                         
 
                         if idProducto and cantidad and precio:
-                            producto = get_object_or_404(Productos, pk=idProducto)
-                            # Crear el detalle
-                            DetalleCompra.objects.create(
-                                compra=compra,
-                                producto=producto,
-                                cantidad=int(cantidad),
-                                precio_unitario=Decimal(precio),
-                                observacion=observacion
-                            )
-                            productos_agregados += 1
+                            lineas.append({
+                                'producto_id': idProducto,
+                                'cantidad': cantidad,
+                                'precio_unitario': precio,
+                                'observacion': observacion,
+                            })
                 
                 # Validar que se agregó al menos un producto
-                if productos_agregados == 0:
+                if not lineas:
                     raise ValueError("Debe agregar al menos un producto a la compra")
                 
-                # Recalcular totales
-                compra.calcular_totales()
+                # Crear los detalles en lote y recalcular totales una sola vez
+                compra.agregar_detalles(lineas)
+                
+                # Confirmar ahora suma el stock de las líneas recién cargadas
+                if estado == Compra.ESTADO_CONFIRMADA:
+                    compra.confirmar()
                 
                 # Mensaje de éxito
-                if estado == 'CONFIRMADA':
+                if estado == Compra.ESTADO_CONFIRMADA:
                     messages.success(request, f'¡Compra #{compra.idCompra} confirmada exitosamente!')
                 else:
                     messages.success(request, f'¡Compra #{compra.idCompra} guardada!')
                 
-                return redirect('compras/compras_list')
+                return redirect('compras_list')
                 
-        except ValueError as e:
+        except (ValueError, ValidationError) as e:
             messages.error(request, str(e))
         except Exception as e:
             messages.error(request, f'Error al crear la orden de compra: {str(e)}')
     
-    # GET - Mostrar formulario
+    # GET - Mostrar formulario (los productos se buscan bajo demanda)
     proveedores = Proveedor.objects.filter(activo=True).order_by('razon_social')
-    productos = Productos.objects.filter(activo=True).select_related('idMarca', 'idCategoria').order_by('nombre')
-    
-    # Convertir productos a JSON para usar en JavaScript
-    productos_json = json.dumps([
-        {
-            'id': p.idProducto,
-            'nombre': f"{p.nombre} - {p.idMarca.nombre if p.idMarca else 'Sin marca'}",
-            'iva': float(p.iva) if p.iva else 0
-        }
-        for p in productos
-    ])
     
     context = {
         'proveedores': proveedores,
-        'productos': productos,
-        'productos_json': productos_json,
     }
     
-    return render(request, 'compras_form.html', context)
+    return render(request, 'compras/compras_form.html', context)
 
 
 @login_required
@@ -246,10 +251,11 @@ def compra_cambiar_estado(request, pk):
         nuevo_estado = request.POST.get('estado')
         
         if nuevo_estado in dict(Compra.ESTADO_CHOICES):
-            compra.estado = nuevo_estado
-            compra.save()
-            
-            messages.success(request, f'Estado de la compra actualizado a {compra.get_estado_display()}')
+            try:
+                compra.cambiar_estado(nuevo_estado)
+                messages.success(request, f'Estado de la compra actualizado a {compra.get_estado_display()}')
+            except ValidationError as e:
+                messages.error(request, e.messages[0])
         else:
             messages.error(request, 'Estado no válido')
     
@@ -263,9 +269,8 @@ def compra_eliminar(request, pk):
     if request.method == 'POST':
         compra = get_object_or_404(Compra, pk=pk)
 
-        if compra.estado == 'PENDIENTE':
-            compra.estado = 'CANCELADA'
-            compra.save()
+        if compra.estado == Compra.ESTADO_PENDIENTE:
+            compra.cancelar()
             messages.success(request, 'La compra fue cancelada correctamente.')
         else:
             messages.error(request, 'Solo se pueden cancelar compras en estado PENDIENTE.')
@@ -1,3 +1,18 @@
 from django.contrib import admin
+from .models import ResumenDiario
 
-# Register your models here.
+
+@admin.register(ResumenDiario)
+class ResumenDiarioAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'ventas_cantidad', 'ventas_total', 'compras_cantidad', 'compras_total')
+    date_hierarchy = 'fecha'
+
+    # Se mantiene por signals / reconstruir_resumenes: solo lectura
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GestioninformesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gestionInformes'
+
+    def ready(self):
+        # Conecta los receptores que mantienen los resúmenes diarios
+        from . import signals  # noqa: F401
@@ -0,0 +1,176 @@
+"""
+Contadores de la home cacheados con claves versionadas.
+
+Cada modelo tiene un número de generación en la caché; las claves de los
+valores lo incluyen (ej. "estadisticas:productos_activos:<gen>"). Los
+receptores de signals.py incrementan la generación al guardar o borrar,
+así los valores viejos quedan huérfanos y expiran solos, sin tener que
+conocer ni borrar cada clave. El total de los listados paginados
+(djangoPrueba.paginacion) usa la misma generación.
+"""
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from djangoPrueba import replicas
+from djangoPrueba.fechas import rango_mes
+from gestionClientes.models import Cliente
+from gestionCompras.models import Compra
+from gestionProductos.models import Productos
+from gestionProveedores.models import Proveedor
+from gestionVentas.models import Venta
+from .models import ContadorEstado
+
+# Los valores no necesitan expirar antes (la generación los invalida)
+TIMEOUT = 60 * 60
+
+
+# nombre de la generación de cada modelo (ver signals.py)
+GENERACION_POR_MODELO = {
+    Productos: 'productos',
+    Cliente: 'clientes',
+    Proveedor: 'proveedores',
+    Venta: 'ventas',
+    Compra: 'compras',
+}
+
+
+def _clave_generacion(modelo):
+    return f"estadisticas:gen:{modelo}"
+
+
+def _generacion_inicial():
+    # Basada en el reloj: si la clave se pierde (reinicio, desalojo) no se
+    # vuelve a una generación usada antes y no reaparecen valores viejos.
+    return time.time_ns()
+
+
+def generacion(modelo):
+    clave = _clave_generacion(modelo)
+    valor = cache.get(clave)
+    if valor is None:
+        cache.add(clave, _generacion_inicial(), None)
+        valor = cache.get(clave)
+    return valor
+
+
+def generacion_de(modelo):
+    """Generación de una clase de modelo, o None si no tiene (no se invalida)."""
+    nombre = GENERACION_POR_MODELO.get(modelo)
+    return generacion(nombre) if nombre else None
+
+
+def invalidar(modelo):
+    """
+    Incrementa la generación de `modelo` ya (quien escribe deja de ver lo
+    cacheado) y otra vez cuando la transacción confirma (descarta lo que
+    otro proceso haya cacheado leyendo los datos de antes).
+    """
+    clave = _clave_generacion(modelo)
+
+    def incrementar():
+        try:
+            cache.incr(clave)
+        except ValueError:
+            cache.add(clave, _generacion_inicial(), None)
+
+    incrementar()
+    transaction.on_commit(incrementar)
+
+
+def _cacheado(nombre, modelo, calcular, *extra):
+    clave = ':'.join(['estadisticas', nombre, str(generacion(modelo)), *map(str, extra)])
+    valor = cache.get(clave)
+    if valor is None:
+        valor = calcular()
+        # leído de la réplica puede estar atrasado aunque la generación sea nueva
+        timeout = replicas.configuracion()['FIJAR_PRINCIPAL'] if replicas.en_reportes() else TIMEOUT
+        cache.set(clave, valor, timeout)
+    return valor
+
+
+# -------------------------
+# MÉTRICAS
+# -------------------------
+def productos_activos():
+    return _cacheado(
+        'productos_activos', 'productos',
+        lambda: Productos.objects.filter(activo=True).count(),
+    )
+
+
+def clientes_activos():
+    return _cacheado(
+        'clientes_activos', 'clientes',
+        lambda: Cliente.objects.filter(activo=True).count(),
+    )
+
+
+def proveedores_activos():
+    return _cacheado(
+        'proveedores_activos', 'proveedores',
+        lambda: Proveedor.objects.filter(activo=True).count(),
+    )
+
+
+def balance_mensual():
+    """Suma de total_con_iva de las ventas CONFIRMADAS del mes actual."""
+    start, end = rango_mes(timezone.localtime())
+
+    def calcular():
+        agg = Venta.objects.filter(
+            estado=Venta.ESTADO_CONFIRMADA,
+            fecha_venta__gte=start,
+            fecha_venta__lt=end
+        ).aggregate(total=Sum('total_con_iva'))
+        return agg['total'] or Decimal('0.00')
+
+    # el mes forma parte de la clave: al cambiar de mes se recalcula
+    return _cacheado('balance_mensual', 'ventas', calcular, start.strftime('%Y-%m'))
+
+
+def resumen_home():
+    return {
+        'products_count': productos_activos(),
+        'clients_count': clientes_activos(),
+        'providers_count': proveedores_activos(),
+        'monthly_balance': balance_mensual(),
+    }
+
+
+# -------------------------
+# RESUMEN POR ESTADO (listados de ventas y compras)
+# -------------------------
+def resumen_por_estado(queryset):
+    """
+    Pendientes, confirmadas, canceladas y total confirmado de un queryset de
+    Venta o Compra, en una sola consulta.
+    """
+    resumen = queryset.order_by().aggregate(
+        pendientes=Count('pk', filter=Q(estado='PENDIENTE')),
+        confirmadas=Count('pk', filter=Q(estado='CONFIRMADA')),
+        canceladas=Count('pk', filter=Q(estado='CANCELADA')),
+        total=Sum('total_con_iva', filter=Q(estado='CONFIRMADA')),
+    )
+    resumen['total'] = resumen['total'] or 0
+    return resumen
+
+
+def resumen_por_estado_sin_filtros(modelo):
+    """Igual que resumen_por_estado(modelo.objects.all()), leído de ContadorEstado."""
+    contadores = {
+        estado: (cantidad, total)
+        for estado, cantidad, total in ContadorEstado.objects.filter(
+            modelo=modelo._meta.label_lower
+        ).values_list('estado', 'cantidad', 'total')
+    }
+    return {
+        'pendientes': contadores.get('PENDIENTE', (0, 0))[0],
+        'confirmadas': contadores.get('CONFIRMADA', (0, 0))[0],
+        'canceladas': contadores.get('CANCELADA', (0, 0))[0],
+        'total': contadores.get('CONFIRMADA', (0, 0))[1],
+    }
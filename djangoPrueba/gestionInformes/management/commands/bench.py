@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from djangoPrueba import benchmark
+from djangoPrueba.fabricas import CANTIDADES, crear_escenario
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide requests/seg, latencias (p50/p95/p99) y consultas por request de "
+        "los flujos de ventas, compras, transferencias, dashboard y estadísticas. "
+        "Corre sobre una base de prueba nueva con datos sintéticos (como los "
+        "tests): no toca la base configurada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escala',
+            type=int,
+            default=1,
+            help='Multiplicador de los datos sintéticos (1 = %s productos, %s ventas).'
+            % (CANTIDADES['productos'], CANTIDADES['ventas']),
+        )
+        parser.add_argument(
+            '--iteraciones',
+            type=int,
+            default=20,
+            help='Vueltas de los flujos por hilo (default: 20).',
+        )
+        parser.add_argument('--hilos', type=int, default=1, help='Hilos en paralelo (default: 1).')
+        parser.add_argument(
+            '--flujo',
+            action='append',
+            choices=benchmark.FLUJOS,
+            help='Flujo a medir; se puede repetir (default: todos).',
+        )
+        parser.add_argument(
+            '--calentamiento',
+            type=int,
+            default=1,
+            help='Vueltas sin medir antes de empezar (default: 1).',
+        )
+        parser.add_argument('--salida', help='Guarda el resultado en este archivo JSON.')
+        parser.add_argument('--comparar', help='JSON de una corrida anterior para comparar.')
+
+    def handle(self, *args, **options):
+        if options['escala'] < 1 or options['iteraciones'] < 1 or options['hilos'] < 1:
+            raise CommandError('--escala, --iteraciones y --hilos deben ser mayores a 0.')
+        anterior = None
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as archivo:
+                    anterior = json.load(archivo)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"No se pudo leer {options['comparar']}: {e}")
+
+        resumen = {
+            **benchmark.entorno(),
+            'escala': options['escala'],
+            **self._correr(options),
+        }
+
+        self._mostrar(resumen)
+        if anterior:
+            self._mostrar_comparacion(benchmark.comparar(anterior, resumen))
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resumen, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Resultado guardado en {options['salida']}")
+
+    def _correr(self, options):
+        temporal = None
+        if connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME']:
+            # en archivo y no en memoria: varios hilos necesitan conexiones propias
+            descriptor, temporal = tempfile.mkstemp(prefix='bench-', suffix='.sqlite3')
+            os.close(descriptor)
+            connection.settings_dict['TEST']['NAME'] = temporal
+
+        setup_test_environment(debug=False)
+        viejas = setup_databases(verbosity=0, interactive=False, aliases={connection.alias})
+        try:
+            # el middleware de rendimiento mediría de nuevo y llenaría el log
+            with override_settings(RENDIMIENTO={**getattr(settings, 'RENDIMIENTO', {}), 'MUESTREO': 0}):
+                self.stdout.write(f"Creando datos (escala {options['escala']})...")
+                datos = crear_escenario(options['escala'])
+                cache.clear()
+                resultado = benchmark.ejecutar(
+                    datos,
+                    iteraciones=options['iteraciones'],
+                    hilos=options['hilos'],
+                    flujos=options['flujo'] or benchmark.FLUJOS,
+                    calentamiento=options['calentamiento'],
+                )
+        finally:
+            teardown_databases(viejas, verbosity=0)
+            teardown_test_environment()
+            if temporal and os.path.exists(temporal):
+                os.remove(temporal)
+        return resultado.resumen()
+
+    def _mostrar(self, resumen):
+        self.stdout.write(
+            f"{resumen['requests']} requests en {resumen['duracion_s']} s "
+            f"({resumen['rps']} req/s, {resumen['hilos']} hilos), errores: {resumen['errores']}"
+        )
+        self.stdout.write(
+            f"{'vista':<28}{'req':>6}{'err':>5}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'consultas':>11}"
+        )
+        for vista, fila in resumen['vistas'].items():
+            self.stdout.write(
+                f"{vista:<28}{fila['requests']:>6}{fila['errores']:>5}{fila['rps']:>9}"
+                f"{fila['p50_ms']:>9}{fila['p95_ms']:>9}{fila['p99_ms']:>9}"
+                f"{fila['consultas_promedio']:>11}"
+            )
+        if resumen['errores']:
+            self.stdout.write(self.style.WARNING("Hubo requests con error: ver la columna err."))
+
+    def _mostrar_comparacion(self, filas):
+        self.stdout.write("Comparación (anterior -> actual):")
+        for vista, campos in filas:
+            cambios = ', '.join(
+                f"{campo} {antes} -> {despues}" for campo, (antes, despues) in campos.items()
+            )
+            self.stdout.write(f"  {vista}: {cambios}")
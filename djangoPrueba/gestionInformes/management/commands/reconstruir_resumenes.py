@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestionInformes.models import ContadorEstado
+from gestionInformes.resumenes import reconstruir, reconstruir_contadores
+
+
+def _fecha(valor):
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Fecha inválida: {valor} (formato esperado AAAA-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los resúmenes diarios de ventas y compras confirmadas. "
+        "Sin --desde/--hasta reconstruye todo el historial y también los "
+        "contadores por estado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=_fecha, help='Primer día a reconstruir (AAAA-MM-DD).')
+        parser.add_argument('--hasta', type=_fecha, help='Último día a reconstruir (AAAA-MM-DD).')
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=2000,
+            help='Cantidad de filas por INSERT (default: 2000).',
+        )
+
+    def handle(self, *args, **options):
+        creados = reconstruir(options['desde'], options['hasta'], lote=options['lote'])
+        for modelo, cantidad in creados.items():
+            self.stdout.write(f"{modelo._meta.verbose_name_plural}: {cantidad}")
+        if not options['desde'] and not options['hasta']:
+            contadores = reconstruir_contadores()
+            self.stdout.write(f"{ContadorEstado._meta.verbose_name_plural}: {len(contadores)}")
+        self.stdout.write(self.style.SUCCESS("Resúmenes reconstruidos."))
@@ -0,0 +1,19 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from djangoPrueba.replicas import alias_reportes, copiar_sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia la base principal SQLite sobre la réplica de informes "
+        "(DJANGO_DB_REPORTING_NAME). Pensado para correr periódicamente "
+        "(cron); una réplica de Postgres se actualiza sola."
+    )
+
+    def handle(self, *args, **options):
+        try:
+            copiar_sqlite()
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Réplica '{alias_reportes()}' actualizada."))
@@ -0,0 +1,83 @@
+# Generated by Django 5.2 on 2026-10-18 18:36
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('gestionClientes', '0001_initial'),
+        ('gestionProductos', '0005_movimientostock'),
+        ('gestionProveedores', '0004_proveedor_activo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(unique=True)),
+                ('ventas_cantidad', models.IntegerField(default=0)),
+                ('ventas_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('compras_cantidad', models.IntegerField(default=0)),
+                ('compras_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario',
+                'verbose_name_plural': 'Resúmenes Diarios',
+                'ordering': ['-fecha'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenDiarioCliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('ventas_cantidad', models.IntegerField(default=0)),
+                ('ventas_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to='gestionClientes.cliente')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario por Cliente',
+                'verbose_name_plural': 'Resúmenes Diarios por Cliente',
+                'ordering': ['-fecha'],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'cliente'), name='resumen_cliente_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenDiarioProducto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('cantidad_vendida', models.IntegerField(default=0)),
+                ('ingresos', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to='gestionProductos.productos')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario por Producto',
+                'verbose_name_plural': 'Resúmenes Diarios por Producto',
+                'ordering': ['-fecha'],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'producto'), name='resumen_producto_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenDiarioProveedor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('compras_cantidad', models.IntegerField(default=0)),
+                ('compras_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('proveedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to='gestionProveedores.proveedor')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario por Proveedor',
+                'verbose_name_plural': 'Resúmenes Diarios por Proveedor',
+                'ordering': ['-fecha'],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'proveedor'), name='resumen_proveedor_unico')],
+            },
+        ),
+    ]
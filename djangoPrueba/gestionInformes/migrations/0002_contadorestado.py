@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-18 18:41
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def cargar_contadores(apps, schema_editor):
+    ContadorEstado = apps.get_model('gestionInformes', 'ContadorEstado')
+    for label in ('gestionVentas.Venta', 'gestionCompras.Compra'):
+        modelo = apps.get_model(label)
+        ContadorEstado.objects.bulk_create([
+            ContadorEstado(
+                modelo=label.lower(),
+                estado=fila['estado'],
+                cantidad=fila['cantidad'],
+                total=fila['total'] or 0,
+            )
+            for fila in modelo.objects.order_by().values('estado').annotate(
+                cantidad=Count('pk'),
+                total=Sum('total_con_iva', filter=~Q(estado='PENDIENTE')),
+            )
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionInformes', '0001_initial'),
+        ('gestionVentas', '0006_indices_consultas_frecuentes'),
+        ('gestionCompras', '0005_indices_consultas_frecuentes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorEstado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=50)),
+                ('estado', models.CharField(max_length=15)),
+                ('cantidad', models.IntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Contador por Estado',
+                'verbose_name_plural': 'Contadores por Estado',
+                'constraints': [models.UniqueConstraint(fields=('modelo', 'estado'), name='contador_estado_unico')],
+            },
+        ),
+        migrations.RunPython(cargar_contadores, migrations.RunPython.noop),
+    ]
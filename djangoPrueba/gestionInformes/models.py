@@ -1,28 +1,110 @@
-# from django.db import models
-# from gestionUsuarios.models import Usuario
-
-# # Modelo opcional para guardar reportes personalizados o favoritos
-# class ReporteGuardado(models.Model):
-#     TIPO_REPORTE_CHOICES = [
-#         ('VENTAS_MENSUALES', 'Ventas Mensuales'),
-#         ('PRODUCTOS_MAS_VENDIDOS', 'Productos Más Vendidos'),
-#         ('TOP_PROVEEDORES', 'Top Proveedores'),
-#         ('TOP_CLIENTES', 'Top Clientes'),
-#         ('FLUJO_CAJA', 'Flujo de Caja'),
-#     ]
-    
-#     idReporte = models.AutoField(primary_key=True)
-#     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='reportes_guardados')
-#     tipo_reporte = models.CharField(max_length=30, choices=TIPO_REPORTE_CHOICES)
-#     nombre = models.CharField(max_length=100)
-#     fecha_desde = models.DateField(null=True, blank=True)
-#     fecha_hasta = models.DateField(null=True, blank=True)
-#     fecha_creacion = models.DateTimeField(auto_now_add=True)
-    
-#     class Meta:
-#         verbose_name = 'Reporte Guardado'
-#         verbose_name_plural = 'Reportes Guardados'
-#         ordering = ['-fecha_creacion']
-    
-#     def __str__(self):
-#         return f"{self.nombre} - {self.usuario.username}"
\ No newline at end of file
+from decimal import Decimal
+from django.db import models
+from gestionProductos.models import Productos
+from gestionClientes.models import Cliente
+from gestionProveedores.models import Proveedor
+
+
+# -------------------------
+# RESÚMENES DIARIOS
+# -------------------------
+# Totales pre-agregados por día de las ventas y compras CONFIRMADAS.
+# Se mantienen al confirmar/cancelar (ver resumenes.py y signals.py) y se
+# pueden reconstruir con `manage.py reconstruir_resumenes`.
+
+class ResumenDiario(models.Model):
+    fecha = models.DateField(unique=True)
+    ventas_cantidad = models.IntegerField(default=0)
+    ventas_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    compras_cantidad = models.IntegerField(default=0)
+    compras_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name = 'Resumen Diario'
+        verbose_name_plural = 'Resúmenes Diarios'
+        ordering = ['-fecha']
+
+    def __str__(self):
+        return f"Resumen {self.fecha}"
+
+
+class ResumenDiarioProducto(models.Model):
+    fecha = models.DateField()
+    producto = models.ForeignKey(Productos, on_delete=models.CASCADE, related_name='resumenes_diarios')
+    cantidad_vendida = models.IntegerField(default=0)
+    ingresos = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name = 'Resumen Diario por Producto'
+        verbose_name_plural = 'Resúmenes Diarios por Producto'
+        ordering = ['-fecha']
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'producto'], name='resumen_producto_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.producto} - {self.fecha}"
+
+
+class ResumenDiarioCliente(models.Model):
+    fecha = models.DateField()
+    cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, related_name='resumenes_diarios')
+    ventas_cantidad = models.IntegerField(default=0)
+    ventas_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name = 'Resumen Diario por Cliente'
+        verbose_name_plural = 'Resúmenes Diarios por Cliente'
+        ordering = ['-fecha']
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'cliente'], name='resumen_cliente_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.cliente} - {self.fecha}"
+
+
+class ResumenDiarioProveedor(models.Model):
+    fecha = models.DateField()
+    proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name='resumenes_diarios')
+    compras_cantidad = models.IntegerField(default=0)
+    compras_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name = 'Resumen Diario por Proveedor'
+        verbose_name_plural = 'Resúmenes Diarios por Proveedor'
+        ordering = ['-fecha']
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'proveedor'], name='resumen_proveedor_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.proveedor} - {self.fecha}"
+
+
+# -------------------------
+# CONTADORES POR ESTADO
+# -------------------------
+class ContadorEstado(models.Model):
+    """
+    Cantidad de ventas/compras en cada estado y su total, sin filtros.
+    Lo mantienen los receptores de signals.py (altas, bajas y cambios de
+    estado) para que los listados no cuenten toda la tabla en cada página.
+
+    `total` se acumula para CONFIRMADA y CANCELADA; en PENDIENTE queda en 0
+    porque el total de un documento pendiente cambia mientras se edita.
+    """
+    modelo = models.CharField(max_length=50)
+    estado = models.CharField(max_length=15)
+    cantidad = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name = 'Contador por Estado'
+        verbose_name_plural = 'Contadores por Estado'
+        constraints = [
+            models.UniqueConstraint(fields=['modelo', 'estado'], name='contador_estado_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} {self.estado}: {self.cantidad}"
@@ -0,0 +1,259 @@
+"""
+Mantenimiento de los resúmenes diarios (ResumenDiario*).
+
+Solo cuentan las ventas y compras CONFIRMADAS. El día de cada documento es
+la fecha local de fecha_venta / fecha_compra, igual que los filtros por
+fecha que usaban los informes.
+
+- registrar_ventas / registrar_compras: suman (signo=1) o restan (signo=-1)
+  documentos a los resúmenes; las llaman los receptores de signals.py
+  dentro de la misma transacción que cambia el estado.
+- actualizar_contadores: mueve documentos entre estados en ContadorEstado.
+- reconstruir / reconstruir_contadores: borran y recalculan desde las
+  tablas de origen.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from djangoPrueba.fechas import RangoFechas
+from gestionVentas.models import Venta, DetalleVenta
+from gestionCompras.models import Compra
+from .models import (
+    ContadorEstado,
+    ResumenDiario,
+    ResumenDiarioProducto,
+    ResumenDiarioCliente,
+    ResumenDiarioProveedor,
+)
+
+PENDIENTE = 'PENDIENTE'
+CONFIRMADA = 'CONFIRMADA'
+
+
+def signo_transicion(estado_anterior, estado_nuevo):
+    """+1 si el documento pasa a CONFIRMADA, -1 si deja de estarlo, 0 si no afecta."""
+    if estado_nuevo == CONFIRMADA and estado_anterior != CONFIRMADA:
+        return 1
+    if estado_anterior == CONFIRMADA and estado_nuevo != CONFIRMADA:
+        return -1
+    return 0
+
+
+def _nuevo_acumulado():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def _acumular(modelo, campos_clave, deltas):
+    """
+    Suma `deltas` ({clave: {campo: valor}}) a las filas de `modelo`
+    identificadas por `campos_clave`, creando las que falten.
+
+    Tres consultas por modelo sin importar la cantidad de claves:
+    INSERT (ignorando las existentes), SELECT de ids y un único UPDATE
+    con CASE ... WHEN pk THEN campo + delta.
+    """
+    if not deltas:
+        return
+
+    modelo.objects.bulk_create(
+        [modelo(**dict(zip(campos_clave, clave))) for clave in deltas],
+        ignore_conflicts=True,
+    )
+
+    filtro = Q()
+    for i, campo in enumerate(campos_clave):
+        filtro &= Q(**{f"{campo}__in": {clave[i] for clave in deltas}})
+    ids = {
+        tuple(fila[1:]): fila[0]
+        for fila in modelo.objects.filter(filtro).order_by().values_list('pk', *campos_clave)
+    }
+
+    campos = {campo for valores in deltas.values() for campo in valores}
+    modelo.objects.filter(pk__in=[ids[clave] for clave in deltas]).update(**{
+        campo: Case(
+            *[When(pk=ids[clave], then=F(campo) + valores[campo])
+              for clave, valores in deltas.items() if valores.get(campo)],
+            default=F(campo),
+        )
+        for campo in campos
+    })
+
+
+# -------------------------
+# ACTUALIZACIÓN INCREMENTAL
+# -------------------------
+def registrar_ventas(ventas, signo):
+    ids = [venta.pk for venta in ventas]
+    if not ids or not signo:
+        return
+
+    por_dia = _nuevo_acumulado()
+    por_cliente = _nuevo_acumulado()
+    dia_de_venta = {}
+    for id_venta, fecha, cliente_id, total in Venta.objects.filter(pk__in=ids).order_by().values_list(
+        'idVenta', 'fecha_venta', 'cliente_id', 'total_con_iva'
+    ):
+        dia = timezone.localdate(fecha)
+        dia_de_venta[id_venta] = dia
+        por_dia[(dia,)]['ventas_cantidad'] += signo
+        por_dia[(dia,)]['ventas_total'] += signo * total
+        por_cliente[(dia, cliente_id)]['ventas_cantidad'] += signo
+        por_cliente[(dia, cliente_id)]['ventas_total'] += signo * total
+
+    por_producto = _nuevo_acumulado()
+    for id_venta, producto_id, cantidad, subtotal in DetalleVenta.objects.filter(
+        venta_id__in=ids
+    ).values_list('venta_id', 'producto_id', 'cantidad', 'subtotal'):
+        clave = (dia_de_venta[id_venta], producto_id)
+        por_producto[clave]['cantidad_vendida'] += signo * cantidad
+        por_producto[clave]['ingresos'] += signo * subtotal
+
+    _acumular(ResumenDiario, ('fecha',), por_dia)
+    _acumular(ResumenDiarioCliente, ('fecha', 'cliente_id'), por_cliente)
+    _acumular(ResumenDiarioProducto, ('fecha', 'producto_id'), por_producto)
+
+
+def registrar_compras(compras, signo):
+    ids = [compra.pk for compra in compras]
+    if not ids or not signo:
+        return
+
+    por_dia = _nuevo_acumulado()
+    por_proveedor = _nuevo_acumulado()
+    for fecha, proveedor_id, total in Compra.objects.filter(pk__in=ids).order_by().values_list(
+        'fecha_compra', 'proveedor_id', 'total_con_iva'
+    ):
+        dia = timezone.localdate(fecha)
+        por_dia[(dia,)]['compras_cantidad'] += signo
+        por_dia[(dia,)]['compras_total'] += signo * total
+        por_proveedor[(dia, proveedor_id)]['compras_cantidad'] += signo
+        por_proveedor[(dia, proveedor_id)]['compras_total'] += signo * total
+
+    _acumular(ResumenDiario, ('fecha',), por_dia)
+    _acumular(ResumenDiarioProveedor, ('fecha', 'proveedor_id'), por_proveedor)
+
+
+def actualizar_contadores(modelo, documentos, salida=None, entrada=None):
+    """
+    Resta `documentos` (ventas o compras) del estado `salida` y los suma al
+    estado `entrada`; cualquiera de los dos puede ser None (alta / baja).
+    Usa el total_con_iva en memoria de cada documento.
+    """
+    deltas = _nuevo_acumulado()
+    for estado, signo in ((salida, -1), (entrada, 1)):
+        if estado is None:
+            continue
+        clave = (modelo._meta.label_lower, estado)
+        for documento in documentos:
+            deltas[clave]['cantidad'] += signo
+            if estado != PENDIENTE:
+                deltas[clave]['total'] += signo * documento.total_con_iva
+    _acumular(ContadorEstado, ('modelo', 'estado'), deltas)
+
+
+# -------------------------
+# RECONSTRUCCIÓN
+# -------------------------
+def _por_dia(queryset, campo_fecha, rango):
+    return rango.filtrar(queryset, campo_fecha).annotate(dia=TruncDate(campo_fecha)).order_by()
+
+
+@transaction.atomic
+def reconstruir(fecha_desde=None, fecha_hasta=None, lote=2000):
+    """
+    Recalcula los resúmenes del rango indicado (todo el historial si no se
+    indica) con una agregación GROUP BY por tabla. Devuelve la cantidad de
+    filas creadas por modelo.
+    """
+    rango = RangoFechas(fecha_desde, fecha_hasta)
+    modelos = (ResumenDiario, ResumenDiarioProducto, ResumenDiarioCliente, ResumenDiarioProveedor)
+    for modelo in modelos:
+        rango.filtrar_dias(modelo.objects.all(), 'fecha').delete()
+
+    ventas = _por_dia(
+        Venta.objects.filter(estado=CONFIRMADA), 'fecha_venta', rango
+    )
+    compras = _por_dia(
+        Compra.objects.filter(estado=CONFIRMADA), 'fecha_compra', rango
+    )
+    detalles = _por_dia(
+        DetalleVenta.objects.filter(venta__estado=CONFIRMADA), 'venta__fecha_venta', rango
+    )
+
+    diarios = defaultdict(dict)
+    for fila in ventas.values('dia').annotate(
+        cantidad=Count('idVenta'), total=Sum('total_con_iva')
+    ):
+        diarios[fila['dia']].update(ventas_cantidad=fila['cantidad'], ventas_total=fila['total'])
+    for fila in compras.values('dia').annotate(
+        cantidad=Count('idCompra'), total=Sum('total_con_iva')
+    ):
+        diarios[fila['dia']].update(compras_cantidad=fila['cantidad'], compras_total=fila['total'])
+
+    creados = {}
+    creados[ResumenDiario] = ResumenDiario.objects.bulk_create(
+        [ResumenDiario(fecha=dia, **valores) for dia, valores in diarios.items()],
+        batch_size=lote,
+    )
+    creados[ResumenDiarioCliente] = ResumenDiarioCliente.objects.bulk_create(
+        [
+            ResumenDiarioCliente(
+                fecha=fila['dia'], cliente_id=fila['cliente_id'],
+                ventas_cantidad=fila['cantidad'], ventas_total=fila['total'],
+            )
+            for fila in ventas.values('dia', 'cliente_id').annotate(
+                cantidad=Count('idVenta'), total=Sum('total_con_iva')
+            ).iterator()
+        ],
+        batch_size=lote,
+    )
+    creados[ResumenDiarioProveedor] = ResumenDiarioProveedor.objects.bulk_create(
+        [
+            ResumenDiarioProveedor(
+                fecha=fila['dia'], proveedor_id=fila['proveedor_id'],
+                compras_cantidad=fila['cantidad'], compras_total=fila['total'],
+            )
+            for fila in compras.values('dia', 'proveedor_id').annotate(
+                cantidad=Count('idCompra'), total=Sum('total_con_iva')
+            ).iterator()
+        ],
+        batch_size=lote,
+    )
+    creados[ResumenDiarioProducto] = ResumenDiarioProducto.objects.bulk_create(
+        [
+            ResumenDiarioProducto(
+                fecha=fila['dia'], producto_id=fila['producto_id'],
+                cantidad_vendida=fila['unidades'], ingresos=fila['ingresos'],
+            )
+            for fila in detalles.values('dia', 'producto_id').annotate(
+                unidades=Sum('cantidad'),
+                ingresos=Sum('subtotal'),
+            ).iterator()
+        ],
+        batch_size=lote,
+    )
+    return {modelo: len(filas) for modelo, filas in creados.items()}
+
+
+@transaction.atomic
+def reconstruir_contadores():
+    """Recalcula ContadorEstado con un GROUP BY estado por modelo."""
+    ContadorEstado.objects.all().delete()
+    contadores = [
+        ContadorEstado(
+            modelo=modelo._meta.label_lower,
+            estado=fila['estado'],
+            cantidad=fila['cantidad'],
+            total=fila['total'] or 0,
+        )
+        for modelo in (Venta, Compra)
+        for fila in modelo.objects.order_by().values('estado').annotate(
+            cantidad=Count('pk'),
+            total=Sum('total_con_iva', filter=~Q(estado=PENDIENTE)),
+        )
+    ]
+    return ContadorEstado.objects.bulk_create(contadores)
@@ -0,0 +1,71 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from gestionVentas.models import Venta
+from gestionCompras.models import Compra
+from gestionVentas.signals import venta_estado_cambiado
+from gestionCompras.signals import compra_estado_cambiado
+from . import estadisticas
+from .resumenes import registrar_ventas, registrar_compras, signo_transicion, actualizar_contadores
+
+
+# -------------------------
+# RESÚMENES DIARIOS
+# -------------------------
+@receiver(venta_estado_cambiado)
+def actualizar_resumen_ventas(sender, ventas, estado_anterior, estado_nuevo, **kwargs):
+    registrar_ventas(ventas, signo_transicion(estado_anterior, estado_nuevo))
+
+
+@receiver(compra_estado_cambiado)
+def actualizar_resumen_compras(sender, compras, estado_anterior, estado_nuevo, **kwargs):
+    registrar_compras(compras, signo_transicion(estado_anterior, estado_nuevo))
+
+
+# -------------------------
+# CONTADORES POR ESTADO
+# -------------------------
+@receiver(venta_estado_cambiado)
+def mover_contador_ventas(sender, ventas, estado_anterior, estado_nuevo, **kwargs):
+    actualizar_contadores(Venta, ventas, salida=estado_anterior, entrada=estado_nuevo)
+
+
+@receiver(compra_estado_cambiado)
+def mover_contador_compras(sender, compras, estado_anterior, estado_nuevo, **kwargs):
+    actualizar_contadores(Compra, compras, salida=estado_anterior, entrada=estado_nuevo)
+
+
+@receiver(post_save, sender=Venta, dispatch_uid='contador_alta_venta')
+@receiver(post_save, sender=Compra, dispatch_uid='contador_alta_compra')
+def sumar_contador(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        actualizar_contadores(sender, [instance], entrada=instance.estado)
+
+
+@receiver(post_delete, sender=Venta, dispatch_uid='contador_baja_venta')
+@receiver(post_delete, sender=Compra, dispatch_uid='contador_baja_compra')
+def restar_contador(sender, instance, **kwargs):
+    actualizar_contadores(sender, [instance], salida=instance.estado)
+
+
+# -------------------------
+# CACHÉ DE ESTADÍSTICAS
+# -------------------------
+def invalidar_estadisticas(sender, **kwargs):
+    estadisticas.invalidar(estadisticas.GENERACION_POR_MODELO[sender])
+
+
+for modelo in estadisticas.GENERACION_POR_MODELO:
+    post_save.connect(invalidar_estadisticas, sender=modelo, dispatch_uid=f'estadisticas_save_{modelo.__name__}')
+    post_delete.connect(invalidar_estadisticas, sender=modelo, dispatch_uid=f'estadisticas_delete_{modelo.__name__}')
+
+
+@receiver(venta_estado_cambiado)
+def invalidar_estadisticas_ventas(sender, **kwargs):
+    # confirmar() cambia el estado con un UPDATE, sin post_save
+    estadisticas.invalidar('ventas')
+
+
+@receiver(compra_estado_cambiado)
+def invalidar_estadisticas_compras(sender, **kwargs):
+    estadisticas.invalidar('compras')
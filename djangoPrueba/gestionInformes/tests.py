@@ -1,3 +1,160 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from djangoPrueba import benchmark
+from djangoPrueba.replicas import ReportesRouter, en_principal, lecturas_de_reportes
+from djangoPrueba.fabricas import crear_escenario
+from djangoPrueba.pruebas import ConsultasVistasMixin, TestCase
+from gestionCompras.models import Compra
+from gestionVentas.models import Venta
+from .models import ResumenDiario
+
+
+class ConsultasInformesTests(ConsultasVistasMixin, TestCase):
+    """Cantidad de consultas por vista; no debe depender de la cantidad de filas."""
+
+    def test_dashboard(self):
+        self.assertConsultas(10, reverse('gestionInformes:dashboard'))
+
+    def test_api(self):
+        for nombre in (
+            'api_flujo_caja', 'api_ventas_mensuales', 'api_productos_top',
+            'api_proveedores_top', 'api_clientes_top',
+        ):
+            with self.subTest(nombre=nombre):
+                cache.clear()
+                self.assertConsultas(3, reverse(f'gestionInformes:{nombre}'))
+
+    def test_estadisticas_home(self):
+        self.assertConsultas(6, reverse('stats_home_combined'))
+
+    def test_admin(self):
+        self.assertConsultas(7, reverse('admin:gestionInformes_resumendiario_changelist'))
+
+
+class ConsultasInformesEscalaTests(ConsultasInformesTests):
+    escala = 10
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_escenario()
+
+    def test_flujos_sin_errores(self):
+        resumen = benchmark.ejecutar(self.datos, iteraciones=2, calentamiento=0).resumen()
+
+        self.assertEqual(resumen['errores'], 0)
+        self.assertEqual(resumen['requests'], 14)
+        self.assertEqual(set(resumen['vistas']), {
+            'ventas_form', 'venta_confirmar', 'ventas_list', 'compra_crear',
+            'transferencias_stock_ajax', 'dashboard_informes', 'home_stats',
+        })
+        self.assertGreater(resumen['vistas']['ventas_list']['consultas_promedio'], 0)
+
+    def test_comparar(self):
+        anterior = benchmark.ejecutar(
+            self.datos, iteraciones=1, flujos=['estadisticas'], calentamiento=0
+        ).resumen()
+        actual = benchmark.ejecutar(
+            self.datos, iteraciones=1, flujos=['estadisticas', 'dashboard'], calentamiento=0
+        ).resumen()
+
+        filas = benchmark.comparar(anterior, actual)
+
+        self.assertEqual([vista for vista, _ in filas], ['home_stats'])
+        self.assertEqual(set(filas[0][1]), {'rps', 'p50_ms', 'p95_ms', 'consultas_promedio'})
+
+
+class ReplicaReportesTests(TestCase):
+    """Routing a la réplica; sin consultas a 'reporting' (no existe en los tests)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_escenario()
+
+    def setUp(self):
+        super().setUp()
+        self.router = ReportesRouter()
+        replica = mock.patch.dict(settings.DATABASES, {'reporting': settings.DATABASES['default']})
+        replica.start()
+        self.addCleanup(replica.stop)
+
+    def test_lecturas_de_reportes(self):
+        self.assertIsNone(self.router.db_for_read(Venta))
+        with lecturas_de_reportes():
+            self.assertEqual(self.router.db_for_read(Venta), 'reporting')
+            with en_principal():
+                self.assertIsNone(self.router.db_for_read(Venta))
+        self.assertEqual(self.router.db_for_write(Venta), 'default')
+
+    def test_sin_replica_configurada(self):
+        del settings.DATABASES['reporting']
+        with lecturas_de_reportes():
+            self.assertIsNone(self.router.db_for_read(Venta))
+
+    def test_no_migra_la_replica(self):
+        self.assertFalse(self.router.allow_migrate('reporting', 'gestionVentas'))
+        self.assertIsNone(self.router.allow_migrate('default', 'gestionVentas'))
+
+    def test_escribir_fija_la_base_principal(self):
+        self.client.force_login(self.datos.usuario)
+        venta = self.datos.ventas[0]
+        self.assertEqual(venta.estado, Venta.ESTADO_PENDIENTE)
+
+        response = self.client.post(reverse('venta_cancelar', args=[venta.pk]))
+        self.assertEqual(response.cookies['db_principal']['max-age'], 60)
+
+        # un request que solo lee no renueva la cookie
+        response = self.client.get(reverse('ventas_list'))
+        self.assertNotIn('db_principal', response.cookies)
+
+
+class ResumenesDesdeAdminTests(TestCase):
+    """El admin no puede cambiar los datos por fuera de los resúmenes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_escenario()
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.datos.usuario)
+
+    def _totales(self):
+        return list(ResumenDiario.objects.order_by('fecha').values_list('ventas_total', 'compras_total'))
+
+    def _borrar(self, modelo, pks):
+        nombre = f'admin:{modelo._meta.app_label}_{modelo._meta.model_name}_changelist'
+        return self.client.post(reverse(nombre), {
+            'action': 'delete_selected', '_selected_action': pks, 'post': 'yes',
+        })
+
+    def test_no_borra_ventas_ni_compras_confirmadas(self):
+        antes = self._totales()
+        venta, compra = self.datos.ventas[1], self.datos.compras[1]
+        self.assertEqual(venta.estado, Venta.ESTADO_CONFIRMADA)
+        self.assertEqual(compra.estado, Compra.ESTADO_CONFIRMADA)
+
+        self._borrar(Venta, [venta.pk, self.datos.ventas[0].pk])
+        self._borrar(Compra, [compra.pk])
+
+        self.assertTrue(Venta.objects.filter(pk=venta.pk).exists())
+        # la pendiente tampoco: la acción se rechaza entera
+        self.assertTrue(Venta.objects.filter(pk=self.datos.ventas[0].pk).exists())
+        self.assertTrue(Compra.objects.filter(pk=compra.pk).exists())
+        self.assertEqual(self._totales(), antes)
+        response = self.client.get(reverse('admin:gestionVentas_venta_delete', args=[venta.pk]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_borra_ventas_pendientes(self):
+        self._borrar(Venta, [self.datos.ventas[0].pk])
+        self.assertFalse(Venta.objects.filter(pk=self.datos.ventas[0].pk).exists())
+
+    def test_estado_de_venta_no_editable(self):
+        response = self.client.get(reverse('admin:gestionVentas_venta_change', args=[self.datos.ventas[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'name="estado"')
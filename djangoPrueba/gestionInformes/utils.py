@@ -1,12 +1,22 @@
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Sum
 from django.db.models.functions import TruncMonth
-from decimal import Decimal
-from datetime import datetime, timedelta
-from gestionVentas.models import Venta, DetalleVenta
-from gestionCompras.models import Compra, DetalleCompra
+from decimal import Decimal, ROUND_HALF_UP
+from datetime import datetime
 from gestionProductos.models import Productos
-from gestionProveedores.models import Proveedor
-from gestionClientes.models import Cliente
+from djangoPrueba.fechas import RangoFechas
+from .models import (
+    ResumenDiario,
+    ResumenDiarioProducto,
+    ResumenDiarioCliente,
+    ResumenDiarioProveedor,
+)
+
+# Todas las consultas leen los resúmenes diarios (ver resumenes.py), que ya
+# contienen solo ventas/compras CONFIRMADAS agrupadas por día.
+
+
+def _resumenes(modelo, fecha_desde=None, fecha_hasta=None):
+    return RangoFechas(fecha_desde, fecha_hasta).filtrar_dias(modelo.objects.all(), 'fecha')
 
 
 def calcular_flujo_caja(fecha_desde=None, fecha_hasta=None):
@@ -14,28 +24,13 @@ def calcular_flujo_caja(fecha_desde=None, fecha_hasta=None):
     Calcula ingresos (ventas) y egresos (compras) en un período.
     Retorna: {ingresos, egresos, balance}
     """
-    # Filtros de fecha
-    filtro_ventas = Q(estado='CONFIRMADA')
-    filtro_compras = Q(estado='CONFIRMADA')
-    
-    if fecha_desde:
-        filtro_ventas &= Q(fecha_venta__gte=fecha_desde)
-        filtro_compras &= Q(fecha_compra__gte=fecha_desde)
-    
-    if fecha_hasta:
-        filtro_ventas &= Q(fecha_venta__lte=fecha_hasta)
-        filtro_compras &= Q(fecha_compra__lte=fecha_hasta)
-    
-    # Ingresos (ventas confirmadas)
-    ingresos = Venta.objects.filter(filtro_ventas).aggregate(
-        total=Sum('total_con_iva')
-    )['total'] or Decimal('0.00')
-    
-    # Egresos (compras confirmadas)
-    egresos = Compra.objects.filter(filtro_compras).aggregate(
-        total=Sum('total_con_iva')
-    )['total'] or Decimal('0.00')
-    
+    totales = _resumenes(ResumenDiario, fecha_desde, fecha_hasta).aggregate(
+        ingresos=Sum('ventas_total'),
+        egresos=Sum('compras_total')
+    )
+    ingresos = totales['ingresos'] or Decimal('0.00')
+    egresos = totales['egresos'] or Decimal('0.00')
+
     balance = ingresos - egresos
     
     return {
@@ -45,56 +40,53 @@ def calcular_flujo_caja(fecha_desde=None, fecha_hasta=None):
     }
 
 
-def obtener_ventas_mensuales(anio=None):
-    """
-    Obtiene las ventas agrupadas por mes para un año específico.
-    Retorna: lista de diccionarios con mes y total
-    """
+def _totales_mensuales(anio, campo_cantidad, campo_total):
     if not anio:
         anio = datetime.now().year
-    
-    ventas = Venta.objects.filter(
-        estado='CONFIRMADA',
-        fecha_venta__year=anio
+
+    meses = ResumenDiario.objects.filter(
+        fecha__year=anio,
+        **{f"{campo_cantidad}__gt": 0}
     ).annotate(
-        mes=TruncMonth('fecha_venta')
+        mes=TruncMonth('fecha')
     ).values('mes').annotate(
-        total=Sum('total_con_iva'),
-        cantidad=Count('idVenta')
+        total=Sum(campo_total),
+        cantidad=Sum(campo_cantidad)
     ).order_by('mes')
-    
+
     # Formatear para gráficos
     resultado = []
-    for venta in ventas:
+    for fila in meses:
         resultado.append({
-            'mes': venta['mes'].strftime('%B'),
-            'mes_numero': venta['mes'].month,
-            'total': float(venta['total']),
-            'cantidad': venta['cantidad']
+            'mes': fila['mes'].strftime('%B'),
+            'mes_numero': fila['mes'].month,
+            'total': float(fila['total']),
+            'cantidad': fila['cantidad']
         })
-    
+
     return resultado
 
 
+def obtener_ventas_mensuales(anio=None):
+    """
+    Obtiene las ventas agrupadas por mes para un año específico.
+    Retorna: lista de diccionarios con mes y total
+    """
+    return _totales_mensuales(anio, 'ventas_cantidad', 'ventas_total')
+
+
 def obtener_productos_mas_vendidos(limite=5, fecha_desde=None, fecha_hasta=None):
     """
     Obtiene los productos más vendidos por cantidad.
     """
-    filtro = Q(venta__estado='CONFIRMADA')
-    
-    if fecha_desde:
-        filtro &= Q(venta__fecha_venta__gte=fecha_desde)
-    if fecha_hasta:
-        filtro &= Q(venta__fecha_venta__lte=fecha_hasta)
-    
-    productos = DetalleVenta.objects.filter(filtro).values(
+    productos = _resumenes(ResumenDiarioProducto, fecha_desde, fecha_hasta).values(
         'producto__idProducto',
         'producto__nombre',
         'producto__codProducto'
     ).annotate(
-        total_vendido=Sum('cantidad'),
-        ingresos_generados=Sum(F('cantidad') * F('precio_unitario'))
-    ).order_by('-total_vendido')[:limite]
+        total_vendido=Sum('cantidad_vendida'),
+        ingresos_generados=Sum('ingresos')
+    ).filter(total_vendido__gt=0).order_by('-total_vendido')[:limite]
     
     return list(productos)
 
@@ -103,25 +95,21 @@ def obtener_top_proveedores(limite=5, fecha_desde=None, fecha_hasta=None):
     """
     Obtiene los proveedores con más compras realizadas.
     """
-    filtro = Q(compras__estado='CONFIRMADA')
-    
-    if fecha_desde:
-        filtro &= Q(compras__fecha_compra__gte=fecha_desde)
-    if fecha_hasta:
-        filtro &= Q(compras__fecha_compra__lte=fecha_hasta)
-    
-    proveedores = Proveedor.objects.filter(filtro).annotate(
-        total_compras=Count('compras'),
-        monto_total=Sum('compras__total_con_iva')
-    ).order_by('-total_compras')[:limite]
+    proveedores = _resumenes(ResumenDiarioProveedor, fecha_desde, fecha_hasta).values(
+        'proveedor_id',
+        'proveedor__razon_social'
+    ).annotate(
+        total_compras=Sum('compras_cantidad'),
+        monto_total=Sum('compras_total')
+    ).filter(total_compras__gt=0).order_by('-total_compras')[:limite]
     
     resultado = []
     for proveedor in proveedores:
         resultado.append({
-            'idProveedor': proveedor.idProveedor,
-            'nombre': proveedor.razon_social,
-            'total_compras': proveedor.total_compras,
-            'monto_total': float(proveedor.monto_total or 0)
+            'idProveedor': proveedor['proveedor_id'],
+            'nombre': proveedor['proveedor__razon_social'],
+            'total_compras': proveedor['total_compras'],
+            'monto_total': float(proveedor['monto_total'] or 0)
         })
     
     return resultado
@@ -131,25 +119,22 @@ def obtener_top_clientes(limite=5, fecha_desde=None, fecha_hasta=None):
     """
     Obtiene los clientes que más compran (por cantidad de ventas y monto).
     """
-    filtro = Q(ventas__estado='CONFIRMADA')
-    
-    if fecha_desde:
-        filtro &= Q(ventas__fecha_venta__gte=fecha_desde)
-    if fecha_hasta:
-        filtro &= Q(ventas__fecha_venta__lte=fecha_hasta)
-    
-    clientes = Cliente.objects.filter(filtro).annotate(
-        total_compras=Count('ventas'),
-        monto_total=Sum('ventas__total_con_iva')
-    ).order_by('-monto_total')[:limite]
+    clientes = _resumenes(ResumenDiarioCliente, fecha_desde, fecha_hasta).values(
+        'cliente_id',
+        'cliente__nombre',
+        'cliente__apellido'
+    ).annotate(
+        total_compras=Sum('ventas_cantidad'),
+        monto_total=Sum('ventas_total')
+    ).filter(total_compras__gt=0).order_by('-monto_total')[:limite]
     
     resultado = []
     for cliente in clientes:
         resultado.append({
-            'idCliente': cliente.idCliente,
-            'nombre': cliente.nombre_completo(),
-            'total_compras': cliente.total_compras,
-            'monto_total': float(cliente.monto_total or 0)
+            'idCliente': cliente['cliente_id'],
+            'nombre': f"{cliente['cliente__nombre']} {cliente['cliente__apellido']}",
+            'total_compras': cliente['total_compras'],
+            'monto_total': float(cliente['monto_total'] or 0)
         })
     
     return resultado
@@ -159,29 +144,20 @@ def obtener_estadisticas_generales(fecha_desde=None, fecha_hasta=None):
     """
     Obtiene estadísticas generales del negocio.
     """
-    filtro_ventas = Q(estado='CONFIRMADA')
-    filtro_compras = Q(estado='CONFIRMADA')
-    
-    if fecha_desde:
-        filtro_ventas &= Q(fecha_venta__gte=fecha_desde)
-        filtro_compras &= Q(fecha_compra__gte=fecha_desde)
-    
-    if fecha_hasta:
-        filtro_ventas &= Q(fecha_venta__lte=fecha_hasta)
-        filtro_compras &= Q(fecha_compra__lte=fecha_hasta)
-    
-    # Estadísticas de ventas
-    stats_ventas = Venta.objects.filter(filtro_ventas).aggregate(
-        total_ventas=Count('idVenta'),
-        ingresos_totales=Sum('total_con_iva'),
-        ticket_promedio=Sum('total_con_iva') / Count('idVenta')
-    )
-    
-    # Estadísticas de compras
-    stats_compras = Compra.objects.filter(filtro_compras).aggregate(
-        total_compras=Count('idCompra'),
-        egresos_totales=Sum('total_con_iva')
+    totales = _resumenes(ResumenDiario, fecha_desde, fecha_hasta).aggregate(
+        total_ventas=Sum('ventas_cantidad'),
+        ingresos_totales=Sum('ventas_total'),
+        total_compras=Sum('compras_cantidad'),
+        egresos_totales=Sum('compras_total')
     )
+    total_ventas = totales['total_ventas'] or 0
+    ingresos_totales = totales['ingresos_totales'] or Decimal('0.00')
+
+    ticket_promedio = Decimal('0.00')
+    if total_ventas:
+        ticket_promedio = (ingresos_totales / total_ventas).quantize(
+            Decimal('0.01'), rounding=ROUND_HALF_UP
+        )
     
     # Productos con bajo stock (menos de 10 unidades)
     productos_bajo_stock = Productos.objects.filter(
@@ -190,11 +166,11 @@ def obtener_estadisticas_generales(fecha_desde=None, fecha_hasta=None):
     ).count()
     
     return {
-        'total_ventas': stats_ventas['total_ventas'] or 0,
-        'ingresos_totales': stats_ventas['ingresos_totales'] or Decimal('0.00'),
-        'ticket_promedio': stats_ventas['ticket_promedio'] or Decimal('0.00'),
-        'total_compras': stats_compras['total_compras'] or 0,
-        'egresos_totales': stats_compras['egresos_totales'] or Decimal('0.00'),
+        'total_ventas': total_ventas,
+        'ingresos_totales': ingresos_totales,
+        'ticket_promedio': ticket_promedio,
+        'total_compras': totales['total_compras'] or 0,
+        'egresos_totales': totales['egresos_totales'] or Decimal('0.00'),
         'productos_bajo_stock': productos_bajo_stock
     }
 
@@ -203,27 +179,4 @@ def obtener_compras_mensuales(anio=None):
     Obtiene las compras agrupadas por mes para un año específico.
     Retorna: lista de diccionarios con mes y total
     """
-    if not anio:
-        anio = datetime.now().year
-    
-    compras = Compra.objects.filter(
-        estado='CONFIRMADA',
-        fecha_compra__year=anio
-    ).annotate(
-        mes=TruncMonth('fecha_compra')
-    ).values('mes').annotate(
-        total=Sum('total_con_iva'),
-        cantidad=Count('idCompra')
-    ).order_by('mes')
-    
-    # Formatear para gráficos
-    resultado = []
-    for compra in compras:
-        resultado.append({
-            'mes': compra['mes'].strftime('%B'),
-            'mes_numero': compra['mes'].month,
-            'total': float(compra['total']),
-            'cantidad': compra['cantidad']
-        })
-    
-    return resultado
\ No newline at end of file
+    return _totales_mensuales(anio, 'compras_cantidad', 'compras_total')
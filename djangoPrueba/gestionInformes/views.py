@@ -1,7 +1,10 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
+from django.utils import timezone
 from datetime import datetime, timedelta
+from djangoPrueba.fechas import RangoFechas, FechaInvalida
+from djangoPrueba.replicas import lectura_reportes
 from .utils import (
     calcular_flujo_caja,
     obtener_ventas_mensuales,
@@ -12,33 +15,32 @@ from .utils import (
     obtener_estadisticas_generales
 )
 
+
+def _rango_fechas(request, por_defecto=False):
+    """
+    Rango de fechas de los parámetros GET. Las fechas inválidas se ignoran;
+    sin fechas y con por_defecto=True se usan los últimos 30 días.
+    """
+    try:
+        rango = RangoFechas.desde_request(request.GET)
+    except FechaInvalida:
+        rango = RangoFechas()
+    if not rango and por_defecto:
+        hoy = timezone.localdate()
+        rango = RangoFechas(hoy - timedelta(days=30), hoy)
+    return rango
+
+
 @login_required
+@lectura_reportes
 def dashboard_informes(request):
     """
     Vista principal del dashboard de informes.
     Muestra todos los reportes en una sola página.
     """
-    # Obtener parámetros de fecha (opcional)
-    fecha_desde = request.GET.get('fecha_desde')
-    fecha_hasta = request.GET.get('fecha_hasta')
-    
-    # Convertir strings a fechas si existen
-    if fecha_desde:
-        try:
-            fecha_desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-        except ValueError:
-            fecha_desde = None
-    
-    if fecha_hasta:
-        try:
-            fecha_hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
-        except ValueError:
-            fecha_hasta = None
-    
-    # Si no hay fechas, usar último mes por defecto
-    if not fecha_desde and not fecha_hasta:
-        fecha_hasta = datetime.now().date()
-        fecha_desde = fecha_hasta - timedelta(days=30)
+    # Obtener parámetros de fecha (opcional; si no hay, último mes)
+    rango = _rango_fechas(request, por_defecto=True)
+    fecha_desde, fecha_hasta = rango.desde, rango.hasta
     
     # Obtener todos los datos
     flujo_caja = calcular_flujo_caja(fecha_desde, fecha_hasta)
@@ -65,17 +67,16 @@ def dashboard_informes(request):
 
 
 @login_required
+@lectura_reportes
 def api_flujo_caja(request):
     """
     API endpoint para obtener flujo de caja (para gráficos dinámicos).
     """
-    fecha_desde = request.GET.get('fecha_desde')
-    fecha_hasta = request.GET.get('fecha_hasta')
-    
-    if fecha_desde:
-        fecha_desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-    if fecha_hasta:
-        fecha_hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
+    try:
+        rango = RangoFechas.desde_request(request.GET)
+    except FechaInvalida as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    fecha_desde, fecha_hasta = rango.desde, rango.hasta
     
     datos = calcular_flujo_caja(fecha_desde, fecha_hasta)
     
@@ -90,6 +91,7 @@ def api_flujo_caja(request):
 
 
 @login_required
+@lectura_reportes
 def api_ventas_mensuales(request):
     """
     API endpoint para obtener ventas mensuales.
@@ -109,18 +111,17 @@ def api_ventas_mensuales(request):
 
 
 @login_required
+@lectura_reportes
 def api_productos_top(request):
     """
     API endpoint para productos más vendidos.
     """
     limite = int(request.GET.get('limite', 5))
-    fecha_desde = request.GET.get('fecha_desde')
-    fecha_hasta = request.GET.get('fecha_hasta')
-    
-    if fecha_desde:
-        fecha_desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-    if fecha_hasta:
-        fecha_hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
+    try:
+        rango = RangoFechas.desde_request(request.GET)
+    except FechaInvalida as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    fecha_desde, fecha_hasta = rango.desde, rango.hasta
     
     datos = obtener_productos_mas_vendidos(limite, fecha_desde, fecha_hasta)
     
@@ -131,18 +132,17 @@ def api_productos_top(request):
 
 
 @login_required
+@lectura_reportes
 def api_proveedores_top(request):
     """
     API endpoint para top proveedores.
     """
     limite = int(request.GET.get('limite', 5))
-    fecha_desde = request.GET.get('fecha_desde')
-    fecha_hasta = request.GET.get('fecha_hasta')
-    
-    if fecha_desde:
-        fecha_desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-    if fecha_hasta:
-        fecha_hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
+    try:
+        rango = RangoFechas.desde_request(request.GET)
+    except FechaInvalida as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    fecha_desde, fecha_hasta = rango.desde, rango.hasta
     
     datos = obtener_top_proveedores(limite, fecha_desde, fecha_hasta)
     
@@ -153,18 +153,17 @@ def api_proveedores_top(request):
 
 
 @login_required
+@lectura_reportes
 def api_clientes_top(request):
     """
     API endpoint para top clientes.
     """
     limite = int(request.GET.get('limite', 5))
-    fecha_desde = request.GET.get('fecha_desde')
-    fecha_hasta = request.GET.get('fecha_hasta')
-    
-    if fecha_desde:
-        fecha_desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-    if fecha_hasta:
-        fecha_hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
+    try:
+        rango = RangoFechas.desde_request(request.GET)
+    except FechaInvalida as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    fecha_desde, fecha_hasta = rango.desde, rango.hasta
     
     datos = obtener_top_clientes(limite, fecha_desde, fecha_hasta)
     
@@ -175,21 +174,13 @@ def api_clientes_top(request):
 
 
 @login_required
+@lectura_reportes
 def reporte_flujo_caja(request):
     """
     Vista dedicada al reporte de flujo de caja.
     """
-    fecha_desde = request.GET.get('fecha_desde')
-    fecha_hasta = request.GET.get('fecha_hasta')
-    
-    if fecha_desde:
-        fecha_desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-    if fecha_hasta:
-        fecha_hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
-    
-    if not fecha_desde and not fecha_hasta:
-        fecha_hasta = datetime.now().date()
-        fecha_desde = fecha_hasta - timedelta(days=30)
+    rango = _rango_fechas(request, por_defecto=True)
+    fecha_desde, fecha_hasta = rango.desde, rango.hasta
     
     datos = calcular_flujo_caja(fecha_desde, fecha_hasta)
     
@@ -203,6 +194,7 @@ def reporte_flujo_caja(request):
 
 
 @login_required
+@lectura_reportes
 def reporte_ventas_mensuales(request):
     """
     Vista dedicada al reporte de ventas mensuales.
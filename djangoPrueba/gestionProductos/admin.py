@@ -1,5 +1,14 @@
-from django.contrib import admin
-from .models import Marca, Categoria, Productos
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.core.exceptions import ValidationError
+from django.db.models import Count
+from django.template.response import TemplateResponse
+
+from .forms import ActualizacionPreciosForm
+from .models import (
+    Marca, Categoria, Productos, MovimientoStock, ActualizacionPrecios, HistorialPrecio,
+)
+from .precios import aplicar, previsualizar
 
 # ====================
 # CONFIGURACIÓN DE MARCA
@@ -10,9 +19,13 @@ class MarcaAdmin(admin.ModelAdmin):
     search_fields = ('nombre',)
     ordering = ('nombre',)
     
+    # Conteo anotado en la consulta del listado (no un COUNT por fila)
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(num_productos=Count('Marca'))
+
+    @admin.display(description='Productos', ordering='num_productos')
     def cantidad_productos(self, obj):
-        return obj.Marca.count()
-    cantidad_productos.short_description = 'Productos'
+        return obj.num_productos
 
 
 # ====================
@@ -24,9 +37,13 @@ class CategoriaAdmin(admin.ModelAdmin):
     search_fields = ('descripcion',)
     ordering = ('descripcion',)
     
+    # Conteo anotado en la consulta del listado (no un COUNT por fila)
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(num_productos=Count('Categoria'))
+
+    @admin.display(description='Productos', ordering='num_productos')
     def cantidad_productos(self, obj):
-        return obj.Categoria.count()
-    cantidad_productos.short_description = 'Productos'
+        return obj.num_productos
 
 
 # ====================
@@ -39,6 +56,7 @@ class ProductosAdmin(admin.ModelAdmin):
         'precioUnitario', 'iva', 'stock', 'activo'
     )
     list_filter = ('activo', 'idMarca', 'idCategoria', 'fecha_creacion')
+    list_select_related = ('idMarca', 'idCategoria')
     search_fields = ('codProducto', 'nombre', 'descripcion')
     ordering = ('-fecha_creacion',)
     list_editable = ('stock', 'activo')
@@ -63,6 +81,106 @@ class ProductosAdmin(admin.ModelAdmin):
     )
 
     readonly_fields = ('fecha_creacion', 'fecha_actualizacion')
+    actions = ['actualizar_precios']
+
+    @admin.action(description='Actualizar precio o IVA de los productos seleccionados')
+    def actualizar_precios(self, request, queryset):
+        """
+        Página intermedia: el primer envío muestra la vista previa (cantidad y
+        muestra de precios nuevos), el segundo aplica los cambios (precios.aplicar).
+        """
+        enviado = 'previsualizar' in request.POST or 'aplicar' in request.POST
+        form = ActualizacionPreciosForm(request.POST if enviado else None)
+        vista_previa = None
+
+        if enviado and form.is_valid():
+            try:
+                reglas = [form.regla(productos=queryset)]
+            except ValidationError as e:
+                form.add_error('valor', e)
+            else:
+                if 'aplicar' in request.POST:
+                    lote = aplicar(reglas, request.user, form.cleaned_data['descripcion'])
+                    self.message_user(
+                        request,
+                        f"Actualización #{lote.idActualizacion}: "
+                        f"{lote.productos_afectados} productos modificados.",
+                        messages.SUCCESS,
+                    )
+                    return None
+                vista_previa = previsualizar(reglas)[0]
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Actualizar precios',
+            'opts': self.model._meta,
+            'form': form,
+            'cantidad': queryset.count(),
+            'vista_previa': vista_previa,
+            'seleccionados': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/gestionProductos/actualizar_precios.html', context)
+
+# ====================
+# CONFIGURACIÓN DE MOVIMIENTOS DE STOCK
+# ====================
+@admin.register(MovimientoStock)
+class MovimientoStockAdmin(admin.ModelAdmin):
+    list_display = (
+        'fecha', 'tipo', 'producto', 'cantidad', 'precio_unitario',
+        'subtotal', 'referencia_tipo', 'referencia_id', 'anulacion'
+    )
+    list_filter = ('tipo', 'referencia_tipo', 'anulacion')
+    list_select_related = ('producto',)
+    search_fields = ('producto__nombre', 'producto__codProducto', 'referencia_nombre')
+    date_hierarchy = 'fecha'
+
+    # El historial es append-only: solo lectura desde el admin
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+# ====================
+# CONFIGURACIÓN DE ACTUALIZACIONES DE PRECIOS
+# ====================
+@admin.register(ActualizacionPrecios)
+class ActualizacionPreciosAdmin(admin.ModelAdmin):
+    list_display = ('idActualizacion', 'fecha', 'usuario', 'descripcion', 'productos_afectados')
+    list_select_related = ('usuario',)
+    date_hierarchy = 'fecha'
+
+    # Registro de auditoría: solo lectura desde el admin
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(HistorialPrecio)
+class HistorialPrecioAdmin(admin.ModelAdmin):
+    list_display = ('producto', 'vigente_desde', 'precio_unitario', 'iva', 'actualizacion')
+    list_select_related = ('producto', 'actualizacion')
+    search_fields = ('producto__codProducto', 'producto__nombre')
+    date_hierarchy = 'vigente_desde'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 # ====================
 # PERSONALIZACIÓN DEL ADMIN SITE
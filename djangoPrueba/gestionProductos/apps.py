@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class GestionproductosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gestionProductos'
+
+    def ready(self):
+        # Recrea los triggers de búsqueda que una migración pueda haber borrado
+        from djangoPrueba.busqueda import reparar_indices
+        post_migrate.connect(reparar_indices, sender=self, dispatch_uid='busqueda_reparar_indices')
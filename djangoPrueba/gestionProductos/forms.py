@@ -1,5 +1,28 @@
 from django import forms
 from .models import Productos, Marca, Categoria
+from .precios import ReglaPrecio
+
+
+# -------------------------
+# REGLAS DE LIMPIEZA (las usa también la importación masiva)
+# -------------------------
+def limpiar_codigo(cod):
+    if len(cod) >= 10:
+        raise forms.ValidationError('El código no puede tener más de 10 caracteres')
+    return cod.upper()
+
+
+def limpiar_precio(precio):
+    if precio <= 0:
+        raise forms.ValidationError('El precio debe ser mayor a 0')
+    return precio
+
+
+def limpiar_iva(ivaProducto):
+    if ivaProducto is None or ivaProducto == "":
+        raise forms.ValidationError('Debe establecer la categoría de IVA para el producto')
+    return float(ivaProducto)
+
 
 class ProductoForm(forms.ModelForm):
     class Meta:
@@ -65,22 +88,13 @@ class ProductoForm(forms.ModelForm):
     # VALIDACIONES PERSONALIZADAS
     # -------------------------
     def clean_codProducto(self):
-        cod = self.cleaned_data.get('codProducto')
-        if len(cod) >= 10:
-            raise forms.ValidationError('El código no puede tener más de 10 caracteres')
-        return cod.upper()
+        return limpiar_codigo(self.cleaned_data.get('codProducto'))
 
     def clean_precioUnitario(self):
-        precio = self.cleaned_data.get('precioUnitario')
-        if precio <= 0:
-            raise forms.ValidationError('El precio debe ser mayor a 0')
-        return precio
+        return limpiar_precio(self.cleaned_data.get('precioUnitario'))
     
     def clean_iva(self):
-        ivaProducto = self.cleaned_data.get('iva')
-        if ivaProducto is None or ivaProducto == "":
-            raise forms.ValidationError('Debe establecer la categoría de IVA para el producto')
-        return float(ivaProducto)
+        return limpiar_iva(self.cleaned_data.get('iva'))
 
     # -------------------------
     # CONFIGURAR VISIBILIDAD DE "activo"
@@ -132,6 +146,30 @@ class BusquedaProductoForm(forms.Form):
         })
     )
 
+# ====================
+# FORMULARIO DE ACTUALIZACIÓN MASIVA DE PRECIOS
+# ====================
+class ActualizacionPreciosForm(forms.Form):
+    tipo = forms.ChoiceField(
+        label='Cambio',
+        choices=ReglaPrecio.TIPOS_CHOICES,
+    )
+    valor = forms.DecimalField(
+        label='Valor',
+        max_digits=12,
+        decimal_places=2,
+        help_text='Porcentaje (ej. 8.5 o -10), monto en $ o nuevo IVA (21, 10.5, 27 o 0).',
+    )
+    descripcion = forms.CharField(
+        label='Descripción',
+        max_length=200,
+        required=False,
+    )
+
+    def regla(self, **filtros):
+        """ReglaPrecio con los datos del form; ValidationError si no es válida."""
+        return ReglaPrecio(self.cleaned_data['tipo'], self.cleaned_data['valor'], **filtros)
+
 # ====================
 # FORMULARIO DE MARCA
 # ====================
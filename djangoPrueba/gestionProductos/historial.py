@@ -0,0 +1,98 @@
+"""
+Historial de precios de productos (modelo HistorialPrecio).
+
+Escritura: Productos.save() agrega una fila cuando cambia el precio o el
+IVA. Los cambios masivos (importación, actualizaciones de precios) usan
+registrar(), que copia los valores actuales con un único
+INSERT ... SELECT sin traer los productos a Python.
+
+Consultas "a fecha", en una sola consulta para cualquier cantidad de
+productos (cada valor es una búsqueda en el índice producto+vigente_desde):
+
+    precios_vigentes([1, 2, 3], fecha)   # {1: (precio, iva), 2: ..., 3: None}
+    con_precio_vigente(Productos.objects.filter(...), fecha)
+"""
+from decimal import Decimal
+
+from django.db import connections, router
+from django.db.models import DateTimeField, F, IntegerField, OuterRef, Subquery, Value
+
+from .models import HistorialPrecio, Productos
+
+CENTAVOS = Decimal('0.01')
+COLUMNAS = ('producto', 'vigente_desde', 'precio_unitario', 'iva', 'actualizacion')
+
+
+# -------------------------
+# ESCRITURA
+# -------------------------
+def insertar_historial(modelo, productos, vigente_desde, actualizacion=None):
+    """
+    INSERT INTO <historial> SELECT ... FROM <productos>. `modelo` es
+    HistorialPrecio y `vigente_desde` una fecha o una expresión sobre el
+    producto.
+    Devuelve la cantidad de filas insertadas.
+    """
+    if not hasattr(vigente_desde, 'resolve_expression'):
+        vigente_desde = Value(vigente_desde, output_field=DateTimeField())
+    using = router.db_for_write(modelo)
+    connection = connections[using]
+    consulta = productos.using(using).order_by().values(
+        # alias distintos de los campos de Productos; importa solo el orden
+        h_producto=F('pk'),
+        h_vigente_desde=vigente_desde,
+        h_precio_unitario=F('precioUnitario'),
+        h_iva=F('iva'),
+        h_actualizacion=Value(
+            getattr(actualizacion, 'pk', actualizacion), output_field=IntegerField()
+        ),
+    )
+    sql, params = consulta.query.sql_with_params()
+    qn = connection.ops.quote_name
+    columnas = ', '.join(qn(modelo._meta.get_field(campo).column) for campo in COLUMNAS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {qn(modelo._meta.db_table)} ({columnas}) {sql}", params)
+        return cursor.rowcount
+
+
+def registrar(productos, fecha, actualizacion=None):
+    """Agrega al historial el precio e IVA actuales de `productos` (queryset)."""
+    return insertar_historial(HistorialPrecio, productos, fecha, actualizacion)
+
+
+# -------------------------
+# CONSULTAS A FECHA
+# -------------------------
+def _vigente(fecha, campo):
+    return Subquery(
+        HistorialPrecio.objects.filter(producto=OuterRef('pk'), vigente_desde__lte=fecha)
+        .order_by('-vigente_desde', '-pk')
+        .values(campo)[:1]
+    )
+
+
+def con_precio_vigente(productos, fecha):
+    """Anota `precio_vigente` e `iva_vigente` (None si no había precio en `fecha`)."""
+    return productos.annotate(
+        precio_vigente=_vigente(fecha, 'precio_unitario'),
+        iva_vigente=_vigente(fecha, 'iva'),
+    )
+
+
+def precios_vigentes(productos, fecha):
+    """{id de producto: (precio, iva) o None} para los ids de `productos` en `fecha`."""
+    filas = con_precio_vigente(Productos.objects.filter(pk__in=productos), fecha).values_list(
+        'pk', 'precio_vigente', 'iva_vigente'
+    )
+    # SQLite no ajusta la escala de los Decimal anotados
+    return {
+        pk: (precio.quantize(CENTAVOS), iva.quantize(CENTAVOS)) if precio is not None else None
+        for pk, precio, iva in filas
+    }
+
+
+def evolucion(producto):
+    """Cambios de precio de un producto en orden cronológico (para graficar)."""
+    return HistorialPrecio.objects.filter(producto=producto).order_by(
+        'vigente_desde', 'pk'
+    ).values_list('vigente_desde', 'precio_unitario', 'iva')
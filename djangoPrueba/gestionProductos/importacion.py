@@ -0,0 +1,354 @@
+"""
+Importación masiva del catálogo de productos (comando importar_productos).
+
+Las filas se leen de a una desde CSV, JSON Lines o JSON y se procesan por
+lotes. En cada lote:
+
+1. Cada columna se limpia completa con las reglas de ProductoForm
+   (limpiar_codigo, limpiar_precio, limpiar_iva) y las del modelo.
+2. Marca y Categoria se resuelven por nombre con mapas en memoria; las
+   que no existen se crean con un bulk_create por lote.
+3. Los productos se insertan o actualizan por codProducto con un único
+   bulk_create(update_conflicts=True).
+4. Los productos nuevos o con otro precio/IVA se agregan al historial de
+   precios con un INSERT ... SELECT.
+
+Las filas inválidas no detienen la importación: se informan con su número
+de fila. El stock solo se toma al crear un producto; en los existentes lo
+manejan las compras y ventas.
+"""
+import csv
+import json
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .forms import limpiar_codigo, limpiar_iva, limpiar_precio
+from .historial import registrar
+from .models import Categoria, Marca, Productos
+from .precios import IVAS_VALIDOS
+
+FORMATO_CSV = 'csv'
+FORMATO_JSON = 'json'
+FORMATO_JSONL = 'jsonl'
+FORMATOS = (FORMATO_CSV, FORMATO_JSON, FORMATO_JSONL)
+
+COLUMNAS_REQUERIDAS = (
+    'codProducto', 'nombre', 'descripcion', 'precioUnitario', 'marca', 'categoria', 'iva',
+)
+COLUMNAS_OPCIONALES = ('imgUrl', 'stock', 'activo')
+
+# Nombres alternativos aceptados en el encabezado
+ALIAS = {
+    'codigo': 'codProducto',
+    'código': 'codProducto',
+    'precio': 'precioUnitario',
+    'imagen': 'imgUrl',
+    'categoría': 'categoria',
+    'descripción': 'descripcion',
+}
+
+VERDADEROS = {'1', 'si', 'sí', 's', 'true', 'verdadero', 'x'}
+FALSOS = {'0', 'no', 'n', 'false', 'falso', ''}
+
+ErrorFila = namedtuple('ErrorFila', 'fila codigo mensaje')
+
+
+class ImportacionInvalida(ValueError):
+    pass
+
+
+class ResultadoImportacion:
+    def __init__(self):
+        self.creados = 0
+        self.actualizados = 0
+        self.marcas_creadas = 0
+        self.categorias_creadas = 0
+        self.errores = []
+
+    @property
+    def procesados(self):
+        return self.creados + self.actualizados + len(self.errores)
+
+
+# -------------------------
+# LECTURA
+# -------------------------
+def _normalizar_clave(clave):
+    clave = (clave or '').strip()
+    return ALIAS.get(clave.lower(), clave)
+
+
+def _normalizar(fila):
+    return {_normalizar_clave(k): v for k, v in fila.items()}
+
+
+def leer_filas(archivo, formato):
+    """Genera (número de fila, dict) sin cargar el archivo completo (salvo JSON)."""
+    if formato == FORMATO_CSV:
+        lector = csv.DictReader(archivo)
+        faltantes = set(COLUMNAS_REQUERIDAS) - {_normalizar_clave(c) for c in lector.fieldnames or ()}
+        if faltantes:
+            raise ImportacionInvalida(f"Faltan columnas: {', '.join(sorted(faltantes))}")
+        for fila in lector:
+            yield lector.line_num, _normalizar(fila)
+    elif formato == FORMATO_JSONL:
+        for numero, linea in enumerate(archivo, start=1):
+            if linea.strip():
+                yield numero, _normalizar(json.loads(linea))
+    elif formato == FORMATO_JSON:
+        # un array JSON no se puede leer por partes sin una dependencia extra
+        datos = json.load(archivo)
+        if not isinstance(datos, list):
+            raise ImportacionInvalida('El JSON debe ser una lista de productos')
+        for numero, fila in enumerate(datos, start=1):
+            yield numero, _normalizar(fila)
+    else:
+        raise ImportacionInvalida(f"Formato no soportado: {formato}")
+
+
+# -------------------------
+# LIMPIEZA POR COLUMNA
+# -------------------------
+def _texto(max_length, requerido=True):
+    def limpiar(valor):
+        valor = '' if valor is None else str(valor).strip()
+        if requerido and not valor:
+            raise ValidationError('Este campo es obligatorio')
+        if max_length and len(valor) > max_length:
+            raise ValidationError(f'Máximo {max_length} caracteres')
+        return valor
+    return limpiar
+
+
+def _decimal(valor):
+    try:
+        numero = Decimal(str(valor).strip().replace(',', '.'))
+    except InvalidOperation:
+        numero = None
+    if numero is None or not numero.is_finite():
+        raise ValidationError(f'Número inválido: {valor}')
+    return numero
+
+
+def _codigo(valor):
+    return limpiar_codigo(_texto(None)(valor))
+
+
+def _precio(valor):
+    precio = limpiar_precio(_decimal(valor))
+    if precio.as_tuple().exponent < -2:
+        raise ValidationError('El precio admite hasta 2 decimales')
+    return precio
+
+
+def _iva(valor):
+    if valor is not None and str(valor).strip() != '':
+        valor = _decimal(valor)
+    iva = Decimal(str(limpiar_iva(valor)))
+    if iva not in IVAS_VALIDOS:
+        raise ValidationError(f'IVA inválido: {valor}')
+    return iva.quantize(Decimal('0.01'))
+
+
+def _stock(valor):
+    if valor is None or str(valor).strip() == '':
+        return 0
+    try:
+        stock = int(str(valor).strip())
+    except ValueError:
+        raise ValidationError(f'Stock inválido: {valor}')
+    if stock < 0:
+        raise ValidationError('El stock no puede ser negativo')
+    return stock
+
+
+def _activo(valor):
+    if valor is None:
+        return True
+    if isinstance(valor, bool):
+        return valor
+    texto = str(valor).strip().lower()
+    if texto in VERDADEROS:
+        return True
+    if texto in FALSOS:
+        return False
+    raise ValidationError(f'Valor de activo inválido: {valor}')
+
+
+def _campo_max(modelo, campo):
+    return modelo._meta.get_field(campo).max_length
+
+
+REGLAS = {
+    'codProducto': _codigo,
+    'nombre': _texto(_campo_max(Productos, 'nombre')),
+    'descripcion': _texto(None),
+    'precioUnitario': _precio,
+    'marca': _texto(_campo_max(Marca, 'nombre')),
+    'categoria': _texto(_campo_max(Categoria, 'descripcion')),
+    'iva': _iva,
+    'imgUrl': _texto(_campo_max(Productos, 'imgUrl'), requerido=False),
+    'stock': _stock,
+    'activo': _activo,
+}
+
+
+def limpiar_lote(filas):
+    """
+    Aplica REGLAS columna por columna a un lote de (número, dict).
+    Devuelve (filas limpias, errores); una fila con algún error se descarta.
+    """
+    columnas = {campo: [fila.get(campo) for _, fila in filas] for campo in REGLAS}
+    limpias = {campo: [None] * len(filas) for campo in REGLAS}
+    errores = {}
+
+    for campo, regla in REGLAS.items():
+        valores = limpias[campo]
+        for i, valor in enumerate(columnas[campo]):
+            try:
+                valores[i] = regla(valor)
+            except ValidationError as e:
+                errores.setdefault(i, []).append(f"{campo}: {' '.join(e.messages)}")
+
+    resultado = [
+        (numero, {campo: limpias[campo][i] for campo in REGLAS})
+        for i, (numero, _) in enumerate(filas) if i not in errores
+    ]
+    lista_errores = [
+        ErrorFila(filas[i][0], str(filas[i][1].get('codProducto') or ''), '; '.join(mensajes))
+        for i, mensajes in sorted(errores.items())
+    ]
+    return resultado, lista_errores
+
+
+# -------------------------
+# IMPORTACIÓN
+# -------------------------
+class ImportadorProductos:
+    def __init__(self, lote=1000, simular=False):
+        self.lote = lote
+        self.simular = simular
+        self.resultado = ResultadoImportacion()
+        self._codigos_vistos = {}
+        self._marcas = None
+        self._categorias = None
+
+    def importar(self, filas):
+        lote = []
+        for fila in filas:
+            lote.append(fila)
+            if len(lote) >= self.lote:
+                self._procesar(lote)
+                lote = []
+        if lote:
+            self._procesar(lote)
+        return self.resultado
+
+    def _procesar(self, filas):
+        presentes = {campo for _, fila in filas for campo in fila}
+        limpias, errores = limpiar_lote(filas)
+        self.resultado.errores.extend(errores)
+        limpias = [fila for _, fila in self._descartar_repetidos(limpias)]
+        if not limpias:
+            return
+
+        codigos = [fila['codProducto'] for fila in limpias]
+        existentes = {
+            codigo: (precio, iva)
+            for codigo, precio, iva in Productos.objects.filter(
+                codProducto__in=codigos
+            ).values_list('codProducto', 'precioUnitario', 'iva')
+        }
+        self.resultado.actualizados += len(existentes)
+        self.resultado.creados += len(limpias) - len(existentes)
+        if self.simular:
+            return
+
+        # nuevos o con precio/IVA distinto: van al historial de precios
+        cambiados = [
+            fila['codProducto'] for fila in limpias
+            if existentes.get(fila['codProducto']) != (fila['precioUnitario'], fila['iva'])
+        ]
+
+        with transaction.atomic():
+            self.resultado.marcas_creadas += self._resolver(
+                Marca, 'nombre', self.marcas, {fila['marca'] for fila in limpias}
+            )
+            self.resultado.categorias_creadas += self._resolver(
+                Categoria, 'descripcion', self.categorias, {fila['categoria'] for fila in limpias}
+            )
+            self._guardar(limpias, presentes)
+            if cambiados:
+                registrar(Productos.objects.filter(codProducto__in=cambiados), timezone.now())
+
+    def _descartar_repetidos(self, limpias):
+        unicas = []
+        for numero, fila in limpias:
+            codigo = fila['codProducto']
+            if codigo in self._codigos_vistos:
+                self.resultado.errores.append(ErrorFila(
+                    numero, codigo, f"codProducto repetido (fila {self._codigos_vistos[codigo]})"
+                ))
+                continue
+            self._codigos_vistos[codigo] = numero
+            unicas.append((numero, fila))
+        return unicas
+
+    # Mapas nombre en minúsculas → id, cargados una vez por importación
+    @property
+    def marcas(self):
+        if self._marcas is None:
+            self._marcas = {n.lower(): pk for pk, n in Marca.objects.values_list('pk', 'nombre')}
+        return self._marcas
+
+    @property
+    def categorias(self):
+        if self._categorias is None:
+            self._categorias = {
+                n.lower(): pk for pk, n in Categoria.objects.values_list('pk', 'descripcion')
+            }
+        return self._categorias
+
+    def _resolver(self, modelo, campo, mapa, nombres):
+        nuevos = {}
+        for nombre in nombres:
+            if nombre.lower() not in mapa:
+                nuevos.setdefault(nombre.lower(), nombre)
+        if not nuevos:
+            return 0
+        creados = modelo.objects.bulk_create([modelo(**{campo: n}) for n in nuevos.values()])
+        for obj in creados:
+            mapa[getattr(obj, campo).lower()] = obj.pk
+        return len(creados)
+
+    def _guardar(self, filas, presentes):
+        productos = [
+            Productos(
+                codProducto=fila['codProducto'],
+                nombre=fila['nombre'],
+                descripcion=fila['descripcion'],
+                imgUrl=fila['imgUrl'],
+                precioUnitario=fila['precioUnitario'],
+                idMarca_id=self.marcas[fila['marca'].lower()],
+                idCategoria_id=self.categorias[fila['categoria'].lower()],
+                iva=fila['iva'],
+                stock=fila['stock'],
+                activo=fila['activo'],
+            )
+            for fila in filas
+        ]
+        Productos.objects.bulk_create(
+            productos,
+            update_conflicts=True,
+            unique_fields=['codProducto'],
+            update_fields=[
+                'nombre', 'descripcion', 'precioUnitario', 'idMarca', 'idCategoria', 'iva',
+                'fecha_actualizacion',
+                # las columnas opcionales ausentes no pisan los valores actuales
+                *[campo for campo in ('imgUrl', 'activo') if campo in presentes],
+            ],
+        )
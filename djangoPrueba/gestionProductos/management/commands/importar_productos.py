@@ -0,0 +1,84 @@
+import csv
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestionInformes.estadisticas import invalidar
+from gestionProductos.importacion import (
+    COLUMNAS_OPCIONALES,
+    COLUMNAS_REQUERIDAS,
+    FORMATOS,
+    ImportacionInvalida,
+    ImportadorProductos,
+    leer_filas,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa o actualiza productos por codProducto desde un archivo CSV, "
+        "JSON Lines o JSON. Columnas: %s (opcionales: %s). Marcas y categorías "
+        "se buscan por nombre y se crean si no existen."
+        % (', '.join(COLUMNAS_REQUERIDAS), ', '.join(COLUMNAS_OPCIONALES))
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo a importar.')
+        parser.add_argument(
+            '--formato',
+            choices=FORMATOS,
+            help='Formato del archivo (por defecto, según la extensión).',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Cantidad de productos por INSERT (default: 1000).',
+        )
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Solo valida el archivo e informa los errores, sin guardar.',
+        )
+        parser.add_argument(
+            '--errores',
+            help='Guarda los errores por fila en este archivo CSV.',
+        )
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or os.path.splitext(options['archivo'])[1].lstrip('.').lower()
+        if formato not in FORMATOS:
+            raise CommandError(f"No se reconoce el formato de {options['archivo']}; usar --formato.")
+
+        importador = ImportadorProductos(lote=options['lote'], simular=options['simular'])
+        try:
+            with open(options['archivo'], encoding='utf-8-sig', newline='') as archivo:
+                resultado = importador.importar(leer_filas(archivo, formato))
+        except OSError as e:
+            raise CommandError(str(e))
+        except (ImportacionInvalida, ValueError) as e:
+            raise CommandError(f"Archivo inválido: {e}")
+        finally:
+            # bulk_create no dispara post_save: invalidar los contadores a mano
+            if not options['simular']:
+                invalidar('productos')
+
+        for error in resultado.errores[:20]:
+            self.stderr.write(f"Fila {error.fila} ({error.codigo}): {error.mensaje}")
+        if len(resultado.errores) > 20:
+            self.stderr.write(f"... y {len(resultado.errores) - 20} errores más.")
+        if options['errores']:
+            with open(options['errores'], 'w', encoding='utf-8', newline='') as salida:
+                escritor = csv.writer(salida)
+                escritor.writerow(['fila', 'codigo', 'error'])
+                escritor.writerows(resultado.errores)
+
+        self.stdout.write(
+            f"Procesados: {resultado.procesados}. Creados: {resultado.creados}, "
+            f"actualizados: {resultado.actualizados}, con errores: {len(resultado.errores)}. "
+            f"Marcas nuevas: {resultado.marcas_creadas}, categorías nuevas: {resultado.categorias_creadas}."
+        )
+        if options['simular']:
+            self.stdout.write(self.style.WARNING("Simulación: no se guardó ningún cambio."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Importación terminada."))
@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from gestionProductos.models import MovimientoStock
+from gestionCompras.models import DetalleCompra
+from gestionVentas.models import DetalleVenta
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga el historial de MovimientoStock a partir de las compras y ventas "
+        "confirmadas. Los documentos que ya tienen movimientos se omiten."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reemplazar',
+            action='store_true',
+            help='Borra todos los movimientos existentes antes de cargar.',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=2000,
+            help='Cantidad de filas por INSERT (default: 2000).',
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+
+        with transaction.atomic():
+            if options['reemplazar']:
+                borrados, _ = MovimientoStock.objects.all().delete()
+                self.stdout.write(f"Movimientos eliminados: {borrados}")
+
+            compras_cargadas = self._ya_cargados(MovimientoStock.REFERENCIA_COMPRA)
+            ventas_cargadas = self._ya_cargados(MovimientoStock.REFERENCIA_VENTA)
+
+            detalles_compra = (
+                DetalleCompra.objects
+                .filter(compra__estado='CONFIRMADA')
+                .select_related('compra', 'compra__proveedor')
+                .order_by('compra__fecha_compra', 'idDetalleCompra')
+            )
+            entradas = self._cargar(
+                (MovimientoStock.desde_detalle_compra(det)
+                 for det in detalles_compra.iterator(chunk_size=lote)
+                 if det.compra_id not in compras_cargadas),
+                lote,
+            )
+
+            detalles_venta = (
+                DetalleVenta.objects
+                .filter(venta__estado='CONFIRMADA')
+                .select_related('venta', 'venta__cliente')
+                .order_by('venta__fecha_venta', 'idDetalleVenta')
+            )
+            salidas = self._cargar(
+                (MovimientoStock.desde_detalle_venta(det)
+                 for det in detalles_venta.iterator(chunk_size=lote)
+                 if det.venta_id not in ventas_cargadas),
+                lote,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Movimientos creados: {entradas} entradas, {salidas} salidas."
+        ))
+
+    def _ya_cargados(self, referencia_tipo):
+        # Se materializa antes de insertar para no leer los movimientos recién creados
+        return set(MovimientoStock.objects.filter(
+            referencia_tipo=referencia_tipo
+        ).values_list('referencia_id', flat=True).distinct())
+
+    def _cargar(self, movimientos, lote):
+        total = 0
+        buffer = []
+        for mov in movimientos:
+            buffer.append(mov)
+            if len(buffer) >= lote:
+                MovimientoStock.objects.bulk_create(buffer)
+                total += len(buffer)
+                buffer = []
+        if buffer:
+            MovimientoStock.objects.bulk_create(buffer)
+            total += len(buffer)
+        return total
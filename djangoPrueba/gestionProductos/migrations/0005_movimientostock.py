@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-18 18:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionProductos', '0004_alter_productos_preciounitario'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productos',
+            name='idCategoria',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='Categoria', to='gestionProductos.categoria'),
+        ),
+        migrations.AlterField(
+            model_name='productos',
+            name='idMarca',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='Marca', to='gestionProductos.marca'),
+        ),
+        migrations.CreateModel(
+            name='MovimientoStock',
+            fields=[
+                ('idMovimiento', models.AutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('tipo', models.CharField(choices=[('entrada', 'Entrada'), ('salida', 'Salida')], max_length=10)),
+                ('cantidad', models.IntegerField()),
+                ('precio_unitario', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('referencia_tipo', models.CharField(choices=[('Compra', 'Compra'), ('Venta', 'Venta')], max_length=10)),
+                ('referencia_id', models.IntegerField()),
+                ('referencia_nombre', models.CharField(blank=True, default='', max_length=200)),
+                ('anulacion', models.BooleanField(default=False)),
+                ('observacion', models.TextField(blank=True, default='')),
+                ('fecha_registro', models.DateTimeField(auto_now_add=True)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='movimientos', to='gestionProductos.productos')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de stock',
+                'verbose_name_plural': 'Movimientos de stock',
+                'ordering': ['-fecha', '-idMovimiento'],
+                'indexes': [models.Index(fields=['producto', 'fecha'], name='movstock_producto_fecha_idx'), models.Index(fields=['fecha'], name='movstock_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionProductos', '0005_movimientostock'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productos',
+            index=models.Index(fields=['codProducto'], name='producto_codigo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productos',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['stock'], name='producto_activo_stock_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+from djangoPrueba.busqueda import migracion_fts5
+
+
+# DDL congelado: no depende de la definición actual del modelo
+CREAR = [
+    """
+    CREATE VIRTUAL TABLE "gestionProductos_productos_fts" USING fts5(
+        "codProducto", "nombre", "descripcion",
+        content='gestionProductos_productos', content_rowid='idProducto',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER "gestionProductos_productos_fts_ai" AFTER INSERT ON "gestionProductos_productos" BEGIN
+        INSERT INTO "gestionProductos_productos_fts"(rowid, "codProducto", "nombre", "descripcion") VALUES (new."idProducto", new."codProducto", new."nombre", new."descripcion");
+    END
+    """,
+    """
+    CREATE TRIGGER "gestionProductos_productos_fts_ad" AFTER DELETE ON "gestionProductos_productos" BEGIN
+        INSERT INTO "gestionProductos_productos_fts"("gestionProductos_productos_fts", rowid, "codProducto", "nombre", "descripcion") VALUES ('delete', old."idProducto", old."codProducto", old."nombre", old."descripcion");
+    END
+    """,
+    """
+    CREATE TRIGGER "gestionProductos_productos_fts_au" AFTER UPDATE OF "codProducto", "nombre", "descripcion" ON "gestionProductos_productos" BEGIN
+        INSERT INTO "gestionProductos_productos_fts"("gestionProductos_productos_fts", rowid, "codProducto", "nombre", "descripcion") VALUES ('delete', old."idProducto", old."codProducto", old."nombre", old."descripcion");
+        INSERT INTO "gestionProductos_productos_fts"(rowid, "codProducto", "nombre", "descripcion") VALUES (new."idProducto", new."codProducto", new."nombre", new."descripcion");
+    END
+    """,
+    """INSERT INTO "gestionProductos_productos_fts"("gestionProductos_productos_fts") VALUES ('rebuild')""",
+]
+
+BORRAR = [
+    'DROP TRIGGER IF EXISTS "gestionProductos_productos_fts_ai"',
+    'DROP TRIGGER IF EXISTS "gestionProductos_productos_fts_ad"',
+    'DROP TRIGGER IF EXISTS "gestionProductos_productos_fts_au"',
+    'DROP TABLE IF EXISTS "gestionProductos_productos_fts"',
+]
+
+
+class Migration(migrations.Migration):
+    """Tabla FTS5 y triggers para la búsqueda de texto (solo SQLite, ver djangoPrueba.busqueda)."""
+
+    dependencies = [
+        ('gestionProductos', '0006_indices_consultas_frecuentes'),
+    ]
+
+    operations = [
+        migracion_fts5(CREAR, BORRAR),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 18:51
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def verificar_codigos_repetidos(apps, schema_editor):
+    Productos = apps.get_model('gestionProductos', 'Productos')
+    repetidos = list(
+        Productos.objects.order_by().values('codProducto')
+        .annotate(cantidad=Count('pk')).filter(cantidad__gt=1)
+        .values_list('codProducto', flat=True)[:10]
+    )
+    if repetidos:
+        raise RuntimeError(
+            "Hay códigos de producto repetidos (%s). Corregirlos antes de migrar."
+            % ', '.join(repetidos)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionProductos', '0007_busqueda_texto'),
+    ]
+
+    operations = [
+        migrations.RunPython(verificar_codigos_repetidos, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='productos',
+            name='producto_codigo_idx',
+        ),
+        migrations.AlterField(
+            model_name='productos',
+            name='codProducto',
+            field=models.CharField(max_length=10, unique=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 18:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionProductos', '0008_codigo_unico'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActualizacionPrecios',
+            fields=[
+                ('idActualizacion', models.AutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('descripcion', models.CharField(blank=True, default='', max_length=200)),
+                ('reglas', models.JSONField(default=list)),
+                ('productos_afectados', models.IntegerField(default=0)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='actualizaciones_precios', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Actualización de precios',
+                'verbose_name_plural': 'Actualizaciones de precios',
+                'ordering': ['-fecha'],
+            },
+        ),
+    ]
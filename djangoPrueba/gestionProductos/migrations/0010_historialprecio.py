@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-18 18:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def cargar_precios_actuales(apps, schema_editor):
+    # El precio actual es el único conocido: se toma vigente desde el alta.
+    # Copia fija del INSERT ... SELECT de historial.registrar() con los
+    # modelos históricos, para que no cambie si cambia el código de la app.
+    Productos = apps.get_model('gestionProductos', 'Productos')
+    HistorialPrecio = apps.get_model('gestionProductos', 'HistorialPrecio')
+    qn = schema_editor.quote_name
+    producto = Productos._meta.get_field
+    historial = HistorialPrecio._meta.get_field
+    schema_editor.execute(
+        f"INSERT INTO {qn(HistorialPrecio._meta.db_table)} "
+        f"({qn(historial('producto').column)}, {qn(historial('vigente_desde').column)}, "
+        f"{qn(historial('precio_unitario').column)}, {qn(historial('iva').column)}) "
+        f"SELECT {qn(producto('idProducto').column)}, {qn(producto('fecha_creacion').column)}, "
+        f"{qn(producto('precioUnitario').column)}, {qn(producto('iva').column)} "
+        f"FROM {qn(Productos._meta.db_table)}"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionProductos', '0009_actualizacionprecios'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistorialPrecio',
+            fields=[
+                ('idHistorial', models.BigAutoField(primary_key=True, serialize=False)),
+                ('vigente_desde', models.DateTimeField(default=django.utils.timezone.now)),
+                ('precio_unitario', models.DecimalField(decimal_places=2, max_digits=18)),
+                ('iva', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('actualizacion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='historial', to='gestionProductos.actualizacionprecios')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historial_precios', to='gestionProductos.productos')),
+            ],
+            options={
+                'verbose_name': 'Historial de precio',
+                'verbose_name_plural': 'Historial de precios',
+                'ordering': ['producto', '-vigente_desde'],
+                'indexes': [models.Index(fields=['producto', 'vigente_desde'], name='histprecio_prod_desde_idx')],
+            },
+        ),
+        migrations.RunPython(cargar_precios_actuales, migrations.RunPython.noop),
+    ]
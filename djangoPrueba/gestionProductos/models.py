@@ -1,4 +1,8 @@
+from decimal import Decimal
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 
@@ -39,7 +43,7 @@ class Productos(models.Model):
 
 
     idProducto = models.AutoField(primary_key=True)
-    codProducto = models.CharField(max_length=10)
+    codProducto = models.CharField(max_length=10, unique=True)
     nombre = models.CharField(max_length=150)
     descripcion = models.TextField()
     imgUrl = models.CharField(max_length=500, default='')
@@ -63,9 +67,195 @@ class Productos(models.Model):
     class Meta:
         verbose_name = 'Producto'
         verbose_name_plural = 'Productos'
+        indexes = [
+            # activos con bajo stock / con stock disponible. Índice parcial:
+            # Django filtra booleanos como `WHERE activo`, que un índice
+            # compuesto (activo, stock) no aprovecha en SQLite.
+            models.Index(fields=['stock'], condition=models.Q(activo=True), name='producto_activo_stock_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # precio e IVA leídos (None si se difirieron), para saber si save() los cambia
+        instancia._precio_guardado = (
+            instancia.__dict__.get('precioUnitario'), instancia.__dict__.get('iva')
+        )
+        return instancia
+
+    def save(self, *args, **kwargs):
+        nuevo = self._state.adding
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'precioUnitario', 'iva'} & set(update_fields):
+            return
+        actual = (self.__dict__.get('precioUnitario'), self.__dict__.get('iva'))
+        if nuevo or _precio_distinto(getattr(self, '_precio_guardado', (None, None)), actual):
+            HistorialPrecio.objects.create(
+                producto=self,
+                # con update_fields parciales auto_now no actualiza la fecha
+                vigente_desde=self.fecha_actualizacion if update_fields is None else timezone.now(),
+                precio_unitario=self.precioUnitario,
+                iva=self.iva,
+            )
+        self._precio_guardado = actual
+
+
+def _precio_distinto(guardado, actual):
+    # iva puede llegar como float (el default del campo)
+    return any(
+        nuevo is not None and (viejo is None or Decimal(str(viejo)) != Decimal(str(nuevo)))
+        for viejo, nuevo in zip(guardado, actual)
+    )
+
+
+class MovimientoStock(models.Model):
+    """
+    Registro append-only de cada entrada o salida de stock.
+    Se escribe al confirmar ventas/compras y al anular compras confirmadas,
+    así el historial de transferencias se lee directo de la base.
+    """
+    TIPO_ENTRADA = 'entrada'
+    TIPO_SALIDA = 'salida'
+    TIPOS_CHOICES = [
+        (TIPO_ENTRADA, 'Entrada'),
+        (TIPO_SALIDA, 'Salida'),
+    ]
+
+    REFERENCIA_COMPRA = 'Compra'
+    REFERENCIA_VENTA = 'Venta'
+    REFERENCIAS_CHOICES = [
+        (REFERENCIA_COMPRA, 'Compra'),
+        (REFERENCIA_VENTA, 'Venta'),
+    ]
+
+    idMovimiento = models.AutoField(primary_key=True)
+    producto = models.ForeignKey(Productos, on_delete=models.PROTECT, related_name='movimientos')
+    fecha = models.DateTimeField(default=timezone.now)
+    tipo = models.CharField(max_length=10, choices=TIPOS_CHOICES)
+    cantidad = models.IntegerField()
+    precio_unitario = models.DecimalField(max_digits=12, decimal_places=2)
+    subtotal = models.DecimalField(max_digits=14, decimal_places=2)
+
+    # Documento que originó el movimiento (sin FK para no acoplar apps)
+    referencia_tipo = models.CharField(max_length=10, choices=REFERENCIAS_CHOICES)
+    referencia_id = models.IntegerField()
+    referencia_nombre = models.CharField(max_length=200, blank=True, default='')
+    anulacion = models.BooleanField(default=False)
+    observacion = models.TextField(blank=True, default='')
 
+    fecha_registro = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Movimiento de stock'
+        verbose_name_plural = 'Movimientos de stock'
+        ordering = ['-fecha', '-idMovimiento']
+        indexes = [
+            models.Index(fields=['producto', 'fecha'], name='movstock_producto_fecha_idx'),
+            models.Index(fields=['fecha'], name='movstock_fecha_idx'),
+        ]
+
+    def __str__(self):
+        signo = '+' if self.tipo == self.TIPO_ENTRADA else '-'
+        return f"{signo}{self.cantidad} {self.producto_id} ({self.referencia_tipo} #{self.referencia_id})"
 
+    @classmethod
+    def desde_detalle_compra(cls, detalle, anulacion=False, fecha=None):
+        """Arma (sin guardar) el movimiento de un DetalleCompra."""
+        compra = detalle.compra
+        return cls(
+            producto_id=detalle.producto_id,
+            fecha=fecha or compra.fecha_compra,
+            tipo=cls.TIPO_SALIDA if anulacion else cls.TIPO_ENTRADA,
+            cantidad=detalle.cantidad,
+            precio_unitario=detalle.precio_unitario,
+            subtotal=detalle.subtotal,
+            referencia_tipo=cls.REFERENCIA_COMPRA,
+            referencia_id=compra.idCompra,
+            referencia_nombre=compra.proveedor.razon_social,
+            anulacion=anulacion,
+            observacion=detalle.observacion or '',
+        )
+
+    @classmethod
+    def desde_detalle_venta(cls, detalle, anulacion=False, fecha=None):
+        """Arma (sin guardar) el movimiento de un DetalleVenta."""
+        venta = detalle.venta
+        return cls(
+            producto_id=detalle.producto_id,
+            fecha=fecha or venta.fecha_venta,
+            tipo=cls.TIPO_ENTRADA if anulacion else cls.TIPO_SALIDA,
+            cantidad=detalle.cantidad,
+            precio_unitario=detalle.precio_unitario,
+            subtotal=detalle.subtotal,
+            referencia_tipo=cls.REFERENCIA_VENTA,
+            referencia_id=venta.idVenta,
+            referencia_nombre=venta.cliente.nombre_completo(),
+            anulacion=anulacion,
+            observacion=detalle.observacion or '',
+        )
+
+
+class ActualizacionPrecios(models.Model):
+    """
+    Lote de cambios masivos de precio o IVA (ver gestionProductos.precios).
+    Guarda las reglas aplicadas y cuántos productos alcanzó cada una; los
+    precios de las ventas ya registradas quedan en sus detalles.
+    """
+    idActualizacion = models.AutoField(primary_key=True)
+    fecha = models.DateTimeField(default=timezone.now)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='actualizaciones_precios',
+    )
+    descripcion = models.CharField(max_length=200, blank=True, default='')
+    # [{"tipo": "porcentaje", "valor": "10", "categoria": 3, ..., "afectados": 120}]
+    reglas = models.JSONField(default=list)
+    productos_afectados = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Actualización de precios'
+        verbose_name_plural = 'Actualizaciones de precios'
+        ordering = ['-fecha']
+
+    def __str__(self):
+        return f"Actualización #{self.idActualizacion} ({self.productos_afectados} productos)"
+
+
+class HistorialPrecio(models.Model):
+    """
+    Registro append-only del precio e IVA de cada producto. Cada fila vale
+    desde `vigente_desde` hasta la siguiente del mismo producto; se escribe
+    en Productos.save() y, con un INSERT ... SELECT, en la importación y en
+    las actualizaciones masivas (ver gestionProductos.historial).
+    """
+    idHistorial = models.BigAutoField(primary_key=True)
+    producto = models.ForeignKey(Productos, on_delete=models.CASCADE, related_name='historial_precios')
+    vigente_desde = models.DateTimeField(default=timezone.now)
+    precio_unitario = models.DecimalField(max_digits=18, decimal_places=2)
+    iva = models.DecimalField(max_digits=4, decimal_places=2)
+    # Lote masivo que originó el cambio (vacío en ediciones individuales)
+    actualizacion = models.ForeignKey(
+        ActualizacionPrecios,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='historial',
+    )
+
+    class Meta:
+        verbose_name = 'Historial de precio'
+        verbose_name_plural = 'Historial de precios'
+        ordering = ['producto', '-vigente_desde']
+        indexes = [
+            models.Index(fields=['producto', 'vigente_desde'], name='histprecio_prod_desde_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.producto_id}: ${self.precio_unitario} desde {self.vigente_desde:%d/%m/%Y}"
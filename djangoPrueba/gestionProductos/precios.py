@@ -0,0 +1,156 @@
+"""
+Actualización masiva de precios e IVA.
+
+Una regla cambia el precio en un porcentaje o un monto fijo, o asigna un
+tramo de IVA, a los productos de una categoría, marca, proveedor o lista
+de ids. Cada regla se aplica con UPDATE sobre los ids de su alcance; el
+nuevo precio se calcula y redondea a 2 decimales en la base (ROUND), sin
+traer los productos a Python.
+
+    reglas = [ReglaPrecio(ReglaPrecio.PORCENTAJE, '8.5', categoria=3)]
+    previsualizar(reglas)                 # cantidades y muestra, sin cambios
+    aplicar(reglas, usuario=request.user)  # UPDATE + ActualizacionPrecios
+"""
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import DecimalField, F, Q, Value
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from .historial import registrar
+from .models import ActualizacionPrecios, Productos
+
+IVAS_VALIDOS = {Decimal(str(valor)) for valor, _ in Productos.OPCIONES_IVA}
+# ids por UPDATE / INSERT del historial (límite de parámetros de SQLite)
+LOTE = 500
+
+
+class ReglaPrecio:
+    PORCENTAJE = 'porcentaje'
+    MONTO = 'monto'
+    IVA = 'iva'
+    TIPOS_CHOICES = [
+        (PORCENTAJE, 'Porcentaje sobre el precio'),
+        (MONTO, 'Monto fijo sobre el precio'),
+        (IVA, 'Cambiar IVA'),
+    ]
+
+    def __init__(self, tipo, valor, categoria=None, marca=None, proveedor=None, productos=None):
+        self.tipo = tipo
+        self.valor = Decimal(str(valor))
+        self.categoria = categoria
+        self.marca = marca
+        self.proveedor = proveedor
+        # lista de ids o queryset (ej. la selección del admin)
+        self.productos = productos
+        self.validar()
+
+    def validar(self):
+        if self.tipo not in dict(self.TIPOS_CHOICES):
+            raise ValidationError(f"Tipo de regla inválido: {self.tipo}")
+        if self.tipo == self.PORCENTAJE and self.valor <= -100:
+            raise ValidationError('El porcentaje debe ser mayor a -100')
+        if self.tipo == self.IVA and self.valor not in IVAS_VALIDOS:
+            raise ValidationError(f"IVA inválido: {self.valor}")
+
+    @property
+    def campo(self):
+        return 'iva' if self.tipo == self.IVA else 'precioUnitario'
+
+    def alcance(self):
+        """Productos a los que aplica la regla (sin contar los que no cambian)."""
+        productos = Productos.objects.all()
+        if self.categoria:
+            productos = productos.filter(idCategoria_id=self.categoria)
+        if self.marca:
+            productos = productos.filter(idMarca_id=self.marca)
+        if self.proveedor:
+            productos = productos.filter(productoproveedor__proveedor_id=self.proveedor)
+        if self.productos is not None:
+            productos = productos.filter(pk__in=self.productos)
+
+        if self.tipo == self.IVA:
+            return productos.exclude(iva=self.valor)
+        # el precio debe seguir siendo mayor a 0 y distinto del actual
+        return productos.alias(valor_nuevo=self.expresion()).filter(
+            Q(valor_nuevo__gt=0) & ~Q(valor_nuevo=F('precioUnitario'))
+        )
+
+    def expresion(self):
+        """Nuevo valor del campo, calculado en la base."""
+        salida = DecimalField(max_digits=18, decimal_places=2)
+        if self.tipo == self.IVA:
+            return Value(self.valor, output_field=DecimalField(max_digits=4, decimal_places=2))
+        if self.tipo == self.PORCENTAJE:
+            factor = Value(1 + self.valor / 100, output_field=DecimalField())
+            return Round(F('precioUnitario') * factor, 2, output_field=salida)
+        return Round(F('precioUnitario') + Value(self.valor, output_field=DecimalField()), 2,
+                     output_field=salida)
+
+    def como_dict(self):
+        return {
+            'tipo': self.tipo,
+            'valor': str(self.valor),
+            'categoria': self.categoria,
+            'marca': self.marca,
+            'proveedor': self.proveedor,
+            'productos': list(self.productos) if isinstance(self.productos, (list, tuple, set)) else None,
+        }
+
+
+def previsualizar(reglas, muestra=20):
+    """
+    Para cada regla: cantidad de productos que cambiarían y una muestra con
+    el valor actual y el nuevo. No modifica nada.
+    """
+    resultado = []
+    for regla in reglas:
+        alcance = regla.alcance()
+        filas = list(
+            alcance.annotate(valor_nuevo=regla.expresion())
+            .order_by('nombre')
+            .values('idProducto', 'codProducto', 'nombre', 'valor_nuevo', actual=F(regla.campo))[:muestra]
+        )
+        for fila in filas:
+            fila['valor_nuevo'] = Decimal(fila['valor_nuevo']).quantize(Decimal('0.01'))
+        resultado.append({'regla': regla, 'afectados': alcance.count(), 'muestra': filas})
+    return resultado
+
+
+@transaction.atomic
+def aplicar(reglas, usuario=None, descripcion=''):
+    """
+    Aplica las reglas en orden, registra el lote y agrega al historial de
+    precios los productos modificados. Cada regla toma primero los ids de
+    su alcance y los actualiza de a LOTE con un UPDATE.
+    """
+    ahora = timezone.now()
+    detalle = []
+    total = 0
+    modificados = set()
+    for regla in reglas:
+        ids = list(regla.alcance().values_list('pk', flat=True))
+        afectados = 0
+        for inicio in range(0, len(ids), LOTE):
+            afectados += Productos.objects.filter(pk__in=ids[inicio:inicio + LOTE]).update(**{
+                regla.campo: regla.expresion(),
+                'fecha_actualizacion': ahora,
+            })
+        modificados.update(ids)
+        detalle.append({**regla.como_dict(), 'afectados': afectados})
+        total += afectados
+
+    lote = ActualizacionPrecios.objects.create(
+        fecha=ahora,
+        usuario=usuario,
+        descripcion=descripcion,
+        reglas=detalle,
+        productos_afectados=total,
+    )
+    # una fila de historial por producto con sus valores finales
+    modificados = sorted(modificados)
+    for inicio in range(0, len(modificados), LOTE):
+        registrar(Productos.objects.filter(pk__in=modificados[inicio:inicio + LOTE]), ahora, lote)
+    return lote
@@ -1,3 +1,113 @@
-from django.test import TestCase
+from datetime import datetime, timezone
+from unittest import mock
 
-# Create your tests here.
+from django.urls import reverse
+from django.utils import timezone as dj_timezone
+
+from djangoPrueba.busqueda import buscar
+from djangoPrueba.fabricas import crear_escenario
+from djangoPrueba.pruebas import ConsultasVistasMixin, PlanConsultaMixin, TestCase
+from .models import Productos, MovimientoStock
+from .precios import ReglaPrecio, aplicar
+
+
+class IndicesProductosTests(PlanConsultaMixin, TestCase):
+    """Las consultas frecuentes sobre productos usan índices."""
+
+    def test_busqueda_exacta_por_codigo(self):
+        # el índice de la restricción UNIQUE lo nombra SQLite
+        self.assertUsaIndice(
+            Productos.objects.filter(codProducto='ABC123'),
+            r'sqlite_autoindex_gestionProductos_productos_\d+',
+        )
+
+    def test_activos_con_bajo_stock(self):
+        self.assertUsaIndice(
+            Productos.objects.filter(activo=True, stock__lt=10), 'producto_activo_stock_idx'
+        )
+
+    def test_movimientos_de_un_producto(self):
+        desde = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.assertUsaIndice(
+            MovimientoStock.objects.filter(producto_id=1, fecha__gte=desde),
+            'movstock_producto_fecha_idx',
+        )
+
+
+class ConsultasProductosTests(ConsultasVistasMixin, TestCase):
+    """Cantidad de consultas por vista; no debe depender de la cantidad de filas."""
+
+    def test_listado(self):
+        self.assertConsultas(6, reverse('productos_list'))
+
+    def test_detalle(self):
+        self.assertConsultas(4, reverse('producto_detalle', args=[self.datos.productos[1].pk]))
+
+    def test_formularios(self):
+        self.assertConsultas(4, reverse('producto_crear'))
+        self.assertConsultas(5, reverse('producto_editar', args=[self.datos.productos[1].pk]))
+
+    def test_marcas_y_categorias(self):
+        self.assertConsultas(3, reverse('marcas_list'))
+        self.assertConsultas(3, reverse('categorias_list'))
+
+    def test_busqueda(self):
+        # la primera búsqueda del proceso consulta si existe la tabla FTS
+        buscar(Productos.objects.none(), 'Producto')
+        self.assertConsultas(3, reverse('productos_buscar') + '?q=Producto')
+
+    def test_busqueda_por_codigo_o_marca(self):
+        producto = self.datos.productos[1]
+        response = self.client.get(reverse('productos_buscar'), {'q': producto.codProducto})
+        self.assertEqual([r['id'] for r in response.json()['resultados']], [producto.pk])
+
+        # la última: su nombre no es prefijo de otra marca
+        marca = self.datos.marcas[-1]
+        response = self.client.get(reverse('productos_buscar'), {'q': marca.nombre, 'limite': 50})
+        self.assertEqual({r['marca'] for r in response.json()['resultados']}, {marca.nombre})
+
+    def test_busqueda_proveedor_invalido(self):
+        response = self.client.get(reverse('productos_buscar'), {'proveedor': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('productos_buscar'), {'proveedor': self.datos.proveedores[1].pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['resultados'])
+
+    def test_transferencias(self):
+        self.assertConsultas(3, reverse('transferencias_stock'))
+        self.assertConsultas(
+            4, reverse('transferencias_stock_ajax'), HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertConsultas(3, reverse('transferencias_stock_exportar'))
+
+    def test_admin(self):
+        for modelo, cantidad in [
+            ('marca', 5), ('categoria', 5), ('productos', 7),
+            ('movimientostock', 7), ('actualizacionprecios', 7), ('historialprecio', 7),
+        ]:
+            with self.subTest(modelo=modelo):
+                self.assertConsultas(cantidad, reverse(f'admin:gestionProductos_{modelo}_changelist'))
+
+
+class ConsultasProductosEscalaTests(ConsultasProductosTests):
+    escala = 10
+
+
+class ActualizacionPreciosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_escenario()
+
+    def test_historial_solo_de_los_productos_modificados(self):
+        categoria = self.datos.productos[0].idCategoria_id
+        ahora = dj_timezone.now()
+        # otro producto guardado en el mismo instante no es parte del lote
+        otro = Productos.objects.exclude(idCategoria_id=categoria).first()
+        Productos.objects.filter(pk=otro.pk).update(fecha_actualizacion=ahora)
+
+        with mock.patch('gestionProductos.precios.timezone.now', return_value=ahora):
+            lote = aplicar([ReglaPrecio(ReglaPrecio.PORCENTAJE, '10', categoria=categoria)])
+
+        esperados = set(Productos.objects.filter(idCategoria_id=categoria).values_list('pk', flat=True))
+        self.assertEqual(lote.productos_afectados, len(esperados))
+        self.assertEqual(set(lote.historial.values_list('producto_id', flat=True)), esperados)
@@ -21,6 +21,7 @@ urlpatterns = [
     path("crear/", views.producto_crear, name="producto_crear"),
     path("editar/<int:id>/", views.producto_editar, name="producto_editar"),
     path("eliminar/<int:id>/", views.producto_eliminar, name="producto_eliminar"),
+    path("buscar/", views.productos_buscar, name="productos_buscar"),
 
     # MARCAS - AJAX
     path("marca/ajax/crear/", views.marca_crear_ajax, name="marca_crear_ajax"),
@@ -30,5 +31,6 @@ urlpatterns = [
     # TRANSFERENCIAS DE STOCK
     path("transferencias/", views.transferencias_stock, name="transferencias_stock"),
     path("transferencias/ajax/", views.transferencias_stock_ajax, name="transferencias_stock_ajax"),
+    path("transferencias/exportar/", views.transferencias_stock_exportar, name="transferencias_stock_exportar"),
 ]
 
@@ -1,17 +1,24 @@
+import hashlib
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
-from django.core.paginator import Paginator
+from django.core.cache import cache
 from django.db.models import Sum, Count, Q
-from django.utils.dateparse import parse_date
-from datetime import datetime, timedelta
+from django.utils import timezone
 from decimal import Decimal
 
-from .models import Productos, Marca, Categoria
+from .historial import evolucion
+from .models import Productos, Marca, Categoria, MovimientoStock
 from .forms import ProductoForm, MarcaForm, CategoriaForm
-from gestionCompras.models import DetalleCompra, Compra
-from gestionVentas.models import DetalleVenta, Venta
+from djangoPrueba.paginacion import CursorPaginator, CursorInvalido
+from djangoPrueba.fechas import RangoFechas, FechaInvalida
+from djangoPrueba.replicas import lectura_reportes
+from djangoPrueba.busqueda import buscar
+from djangoPrueba.exportacion import CHUNK_SIZE
+from gestionTareas.tareas import exportar_o_encolar
+from gestionInformes.estadisticas import generacion_de
 
 
 
@@ -26,7 +33,8 @@ def productos_list(request):
     marca_id = request.GET.get('marca', '')
     estado = request.GET.get('estado', '')
     codigo = request.GET.get('codigo', '')
-    page = request.GET.get('page', 1)
+    cursor = request.GET.get('cursor', '')
+    direccion = request.GET.get('direccion', CursorPaginator.SIGUIENTE)
     
     # Consulta base
     productos = Productos.objects.select_related('idMarca', 'idCategoria').all()
@@ -42,12 +50,18 @@ def productos_list(request):
         productos = productos.filter(activo=(estado == 'activo'))
     
     if codigo:
-        productos = productos.filter(codProducto__icontains=codigo)
+        productos = buscar(productos, codigo, ordenar=False)
     
     
-    # Paginación
-    paginator = Paginator(productos, 10)  # 10 productos por página
-    productos_page = paginator.get_page(page)
+    # Paginación por cursor (10 productos por página)
+    paginator = CursorPaginator(
+        productos, ordering=('idProducto',), per_page=10, contar=True,
+        clave_version=lambda: generacion_de(Productos),
+    )
+    try:
+        productos_page = paginator.page(cursor, direccion)
+    except CursorInvalido:
+        productos_page = paginator.page()
     
     # Si es una petición AJAX, devolver JSON
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -68,8 +82,8 @@ def productos_list(request):
             'productos': productos_data,
             'has_next': productos_page.has_next(),
             'has_previous': productos_page.has_previous(),
-            'current_page': productos_page.number,
-            'total_pages': paginator.num_pages,
+            'next_cursor': productos_page.next_cursor,
+            'previous_cursor': productos_page.previous_cursor,
             'total_count': paginator.count,
         })
     
@@ -128,8 +142,21 @@ def producto_detalle(request, id):
     producto.precio_sin_iva = producto.precioUnitario / (1 + (producto.iva / 100))
     producto.precio_con_iva = producto.precioUnitario
 
+    # Evolución del precio para el gráfico (fechas locales, montos como texto)
+    historial_precios = [
+        {
+            'fecha': timezone.localtime(vigente_desde).strftime('%d/%m/%Y %H:%M'),
+            'precio': str(precio),
+            'iva': str(iva),
+        }
+        for vigente_desde, precio, iva in evolucion(producto)
+    ]
+
     # Renderiza la plantilla de detalle, pasando el objeto producto.
-    return render(request, "productos/productos_detalle.html", {"producto": producto})
+    return render(request, "productos/productos_detalle.html", {
+        "producto": producto,
+        "historial_precios": historial_precios,
+    })
 
 @login_required
 def producto_eliminar(request, id):
@@ -161,6 +188,78 @@ def producto_eliminar(request, id):
     # Si es GET normal: mostrar confirmación
     return render(request, "productos/productos_confirm_delete.html", {"producto": producto})
 
+
+BUSQUEDA_LIMITE = 20
+BUSQUEDA_LIMITE_MAXIMO = 50
+BUSQUEDA_CACHE_TIMEOUT = 30  # segundos: el stock mostrado puede atrasar un poco
+
+
+@login_required
+def productos_buscar(request):
+    """
+    Autocompletado de productos activos para los formularios de venta y compra.
+    Busca con el índice de texto (djangoPrueba.busqueda, igual que el
+    listado) o por nombre de marca, y pagina por cursor.
+
+    Parámetros GET: q, limite, cursor, con_stock=1 (solo stock > 0),
+    proveedor=<id> (solo productos asociados al proveedor).
+    """
+    q = request.GET.get('q', '').strip()
+    cursor = request.GET.get('cursor', '')
+    con_stock = request.GET.get('con_stock') == '1'
+    try:
+        limite = min(max(int(request.GET.get('limite', BUSQUEDA_LIMITE)), 1), BUSQUEDA_LIMITE_MAXIMO)
+    except ValueError:
+        limite = BUSQUEDA_LIMITE
+    try:
+        proveedor_id = int(request.GET['proveedor']) if request.GET.get('proveedor') else None
+    except ValueError:
+        return JsonResponse({'error': 'Proveedor inválido'}, status=400)
+
+    clave = 'productos:buscar:' + hashlib.md5(
+        f"{q.lower()}|{cursor}|{con_stock}|{proveedor_id}|{limite}".encode()
+    ).hexdigest()
+    data = cache.get(clave)
+    if data is not None:
+        return JsonResponse(data)
+
+    productos = Productos.objects.filter(activo=True).select_related('idMarca').only(
+        'idProducto', 'codProducto', 'nombre', 'precioUnitario', 'stock', 'iva', 'idMarca__nombre'
+    )
+    if q:
+        # la marca no está en el índice: se busca en su tabla, que es chica
+        marcas = Marca.objects.filter(nombre__icontains=q).values('pk')
+        productos = buscar(productos, q, ordenar=False) | productos.filter(idMarca__in=marcas)
+    if con_stock:
+        productos = productos.filter(stock__gt=0)
+    if proveedor_id:
+        productos = productos.filter(productoproveedor__proveedor_id=proveedor_id)
+
+    paginator = CursorPaginator(productos, ordering=('nombre', 'idProducto'), per_page=limite)
+    try:
+        pagina = paginator.page(cursor)
+    except CursorInvalido:
+        return JsonResponse({'error': 'Cursor inválido'}, status=400)
+
+    data = {
+        'resultados': [
+            {
+                'id': p.idProducto,
+                'codigo': p.codProducto,
+                'nombre': p.nombre,
+                'marca': p.idMarca.nombre,
+                'precio': str(p.precioUnitario),
+                'stock': p.stock,
+                'iva': str(p.iva or 0),
+            }
+            for p in pagina
+        ],
+        'has_next': pagina.has_next(),
+        'next_cursor': pagina.next_cursor,
+    }
+    cache.set(clave, data, BUSQUEDA_CACHE_TIMEOUT)
+    return JsonResponse(data)
+
 # ============================================================
 # MARCAS
 # ============================================================
@@ -309,157 +408,118 @@ def transferencias_stock(request):
     return render(request, "transferencias/transferencias_stock.html", context)
 
 
+def _filtrar_movimientos(params):
+    """
+    Movimientos filtrados por producto, tipo ('entrada', 'salida' o vacío)
+    y rango [desde 00:00, día siguiente a hasta 00:00). Lanza FechaInvalida.
+    """
+    rango = RangoFechas.desde_request(params)
+    producto_id = params.get('producto', '')
+    tipo_movimiento = params.get('tipo', '')
+    
+    movimientos = MovimientoStock.objects.all()
+    
+    if tipo_movimiento in (MovimientoStock.TIPO_ENTRADA, MovimientoStock.TIPO_SALIDA):
+        movimientos = movimientos.filter(tipo=tipo_movimiento)
+    
+    if producto_id:
+        movimientos = movimientos.filter(producto_id=producto_id)
+    
+    return rango.filtrar(movimientos, 'fecha')
+
+
 @login_required
+@lectura_reportes
 def transferencias_stock_ajax(request):
     """
-    Vista AJAX para obtener las transferencias de stock con filtros y paginación
+    Vista AJAX para obtener las transferencias de stock con filtros y paginación.
+    Lee del historial MovimientoStock con paginación por cursor (fecha, id).
     """
     if not request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({'error': 'Petición no válida'}, status=400)
     
-    # Obtener parámetros de filtro
-    producto_id = request.GET.get('producto', '')
-    fecha_desde = request.GET.get('fecha_desde', '')
-    fecha_hasta = request.GET.get('fecha_hasta', '')
-    tipo_movimiento = request.GET.get('tipo', '')  # 'entrada', 'salida', o vacío (todos)
-    page = int(request.GET.get('page', 1))
+    # Parámetros de paginación
+    cursor = request.GET.get('cursor', '')
+    direccion = request.GET.get('direccion', 'siguiente')  # 'siguiente' o 'anterior'
     per_page = 15
     
-    # Validar y parsear fechas
-    fecha_desde_obj = None
-    fecha_hasta_obj = None
-    
-    if fecha_desde:
-        try:
-            fecha_desde_obj = parse_date(fecha_desde)
-            if not fecha_desde_obj:
-                return JsonResponse({'error': 'Fecha desde inválida'}, status=400)
-        except:
-            return JsonResponse({'error': 'Formato de fecha desde incorrecto'}, status=400)
+    try:
+        movimientos = _filtrar_movimientos(request.GET)
+    except FechaInvalida as e:
+        return JsonResponse({'error': str(e)}, status=400)
     
-    if fecha_hasta:
-        try:
-            fecha_hasta_obj = parse_date(fecha_hasta)
-            if not fecha_hasta_obj:
-                return JsonResponse({'error': 'Fecha hasta inválida'}, status=400)
-            # Agregar 23:59:59 para incluir todo el día
-            fecha_hasta_obj = datetime.combine(fecha_hasta_obj, datetime.max.time())
-        except:
-            return JsonResponse({'error': 'Formato de fecha hasta incorrecto'}, status=400)
+    # Estadísticas en una sola consulta
+    estadisticas = movimientos.aggregate(
+        total_registros=Count('idMovimiento'),
+        total_entradas=Count('idMovimiento', filter=Q(tipo=MovimientoStock.TIPO_ENTRADA)),
+        total_salidas=Count('idMovimiento', filter=Q(tipo=MovimientoStock.TIPO_SALIDA)),
+    )
     
-    # Validar que fecha_desde sea menor que fecha_hasta
-    if fecha_desde_obj and fecha_hasta_obj and fecha_desde_obj > fecha_hasta_obj.date():
-        return JsonResponse({'error': 'La fecha desde no puede ser mayor que la fecha hasta'}, status=400)
+    # Paginación por cursor: (fecha, id) descendente
+    paginator = CursorPaginator(
+        movimientos.select_related('producto', 'producto__idMarca', 'producto__idCategoria'),
+        ordering=('-fecha', '-idMovimiento'),
+        per_page=per_page,
+    )
+    try:
+        pagina = paginator.page(cursor, direccion)
+    except CursorInvalido:
+        return JsonResponse({'error': 'Cursor inválido'}, status=400)
     
-    # Lista para almacenar todos los movimientos
-    movimientos = []
-    
-    # ENTRADAS (Compras confirmadas)
-    if tipo_movimiento in ('', 'entrada'):
-        compras_query = DetalleCompra.objects.select_related(
-            'compra', 'compra__proveedor', 'producto', 'producto__idMarca', 'producto__idCategoria'
-        ).filter(
-            compra__estado='CONFIRMADA'
-        )
-        
-        # Aplicar filtros
-        if producto_id:
-            compras_query = compras_query.filter(producto_id=producto_id)
-        
-        if fecha_desde_obj:
-            compras_query = compras_query.filter(compra__fecha_compra__gte=fecha_desde_obj)
-        
-        if fecha_hasta_obj:
-            compras_query = compras_query.filter(compra__fecha_compra__lte=fecha_hasta_obj)
-        
-        # Convertir a lista de diccionarios
-        for detalle in compras_query:
-            movimientos.append({
-                'tipo': 'entrada',
-                'fecha': detalle.compra.fecha_compra,
-                'producto_id': detalle.producto.idProducto,
-                'producto_nombre': detalle.producto.nombre,
-                'producto_codigo': detalle.producto.codProducto,
-                'marca': detalle.producto.idMarca.nombre,
-                'categoria': detalle.producto.idCategoria.descripcion,
-                'cantidad': detalle.cantidad,
-                'precio_unitario': float(detalle.precio_unitario),
-                'subtotal': float(detalle.subtotal),
-                'referencia_tipo': 'Compra',
-                'referencia_id': detalle.compra.idCompra,
-                'referencia_nombre': detalle.compra.proveedor.razon_social,
-                'observacion': detalle.observacion or '',
-            })
-    
-    # SALIDAS (Ventas confirmadas)
-    if tipo_movimiento in ('', 'salida'):
-        ventas_query = DetalleVenta.objects.select_related(
-            'venta', 'venta__cliente', 'producto', 'producto__idMarca', 'producto__idCategoria'
-        ).filter(
-            venta__estado='CONFIRMADA'
-        )
-        
-        # Aplicar filtros
-        if producto_id:
-            ventas_query = ventas_query.filter(producto_id=producto_id)
-        
-        if fecha_desde_obj:
-            ventas_query = ventas_query.filter(venta__fecha_venta__gte=fecha_desde_obj)
-        
-        if fecha_hasta_obj:
-            ventas_query = ventas_query.filter(venta__fecha_venta__lte=fecha_hasta_obj)
-        
-        # Convertir a lista de diccionarios
-        for detalle in ventas_query:
-            movimientos.append({
-                'tipo': 'salida',
-                'fecha': detalle.venta.fecha_venta,
-                'producto_id': detalle.producto.idProducto,
-                'producto_nombre': detalle.producto.nombre,
-                'producto_codigo': detalle.producto.codProducto,
-                'marca': detalle.producto.idMarca.nombre,
-                'categoria': detalle.producto.idCategoria.descripcion,
-                'cantidad': detalle.cantidad,
-                'precio_unitario': float(detalle.precio_unitario),
-                'subtotal': float(detalle.subtotal),
-                'referencia_tipo': 'Venta',
-                'referencia_id': detalle.venta.idVenta,
-                'referencia_nombre': detalle.venta.cliente.nombre_completo(),
-                'observacion': detalle.observacion or '',
-            })
-    
-    # Ordenar por fecha descendente
-    movimientos.sort(key=lambda x: x['fecha'], reverse=True)
-    
-    # Calcular estadísticas
-    total_registros = len(movimientos)
-    total_entradas = sum(1 for m in movimientos if m['tipo'] == 'entrada')
-    total_salidas = sum(1 for m in movimientos if m['tipo'] == 'salida')
-    
-    # Paginación manual
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    movimientos_page = movimientos[start_idx:end_idx]
-    
-    total_pages = (total_registros + per_page - 1) // per_page
-    
-    # Formatear fechas para JSON
-    for mov in movimientos_page:
-        mov['fecha'] = mov['fecha'].strftime('%d/%m/%Y %H:%M')
+    movimientos_page = []
+    for mov in pagina:
+        referencia_nombre = mov.referencia_nombre
+        if mov.anulacion:
+            referencia_nombre = f"{referencia_nombre} (anulación)"
+        movimientos_page.append({
+            'tipo': mov.tipo,
+            'fecha': mov.fecha.strftime('%d/%m/%Y %H:%M'),
+            'producto_id': mov.producto.idProducto,
+            'producto_nombre': mov.producto.nombre,
+            'producto_codigo': mov.producto.codProducto,
+            'marca': mov.producto.idMarca.nombre,
+            'categoria': mov.producto.idCategoria.descripcion,
+            'cantidad': mov.cantidad,
+            'precio_unitario': float(mov.precio_unitario),
+            'subtotal': float(mov.subtotal),
+            'referencia_tipo': mov.referencia_tipo,
+            'referencia_id': mov.referencia_id,
+            'referencia_nombre': referencia_nombre,
+            'observacion': mov.observacion,
+        })
     
     return JsonResponse({
         'success': True,
         'movimientos': movimientos_page,
-        'estadisticas': {
-            'total_registros': total_registros,
-            'total_entradas': total_entradas,
-            'total_salidas': total_salidas,
-        },
+        'estadisticas': estadisticas,
         'paginacion': {
-            'current_page': page,
-            'total_pages': total_pages,
-            'has_next': page < total_pages,
-            'has_previous': page > 1,
-            'total_count': total_registros,
+            'per_page': per_page,
+            'has_next': pagina.has_next(),
+            'has_previous': pagina.has_previous(),
+            'next_cursor': pagina.next_cursor,
+            'previous_cursor': pagina.previous_cursor,
+            'total_count': estadisticas['total_registros'],
         }
-    })
\ No newline at end of file
+    })
+
+
+def exportacion_movimientos(parametros):
+    """Encabezados y filas del historial de movimientos filtrado (también para la tarea en segundo plano)."""
+    movimientos = _filtrar_movimientos(parametros)
+    filas = movimientos.order_by('-fecha', '-idMovimiento').values_list(
+        'fecha', 'tipo', 'producto__codProducto', 'producto__nombre', 'cantidad',
+        'precio_unitario', 'subtotal', 'referencia_tipo', 'referencia_id',
+        'referencia_nombre', 'anulacion', 'observacion',
+    ).iterator(chunk_size=CHUNK_SIZE)
+    
+    encabezados = [
+        'Fecha', 'Tipo', 'Código', 'Producto', 'Cantidad', 'Precio unitario', 'Subtotal',
+        'Referencia', 'Nro. referencia', 'Nombre referencia', 'Anulación', 'Observación',
+    ]
+    return encabezados, filas
+
+
+@login_required
+def transferencias_stock_exportar(request):
+    """Exporta el historial de movimientos de stock, con los mismos filtros, en CSV (o XLSX)."""
+    return exportar_o_encolar(request, 'movimientos_stock', exportacion_movimientos)
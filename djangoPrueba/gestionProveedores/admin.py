@@ -19,5 +19,7 @@ class ProveedorAdmin(admin.ModelAdmin):
 class ProductoProveedorAdmin(admin.ModelAdmin):
     list_display = ('producto', 'proveedor')
     list_filter = ('proveedor',)
+    # __str__ usa producto y proveedor
+    list_select_related = ('producto', 'proveedor')
     search_fields = ('producto__nombre', 'proveedor__razon_social')
     autocomplete_fields = ['producto', 'proveedor']
\ No newline at end of file
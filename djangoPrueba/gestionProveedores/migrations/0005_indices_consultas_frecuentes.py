@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionProveedores', '0004_proveedor_activo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proveedor',
+            index=models.Index(fields=['cuit'], name='proveedor_cuit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proveedor',
+            index=models.Index(fields=['email'], name='proveedor_email_idx'),
+        ),
+    ]
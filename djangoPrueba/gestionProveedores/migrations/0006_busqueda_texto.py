@@ -0,0 +1,51 @@
+from django.db import migrations
+
+from djangoPrueba.busqueda import migracion_fts5
+
+
+# DDL congelado: no depende de la definición actual del modelo
+CREAR = [
+    """
+    CREATE VIRTUAL TABLE "gestionProveedores_proveedor_fts" USING fts5(
+        "razon_social", "cuit", "nombre", "apellido", "email",
+        content='gestionProveedores_proveedor', content_rowid='idProveedor',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER "gestionProveedores_proveedor_fts_ai" AFTER INSERT ON "gestionProveedores_proveedor" BEGIN
+        INSERT INTO "gestionProveedores_proveedor_fts"(rowid, "razon_social", "cuit", "nombre", "apellido", "email") VALUES (new."idProveedor", new."razon_social", new."cuit", new."nombre", new."apellido", new."email");
+    END
+    """,
+    """
+    CREATE TRIGGER "gestionProveedores_proveedor_fts_ad" AFTER DELETE ON "gestionProveedores_proveedor" BEGIN
+        INSERT INTO "gestionProveedores_proveedor_fts"("gestionProveedores_proveedor_fts", rowid, "razon_social", "cuit", "nombre", "apellido", "email") VALUES ('delete', old."idProveedor", old."razon_social", old."cuit", old."nombre", old."apellido", old."email");
+    END
+    """,
+    """
+    CREATE TRIGGER "gestionProveedores_proveedor_fts_au" AFTER UPDATE OF "razon_social", "cuit", "nombre", "apellido", "email" ON "gestionProveedores_proveedor" BEGIN
+        INSERT INTO "gestionProveedores_proveedor_fts"("gestionProveedores_proveedor_fts", rowid, "razon_social", "cuit", "nombre", "apellido", "email") VALUES ('delete', old."idProveedor", old."razon_social", old."cuit", old."nombre", old."apellido", old."email");
+        INSERT INTO "gestionProveedores_proveedor_fts"(rowid, "razon_social", "cuit", "nombre", "apellido", "email") VALUES (new."idProveedor", new."razon_social", new."cuit", new."nombre", new."apellido", new."email");
+    END
+    """,
+    """INSERT INTO "gestionProveedores_proveedor_fts"("gestionProveedores_proveedor_fts") VALUES ('rebuild')""",
+]
+
+BORRAR = [
+    'DROP TRIGGER IF EXISTS "gestionProveedores_proveedor_fts_ai"',
+    'DROP TRIGGER IF EXISTS "gestionProveedores_proveedor_fts_ad"',
+    'DROP TRIGGER IF EXISTS "gestionProveedores_proveedor_fts_au"',
+    'DROP TABLE IF EXISTS "gestionProveedores_proveedor_fts"',
+]
+
+
+class Migration(migrations.Migration):
+    """Tabla FTS5 y triggers para la búsqueda de texto (solo SQLite, ver djangoPrueba.busqueda)."""
+
+    dependencies = [
+        ('gestionProveedores', '0005_indices_consultas_frecuentes'),
+    ]
+
+    operations = [
+        migracion_fts5(CREAR, BORRAR),
+    ]
@@ -15,6 +15,11 @@ class Proveedor(models.Model):
     class Meta:
         verbose_name='Proveedor'
         verbose_name_plural='Proveedores'
+        indexes = [
+            # chequeos de duplicados en ProveedorForm.clean_cuit / clean_email
+            models.Index(fields=['cuit'], name='proveedor_cuit_idx'),
+            models.Index(fields=['email'], name='proveedor_email_idx'),
+        ]
     
     def __str__(self):
         return self.razon_social
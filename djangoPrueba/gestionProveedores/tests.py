@@ -1,3 +1,40 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from djangoPrueba.pruebas import ConsultasVistasMixin, PlanConsultaMixin, TestCase
+from .models import Proveedor
+
+
+class IndicesProveedoresTests(PlanConsultaMixin, TestCase):
+    """Los chequeos de duplicados de ProveedorForm usan índices."""
+
+    def test_cuit_duplicado(self):
+        self.assertUsaIndice(
+            Proveedor.objects.filter(cuit='20-12345678-1').exclude(pk=1), 'proveedor_cuit_idx'
+        )
+
+    def test_email_duplicado(self):
+        self.assertUsaIndice(
+            Proveedor.objects.filter(email='a@b.com').exclude(pk=1), 'proveedor_email_idx'
+        )
+
+
+class ConsultasProveedoresTests(ConsultasVistasMixin, TestCase):
+    """Cantidad de consultas por vista; no debe depender de la cantidad de filas."""
+
+    def test_listado(self):
+        self.assertConsultas(3, reverse('proveedores_list'))
+
+    def test_detalle(self):
+        self.assertConsultas(4, reverse('proveedor_detalle', args=[self.datos.proveedores[1].pk]))
+
+    def test_editar(self):
+        self.assertConsultas(3, reverse('proveedor_editar', args=[self.datos.proveedores[1].pk]))
+
+    def test_admin(self):
+        for modelo, cantidad in [('proveedor', 5), ('productoproveedor', 6)]:
+            with self.subTest(modelo=modelo):
+                self.assertConsultas(cantidad, reverse(f'admin:gestionProveedores_{modelo}_changelist'))
+
+
+class ConsultasProveedoresEscalaTests(ConsultasProveedoresTests):
+    escala = 10
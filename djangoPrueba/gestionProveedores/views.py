@@ -1,9 +1,9 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
 from .models import Proveedor
 from .form import ProveedorForm
+from djangoPrueba.busqueda import buscar
 
 
 @login_required
@@ -16,13 +16,8 @@ def proveedores_list(request):
     # Búsqueda opcional
     query = request.GET.get('q')
     if query:
-        proveedores = proveedores.filter(
-            Q(razon_social__icontains=query) |
-            Q(nombre__icontains=query) |
-            Q(apellido__icontains=query) |
-            Q(cuit__icontains=query) |
-            Q(email__icontains=query)
-        )
+        # Con búsqueda se ordena por relevancia
+        proveedores = buscar(proveedores, query)
     
     context = {
         'proveedores': proveedores,
@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import Tarea
+
+
+@admin.register(Tarea)
+class TareaAdmin(admin.ModelAdmin):
+    list_display = (
+        'idTarea', 'tipo', 'descripcion', 'estado', 'usuario', 'hechos', 'total',
+        'fecha_creacion', 'fecha_fin',
+    )
+    list_filter = ('estado', 'tipo')
+    list_select_related = ('usuario',)
+    search_fields = ('descripcion',)
+    date_hierarchy = 'fecha_creacion'
+
+    # Las crea y actualiza la cola; desde el admin solo se consultan o borran
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
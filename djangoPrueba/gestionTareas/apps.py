@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class GestiontareasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'gestionTareas'
+
+    def ready(self):
+        # Registra las tareas definidas en el módulo tareas.py de cada app
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tareas')
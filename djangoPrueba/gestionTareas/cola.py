@@ -0,0 +1,215 @@
+"""
+Cola de tareas en segundo plano sobre la base de datos (sin broker).
+
+    @registrar_tarea('confirmar_ventas')
+    def confirmar_ventas(contexto, ids):
+        for i, venta in enumerate(...):
+            ...
+            contexto.avanzar(i + 1, len(ids))
+        return {'confirmadas': n}        # queda en Tarea.resultado
+
+    tarea = encolar('confirmar_ventas', usuario=request.user, ids=[1, 2, 3])
+
+Las funciones se definen en el módulo tareas.py de cada app (se cargan al
+iniciar, ver apps.py) y reciben un Contexto más los parámetros de
+encolar(), que se guardan como JSON. Un archivo generado se escribe en
+contexto.archivo(nombre) y se descarga desde la página de la tarea.
+
+El comando procesar_tareas toma las pendientes de a una, la más vieja
+primero. Se pueden correr varios trabajadores: una tarea se toma con un
+UPDATE condicional sobre su estado, así dos no ejecutan la misma.
+"""
+import logging
+import shutil
+import time
+import traceback
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Tarea
+
+logger = logging.getLogger(__name__)
+
+CONFIGURACION = {
+    'DIRECTORIO': None,
+    'INTERVALO': 2,
+    'TIEMPO_COLGADA': 10 * 60,
+    'DIAS_ARCHIVOS': 7,
+    'UMBRAL_ADMIN': 50,
+}
+
+# segundos mínimos entre dos escrituras del progreso de una tarea
+INTERVALO_PROGRESO = 1.0
+
+TAREAS = {}
+
+
+class TareaDesconocida(ValueError):
+    pass
+
+
+def configuracion():
+    config = {**CONFIGURACION, **getattr(settings, 'TAREAS', {})}
+    if config['DIRECTORIO'] is None:
+        config['DIRECTORIO'] = Path(settings.BASE_DIR) / 'archivos' / 'tareas'
+    return config
+
+
+# -------------------------
+# REGISTRO Y ENCOLADO
+# -------------------------
+def registrar_tarea(nombre):
+    def decorador(funcion):
+        TAREAS[nombre] = funcion
+        return funcion
+    return decorador
+
+
+def encolar(tipo, usuario=None, descripcion='', **parametros):
+    if tipo not in TAREAS:
+        raise TareaDesconocida(f"Tarea no registrada: {tipo}")
+    return Tarea.objects.create(
+        tipo=tipo,
+        usuario=usuario,
+        descripcion=descripcion[:200],
+        parametros=parametros,
+    )
+
+
+def carpeta(tarea):
+    return Path(configuracion()['DIRECTORIO']) / str(tarea.pk)
+
+
+def ruta_archivo(tarea):
+    """Ruta del archivo generado por la tarea, o None si no generó ninguno."""
+    if not tarea.archivo:
+        return None
+    return carpeta(tarea) / tarea.archivo
+
+
+# -------------------------
+# EJECUCIÓN
+# -------------------------
+class Contexto:
+    """Lo que recibe la función de una tarea para informar su avance."""
+
+    def __init__(self, tarea):
+        self.tarea = tarea
+        self._ultimo = 0.0
+
+    @property
+    def usuario(self):
+        return self.tarea.usuario
+
+    def avanzar(self, hechos, total=None, mensaje=None, forzar=False):
+        tarea = self.tarea
+        tarea.hechos = hechos
+        if total is not None:
+            tarea.total = total
+        if mensaje is not None:
+            tarea.mensaje = mensaje[:200]
+        # a lo sumo una escritura por INTERVALO_PROGRESO, aunque se llame por fila
+        ahora = time.monotonic()
+        if forzar or ahora - self._ultimo >= INTERVALO_PROGRESO:
+            self._ultimo = ahora
+            tarea.latido = timezone.now()
+            Tarea.objects.filter(pk=tarea.pk).update(
+                hechos=tarea.hechos, total=tarea.total, mensaje=tarea.mensaje, latido=tarea.latido,
+            )
+
+    def archivo(self, nombre):
+        """Ruta donde escribir el archivo que la tarea ofrece para descargar."""
+        destino = carpeta(self.tarea)
+        destino.mkdir(parents=True, exist_ok=True)
+        self.tarea.archivo = nombre
+        return destino / nombre
+
+
+def tomar(trabajador):
+    """Marca EN_CURSO y devuelve la pendiente más vieja (None si no hay)."""
+    while True:
+        pk = Tarea.objects.filter(estado=Tarea.ESTADO_PENDIENTE).order_by(
+            'fecha_creacion', 'pk'
+        ).values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+        ahora = timezone.now()
+        tomadas = Tarea.objects.filter(pk=pk, estado=Tarea.ESTADO_PENDIENTE).update(
+            estado=Tarea.ESTADO_EN_CURSO, trabajador=trabajador[:100], fecha_inicio=ahora, latido=ahora,
+        )
+        if tomadas:
+            return Tarea.objects.select_related('usuario').get(pk=pk)
+        # otro trabajador la tomó primero: probar con la siguiente
+
+
+def ejecutar(tarea):
+    """Corre la función de la tarea y guarda el resultado o el error."""
+    contexto = Contexto(tarea)
+    try:
+        funcion = TAREAS.get(tarea.tipo)
+        if funcion is None:
+            raise TareaDesconocida(f"Tarea no registrada: {tarea.tipo}")
+        tarea.resultado = funcion(contexto, **tarea.parametros)
+        tarea.estado = Tarea.ESTADO_TERMINADA
+    except Exception:
+        logger.exception("Falló la tarea #%s (%s)", tarea.pk, tarea.tipo)
+        tarea.estado = Tarea.ESTADO_FALLIDA
+        tarea.error = traceback.format_exc()[-5000:]
+    tarea.fecha_fin = tarea.latido = timezone.now()
+    tarea.save(update_fields=[
+        'estado', 'resultado', 'error', 'archivo', 'hechos', 'total', 'mensaje', 'fecha_fin', 'latido',
+    ])
+    return tarea
+
+
+def marcar_colgadas():
+    """
+    Marca FALLIDA las tareas EN_CURSO sin latido reciente (su trabajador se
+    detuvo). No se reintentan solas: pueden haber quedado a medio hacer.
+    """
+    limite = timezone.now() - timedelta(seconds=configuracion()['TIEMPO_COLGADA'])
+    return Tarea.objects.filter(estado=Tarea.ESTADO_EN_CURSO, latido__lt=limite).update(
+        estado=Tarea.ESTADO_FALLIDA,
+        error='El trabajador dejó de informar avance; la tarea puede haber quedado a medio hacer.',
+        fecha_fin=timezone.now(),
+    )
+
+
+def limpiar(dias=None):
+    """Borra las tareas terminadas hace más de `dias` días y sus archivos."""
+    dias = configuracion()['DIAS_ARCHIVOS'] if dias is None else dias
+    viejas = Tarea.objects.filter(
+        estado__in=[Tarea.ESTADO_TERMINADA, Tarea.ESTADO_FALLIDA],
+        fecha_fin__lt=timezone.now() - timedelta(days=dias),
+    )
+    for tarea in viejas.only('pk'):
+        shutil.rmtree(carpeta(tarea), ignore_errors=True)
+    borradas, _ = viejas.delete()
+    return borradas
+
+
+def trabajar(trabajador, una_vez=False, max_tareas=None, detener=lambda: False, intervalo=None):
+    """
+    Bucle del trabajador: ejecuta tareas hasta que `detener()` sea verdadero
+    (con una_vez, hasta que no queden pendientes). Devuelve cuántas ejecutó.
+    """
+    intervalo = configuracion()['INTERVALO'] if intervalo is None else intervalo
+    ejecutadas = 0
+    while not detener() and (max_tareas is None or ejecutadas < max_tareas):
+        # conexiones cortadas o vencidas (CONN_MAX_AGE) entre tarea y tarea
+        close_old_connections()
+        tarea = tomar(trabajador)
+        if tarea is None:
+            marcar_colgadas()
+            if una_vez:
+                break
+            time.sleep(intervalo)
+            continue
+        ejecutar(tarea)
+        ejecutadas += 1
+    close_old_connections()
+    return ejecutadas
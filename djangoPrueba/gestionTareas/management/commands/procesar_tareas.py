@@ -0,0 +1,64 @@
+import os
+import signal
+import socket
+
+from django.core.management.base import BaseCommand
+
+from gestionTareas.cola import configuracion, limpiar, trabajar
+
+
+class Command(BaseCommand):
+    help = (
+        "Trabajador de la cola de tareas: ejecuta las tareas pendientes de a "
+        "una, la más vieja primero. Se pueden correr varios a la vez. "
+        "SIGTERM/Ctrl+C terminan la tarea en curso y salen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--una-vez',
+            action='store_true',
+            help='Ejecuta las pendientes y sale (para cron o pruebas).',
+        )
+        parser.add_argument(
+            '--max-tareas',
+            type=int,
+            help='Sale después de ejecutar esta cantidad de tareas.',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            help='Segundos entre consultas cuando no hay pendientes (default: %s).'
+            % configuracion()['INTERVALO'],
+        )
+        parser.add_argument(
+            '--limpiar',
+            action='store_true',
+            help='Antes de empezar, borra las tareas terminadas hace más de '
+            'TAREAS["DIAS_ARCHIVOS"] días y sus archivos.',
+        )
+
+    def handle(self, *args, **options):
+        if options['limpiar']:
+            self.stdout.write(f"Tareas viejas borradas: {limpiar()}")
+
+        detener = {'pedido': False}
+
+        def pedir_detener(signum, frame):
+            detener['pedido'] = True
+            self.stdout.write("Deteniendo al terminar la tarea en curso...")
+
+        signal.signal(signal.SIGTERM, pedir_detener)
+        signal.signal(signal.SIGINT, pedir_detener)
+
+        trabajador = f"{socket.gethostname()}:{os.getpid()}"
+        if not options['una_vez']:
+            self.stdout.write(f"Trabajador {trabajador} esperando tareas...")
+        ejecutadas = trabajar(
+            trabajador,
+            una_vez=options['una_vez'],
+            max_tareas=options['max_tareas'],
+            detener=lambda: detener['pedido'],
+            intervalo=options['intervalo'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Tareas ejecutadas: {ejecutadas}."))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 19:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('idTarea', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(max_length=100)),
+                ('descripcion', models.CharField(blank=True, default='', max_length=200)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_CURSO', 'En curso'), ('TERMINADA', 'Terminada'), ('FALLIDA', 'Fallida')], default='PENDIENTE', max_length=20)),
+                ('hechos', models.IntegerField(default=0)),
+                ('total', models.IntegerField(blank=True, null=True)),
+                ('mensaje', models.CharField(blank=True, default='', max_length=200)),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('archivo', models.CharField(blank=True, default='', max_length=200)),
+                ('error', models.TextField(blank=True, default='')),
+                ('trabajador', models.CharField(blank=True, default='', max_length=100)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+                ('latido', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tareas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tarea',
+                'verbose_name_plural': 'Tareas',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'fecha_creacion'], name='tarea_estado_creacion_idx')],
+            },
+        ),
+    ]
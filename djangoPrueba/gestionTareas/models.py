@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.db import models
+
+
+class Tarea(models.Model):
+    """
+    Trabajo en segundo plano (ver gestionTareas.cola). Lo crea encolar() y
+    lo ejecuta el comando procesar_tareas; la página de la tarea consulta
+    estado y progreso hasta que termina.
+    """
+    ESTADO_PENDIENTE = 'PENDIENTE'
+    ESTADO_EN_CURSO = 'EN_CURSO'
+    ESTADO_TERMINADA = 'TERMINADA'
+    ESTADO_FALLIDA = 'FALLIDA'
+
+    ESTADO_CHOICES = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_EN_CURSO, 'En curso'),
+        (ESTADO_TERMINADA, 'Terminada'),
+        (ESTADO_FALLIDA, 'Fallida'),
+    ]
+
+    idTarea = models.BigAutoField(primary_key=True)
+    tipo = models.CharField(max_length=100)
+    descripcion = models.CharField(max_length=200, blank=True, default='')
+    parametros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default=ESTADO_PENDIENTE)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tareas',
+    )
+
+    # Progreso: `hechos` de `total` (total nulo si no se conoce de antemano)
+    hechos = models.IntegerField(default=0)
+    total = models.IntegerField(null=True, blank=True)
+    mensaje = models.CharField(max_length=200, blank=True, default='')
+
+    resultado = models.JSONField(null=True, blank=True)
+    # nombre del archivo generado, dentro de la carpeta de la tarea (ver cola.carpeta)
+    archivo = models.CharField(max_length=200, blank=True, default='')
+    error = models.TextField(blank=True, default='')
+
+    trabajador = models.CharField(max_length=100, blank=True, default='')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+    # lo renueva el trabajador mientras ejecuta; si se atrasa, la tarea quedó colgada
+    latido = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Tarea'
+        verbose_name_plural = 'Tareas'
+        ordering = ['-fecha_creacion']
+        indexes = [
+            # el trabajador busca la pendiente más vieja
+            models.Index(fields=['estado', 'fecha_creacion'], name='tarea_estado_creacion_idx'),
+        ]
+
+    def __str__(self):
+        return f"Tarea #{self.idTarea} {self.tipo} ({self.get_estado_display()})"
+
+    @property
+    def terminada(self):
+        return self.estado in (self.ESTADO_TERMINADA, self.ESTADO_FALLIDA)
+
+    @property
+    def porcentaje(self):
+        if self.estado == self.ESTADO_TERMINADA:
+            return 100
+        if not self.total:
+            return None
+        return min(100, int(self.hechos * 100 / self.total))
@@ -0,0 +1,67 @@
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.utils.module_loading import import_string
+
+from djangoPrueba.exportacion import (
+    CHUNK_SIZE,
+    FORMATO_XLSX,
+    ExportacionInvalida,
+    escribir_csv,
+    escribir_xlsx,
+    exportar as exportar_ahora,
+    leer_pedido,
+    nombre_archivo,
+)
+from .cola import encolar, registrar_tarea
+
+
+def exportar_o_encolar(request, nombre, generar):
+    """
+    Como djangoPrueba.exportacion.exportar(); con ?segundo_plano=1 encola
+    la exportación y redirige a la página de la tarea, que ofrece el
+    archivo para descargar cuando el trabajador termina de escribirlo.
+    """
+    parametros = request.GET.dict()
+    if not parametros.pop('segundo_plano', ''):
+        return exportar_ahora(request, nombre, generar)
+
+    try:
+        # valida el formato y los filtros ahora y no recién en el trabajador
+        formato, _, _ = leer_pedido(parametros, generar)
+    except ExportacionInvalida as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    tarea = encolar(
+        'exportar',
+        usuario=request.user,
+        descripcion=f'Exportación de {nombre.replace("_", " ")} ({formato.upper()})',
+        nombre=nombre,
+        generador=f'{generar.__module__}.{generar.__qualname__}',
+        parametros=parametros,
+        formato=formato,
+    )
+    return redirect('tarea_detalle', id=tarea.pk)
+
+
+@registrar_tarea('exportar')
+def exportar(contexto, nombre, generador, parametros, formato):
+    """Escribe a un archivo una exportación encolada por exportar_o_encolar()."""
+    encabezados, filas = import_string(generador)(parametros)
+    ruta = contexto.archivo(nombre_archivo(nombre, formato))
+
+    contador = {'filas': 0}
+
+    def contar(filas):
+        for fila in filas:
+            yield fila
+            contador['filas'] += 1
+            if contador['filas'] % CHUNK_SIZE == 0:
+                contexto.avanzar(contador['filas'], mensaje='Filas escritas')
+
+    if formato == FORMATO_XLSX:
+        escribir_xlsx(ruta, nombre, encabezados, contar(filas))
+    else:
+        with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+            escribir_csv(archivo, encabezados, contar(filas))
+    contexto.avanzar(contador['filas'], contador['filas'], 'Filas escritas', forzar=True)
+    return {'filas': contador['filas']}
@@ -0,0 +1,115 @@
+import io
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from djangoPrueba.fabricas import crear_escenario
+from djangoPrueba.pruebas import TestCase
+from gestionVentas.models import Venta
+
+from .cola import encolar, marcar_colgadas, registrar_tarea, trabajar
+from .models import Tarea
+
+
+@registrar_tarea('prueba_contar')
+def _contar(contexto, hasta):
+    for i in range(hasta):
+        contexto.avanzar(i + 1, hasta)
+    return {'contadas': hasta}
+
+
+@registrar_tarea('prueba_fallar')
+def _fallar(contexto):
+    raise RuntimeError('algo salió mal')
+
+
+class ColaTareasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_escenario()
+
+    def setUp(self):
+        super().setUp()
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        configuracion = override_settings(TAREAS={'DIRECTORIO': self.directorio, 'UMBRAL_ADMIN': 5})
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.client.force_login(self.datos.usuario)
+
+    def test_ejecuta_la_pendiente(self):
+        tarea = encolar('prueba_contar', usuario=self.datos.usuario, hasta=3)
+        self.assertEqual(trabajar('prueba', una_vez=True), 1)
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, Tarea.ESTADO_TERMINADA)
+        self.assertEqual(tarea.resultado, {'contadas': 3})
+        self.assertEqual(tarea.porcentaje, 100)
+
+    def test_error_queda_guardado(self):
+        tarea = encolar('prueba_fallar')
+        with self.assertLogs('gestionTareas.cola', 'ERROR'):
+            trabajar('prueba', una_vez=True)
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, Tarea.ESTADO_FALLIDA)
+        self.assertIn('algo salió mal', tarea.error)
+
+    def test_tarea_colgada(self):
+        tarea = encolar('prueba_contar', hasta=1)
+        Tarea.objects.filter(pk=tarea.pk).update(
+            estado=Tarea.ESTADO_EN_CURSO, latido='2000-01-01T00:00:00Z'
+        )
+        self.assertEqual(marcar_colgadas(), 1)
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, Tarea.ESTADO_FALLIDA)
+
+    def test_exportacion_en_segundo_plano(self):
+        response = self.client.get(reverse('ventas_exportar'), {'estado': 'CONFIRMADA', 'segundo_plano': '1'})
+        tarea = Tarea.objects.get()
+        self.assertRedirects(response, reverse('tarea_detalle', args=[tarea.pk]))
+        self.assertEqual(tarea.parametros['parametros'], {'estado': 'CONFIRMADA'})
+
+        call_command('procesar_tareas', una_vez=True, stdout=io.StringIO())
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, Tarea.ESTADO_TERMINADA)
+        confirmadas = Venta.objects.filter(estado=Venta.ESTADO_CONFIRMADA).count()
+        self.assertEqual(tarea.resultado, {'filas': confirmadas})
+
+        estado = self.client.get(reverse('tarea_estado', args=[tarea.pk])).json()
+        self.assertTrue(estado['terminada'])
+        self.assertEqual(estado['descarga'], reverse('tarea_descargar', args=[tarea.pk]))
+        response = self.client.get(estado['descarga'])
+        self.assertEqual(response.status_code, 200)
+        lineas = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lineas), confirmadas + 1)
+
+    def test_detalle(self):
+        tarea = encolar('prueba_contar', usuario=self.datos.usuario, hasta=1)
+        response = self.client.get(reverse('tarea_detalle', args=[tarea.pk]))
+        self.assertContains(response, 'tarea-datos')
+
+    def test_tarea_de_otro_usuario(self):
+        tarea = encolar('prueba_contar', usuario=self.datos.usuario, hasta=1)
+        otro = User.objects.create_user('otro', password='clave')
+        self.client.force_login(otro)
+        self.assertEqual(self.client.get(reverse('tarea_estado', args=[tarea.pk])).status_code, 404)
+
+    def test_accion_admin_sobre_el_umbral_se_encola(self):
+        pendientes = [v.pk for v in self.datos.ventas if v.estado == Venta.ESTADO_PENDIENTE][:10]
+        response = self.client.post(reverse('admin:gestionVentas_venta_changelist'), {
+            'action': 'action_confirmar_ventas',
+            '_selected_action': pendientes,
+        })
+        self.assertEqual(response.status_code, 302)
+        tarea = Tarea.objects.get()
+        self.assertEqual(tarea.tipo, 'confirmar_ventas')
+        # nada se confirmó durante el request
+        self.assertEqual(Venta.objects.filter(pk__in=pendientes, estado=Venta.ESTADO_PENDIENTE).count(), 10)
+
+        trabajar('prueba', una_vez=True)
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.resultado['confirmadas'], 10)
+        self.assertEqual(Venta.objects.filter(pk__in=pendientes, estado=Venta.ESTADO_CONFIRMADA).count(), 10)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('<int:id>/', views.tarea_detalle, name='tarea_detalle'),
+    path('<int:id>/estado/', views.tarea_estado, name='tarea_estado'),
+    path('<int:id>/descargar/', views.tarea_descargar, name='tarea_descargar'),
+]
@@ -0,0 +1,62 @@
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+
+from .cola import ruta_archivo
+from .models import Tarea
+
+
+def _tarea(request, id):
+    """La tarea si es del usuario (el staff ve todas)."""
+    tarea = get_object_or_404(Tarea, pk=id)
+    if not (request.user.is_staff or tarea.usuario_id == request.user.pk):
+        raise Http404
+    return tarea
+
+
+def _estado(tarea):
+    return {
+        'id': tarea.idTarea,
+        'tipo': tarea.tipo,
+        'descripcion': tarea.descripcion,
+        'estado': tarea.estado,
+        'estado_display': tarea.get_estado_display(),
+        'terminada': tarea.terminada,
+        'hechos': tarea.hechos,
+        'total': tarea.total,
+        'porcentaje': tarea.porcentaje,
+        'mensaje': tarea.mensaje,
+        'resultado': tarea.resultado,
+        # solo la última línea del traceback (el completo queda en el admin)
+        'error': tarea.error.strip().splitlines()[-1] if tarea.error.strip() else '',
+        'descarga': (
+            reverse('tarea_descargar', args=[tarea.pk])
+            if tarea.estado == Tarea.ESTADO_TERMINADA and tarea.archivo else None
+        ),
+    }
+
+
+@login_required
+def tarea_detalle(request, id):
+    """Página de la tarea; consulta tarea_estado hasta que termina."""
+    tarea = _tarea(request, id)
+    return render(request, 'tareas/tarea_detalle.html', {
+        'tarea': tarea,
+        'estado': _estado(tarea),
+    })
+
+
+@login_required
+def tarea_estado(request, id):
+    """Estado y progreso de una tarea en JSON (para consultar periódicamente)."""
+    return JsonResponse(_estado(_tarea(request, id)))
+
+
+@login_required
+def tarea_descargar(request, id):
+    tarea = _tarea(request, id)
+    ruta = ruta_archivo(tarea)
+    if tarea.estado != Tarea.ESTADO_TERMINADA or ruta is None or not ruta.exists():
+        raise Http404('La tarea no tiene un archivo para descargar')
+    return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=tarea.archivo)
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 from .models import Usuario, Rol
 
 # Register your models here.
@@ -9,6 +10,7 @@ from .models import Usuario, Rol
 class UsuarioAdmin(admin.ModelAdmin):
     list_display = ('user', 'rol', 'activo', 'fecha_registro')
     list_filter = ('rol', 'activo')
+    list_select_related = ('user', 'rol')
     search_fields = ('user__username', 'user__email')
     ordering = ('-fecha_registro',)
 
@@ -35,6 +37,10 @@ class RolAdmin(admin.ModelAdmin):
     list_display = ('nombre', 'descripcion', 'cantidad_usuarios')
     search_fields = ('nombre', 'descripcion')
     
+    # Conteo anotado en la consulta del listado (no un COUNT por fila)
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(num_usuarios=Count('usuarios'))
+
+    @admin.display(description='Usuarios', ordering='num_usuarios')
     def cantidad_usuarios(self, obj):
-        return obj.usuarios.count()
-    cantidad_usuarios.short_description = 'Usuarios'
\ No newline at end of file
+        return obj.num_usuarios
\ No newline at end of file
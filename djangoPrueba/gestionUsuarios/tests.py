@@ -1,3 +1,19 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from djangoPrueba.pruebas import ConsultasVistasMixin, TestCase
+
+
+class ConsultasUsuariosTests(ConsultasVistasMixin, TestCase):
+    """Cantidad de consultas por vista; no debe depender de la cantidad de filas."""
+
+    def test_home(self):
+        self.assertConsultas(2, reverse('home'))
+
+    def test_admin(self):
+        for modelo, cantidad in [('usuario', 6), ('rol', 5)]:
+            with self.subTest(modelo=modelo):
+                self.assertConsultas(cantidad, reverse(f'admin:gestionUsuarios_{modelo}_changelist'))
+
+
+class ConsultasUsuariosEscalaTests(ConsultasUsuariosTests):
+    escala = 10
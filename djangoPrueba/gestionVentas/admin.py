@@ -1,51 +1,104 @@
 # gestionVentas/admin.py
-from django.contrib import admin
+from django.contrib import admin, messages
 from .models import Venta, DetalleVenta
 from django import forms
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.urls import reverse
+from django.utils.html import format_html
+from gestionTareas.cola import configuracion as configuracion_tareas, encolar
 
 class DetalleVentaInline(admin.TabularInline):
     model = DetalleVenta
     extra = 1
     fields = ('producto', 'cantidad', 'precio_unitario', 'iva_porcentaje', 'iva_monto', 'subtotal_con_iva_calc', 'observacion')
-    readonly_fields = ('iva_porcentaje', 'iva_monto', 'subtotal_con_iva')
+    readonly_fields = ('iva_porcentaje', 'iva_monto', 'subtotal_con_iva_calc')
     autocomplete_fields = ('producto',)
 
 class VentaAdminForm(forms.ModelForm):
     class Meta:
         model = Venta
         fields = '__all__'
-        readonly_fields = ('total', 'total_con_iva', 'iva_total', 'estado')
 
 class VentaAdmin(admin.ModelAdmin):
     form = VentaAdminForm
     inlines = [DetalleVentaInline]
     list_display = ('idVenta', 'cliente', 'usuario', 'fecha_venta', 'estado', 'total_con_iva')
-    readonly_fields = ('total', 'total_con_iva', 'iva_total')
+    # Usuario.__str__ usa user.username
+    list_select_related = ('cliente', 'usuario__user')
+    # el estado cambia solo con las acciones (confirmar_lote/cancelar_lote),
+    # que mueven stock, movimientos y resúmenes
+    readonly_fields = ('total', 'total_con_iva', 'iva_total', 'estado')
     actions = ['action_confirmar_ventas', 'action_cancelar_ventas']
     autocomplete_fields = ('cliente', 'usuario')
 
+    # Una venta confirmada ya descontó stock y está en los resúmenes: no se borra
+    def has_delete_permission(self, request, obj=None):
+        if obj is not None and obj.estado == Venta.ESTADO_CONFIRMADA:
+            return False
+        return super().has_delete_permission(request, obj)
+
+    def get_deleted_objects(self, objs, request):
+        eliminables, cantidades, permisos, protegidas = super().get_deleted_objects(objs, request)
+        protegidas = list(protegidas) + [
+            f"{venta} (confirmada)" for venta in objs if venta.estado == Venta.ESTADO_CONFIRMADA
+        ]
+        return eliminables, cantidades, permisos, protegidas
+
+    def _encolar_si_son_muchas(self, request, queryset, tipo, verbo):
+        """
+        Más de TAREAS['UMBRAL_ADMIN'] ventas se procesan en segundo plano
+        (gestionVentas/tareas.py) para no retener el request.
+        """
+        cantidad = queryset.count()
+        if cantidad <= configuracion_tareas()['UMBRAL_ADMIN']:
+            return False
+        tarea = encolar(
+            tipo,
+            usuario=request.user,
+            descripcion=f"{verbo.capitalize()} {cantidad} ventas",
+            ids=list(queryset.values_list('pk', flat=True)),
+        )
+        self.message_user(request, format_html(
+            'Se van a {} {} ventas en segundo plano (tarea #{}). <a href="{}">Ver progreso</a>',
+            verbo, cantidad, tarea.pk, reverse('tarea_detalle', args=[tarea.pk]),
+        ))
+        return True
+
+    def _informar(self, request, resultado, verbo):
+        """Un único mensaje con lo procesado y los errores por venta."""
+        if not resultado.errores:
+            nivel = messages.SUCCESS
+        elif resultado.procesadas:
+            nivel = messages.WARNING
+        else:
+            nivel = messages.ERROR
+        self.message_user(request, resultado.resumen(verbo), level=nivel)
+
     def action_confirmar_ventas(self, request, queryset):
         # sólo staff o superuser pueden confirmar desde admin
         if not request.user.is_staff:
             raise PermissionDenied
-        for venta in queryset:
-            try:
-                venta.confirmar(usuario=request.user)
-                self.message_user(request, f"Venta #{venta.idVenta} confirmada.")
-            except Exception as e:
-                self.message_user(request, f"No se pudo confirmar Venta #{venta.idVenta}: {e}", level='error')
+        if self._encolar_si_son_muchas(request, queryset, 'confirmar_ventas', 'confirmar'):
+            return
+        try:
+            resultado = Venta.confirmar_lote(queryset, usuario=request.user)
+        except ValidationError as e:
+            self.message_user(request, f"No se confirmó ninguna venta: {' '.join(e.messages)}", level=messages.ERROR)
+            return
+        self._informar(request, resultado, 'confirmadas')
     action_confirmar_ventas.short_description = "Confirmar ventas seleccionadas"
 
     def action_cancelar_ventas(self, request, queryset):
         if not request.user.is_staff:
             raise PermissionDenied
-        for venta in queryset:
-            try:
-                venta.cancelar()
-                self.message_user(request, f"Venta #{venta.idVenta} cancelada.")
-            except Exception as e:
-                self.message_user(request, f"No se pudo cancelar Venta #{venta.idVenta}: {e}", level='error')
+        if self._encolar_si_son_muchas(request, queryset, 'cancelar_ventas', 'cancelar'):
+            return
+        try:
+            resultado = Venta.cancelar_lote(queryset)
+        except ValidationError as e:
+            self.message_user(request, f"No se canceló ninguna venta: {' '.join(e.messages)}", level=messages.ERROR)
+            return
+        self._informar(request, resultado, 'canceladas')
     action_cancelar_ventas.short_description = "Cancelar ventas seleccionadas"
 
 admin.site.register(Venta, VentaAdmin)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionClientes', '0001_initial'),
+        ('gestionProductos', '0006_indices_consultas_frecuentes'),
+        ('gestionUsuarios', '0001_initial'),
+        ('gestionVentas', '0005_detalleventa_subtotal_con_iva'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='detalleventa',
+            index=models.Index(fields=['producto', 'venta'], name='detalleventa_prod_venta_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['estado', 'fecha_venta'], name='venta_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['fecha_venta', 'idVenta'], name='venta_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 19:00
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F
+
+
+def calcular_subtotales(apps, schema_editor):
+    # un solo UPDATE; antes de crear el índice para no mantenerlo fila por fila
+    DetalleVenta = apps.get_model('gestionVentas', 'DetalleVenta')
+    DetalleVenta.objects.update(subtotal=F('cantidad') * F('precio_unitario'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestionProductos', '0010_historialprecio'),
+        ('gestionVentas', '0006_indices_consultas_frecuentes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='detalleventa',
+            name='detalleventa_prod_venta_idx',
+        ),
+        migrations.AddField(
+            model_name='detalleventa',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=12),
+        ),
+        migrations.RunPython(calcular_subtotales, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='detalleventa',
+            index=models.Index(fields=['producto', 'venta', 'cantidad', 'subtotal'], name='detventa_prod_venta_sub_idx'),
+        ),
+    ]
@@ -1,10 +1,14 @@
 # gestionVentas/models.py
+from collections import defaultdict
 from django.db import models, transaction
+from django.db.models import Case, F, Sum, Value, When
 from django.core.exceptions import ValidationError
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
+from djangoPrueba.importes import calcular_iva, calcular_subtotal
 from gestionClientes.models import Cliente
 from gestionUsuarios.models import Usuario
-from gestionProductos.models import Productos
+from gestionProductos.models import Productos, MovimientoStock
+from .signals import venta_estado_cambiado
 
 class Venta(models.Model):
     METODO_PAGO_CHOICES = [
@@ -41,15 +45,28 @@ class Venta(models.Model):
         verbose_name = 'Venta'
         verbose_name_plural = 'Ventas'
         ordering = ['-fecha_venta']
+        indexes = [
+            # filtros por estado + rango de fechas (listado, contadores, informes)
+            models.Index(fields=['estado', 'fecha_venta'], name='venta_estado_fecha_idx'),
+            # listado sin filtro paginado por (fecha_venta, idVenta)
+            models.Index(fields=['fecha_venta', 'idVenta'], name='venta_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"Venta #{self.idVenta} - {self.cliente.nombre_completo()}"
 
-    def calcular_total(self):
-        detalles = self.detalles.all()
-        total = sum((det.subtotal for det in detalles), Decimal('0.00'))
-        total_con_iva = sum((det.subtotal_con_iva for det in detalles), Decimal('0.00'))
-        iva_total = sum((det.iva_monto for det in detalles), Decimal('0.00'))
+    def calcular_total(self, detalles=None):
+        if detalles is None:
+            totales = self.detalles.aggregate(
+                total=Sum('subtotal'), total_con_iva=Sum('subtotal_con_iva'), iva_total=Sum('iva_monto'),
+            )
+            total = totales['total'] or Decimal('0.00')
+            total_con_iva = totales['total_con_iva'] or Decimal('0.00')
+            iva_total = totales['iva_total'] or Decimal('0.00')
+        else:
+            total = sum((det.subtotal for det in detalles), Decimal('0.00'))
+            total_con_iva = sum((det.subtotal_con_iva for det in detalles), Decimal('0.00'))
+            iva_total = sum((det.iva_monto for det in detalles), Decimal('0.00'))
 
         # Guardar sin reentrar en loops infinitos
         self.total = total
@@ -58,32 +75,56 @@ class Venta(models.Model):
         self.save(update_fields=['total', 'total_con_iva', 'iva_total'])
         return total
 
+    def reemplazar_detalles(self, lineas):
+        """
+        Reemplaza los detalles de la venta en lote.
+        `lineas` es una lista de dicts con producto_id, cantidad,
+        precio_unitario (opcional) y observacion (opcional).
+
+        Trae todos los productos con un solo in_bulk, calcula IVA y subtotales
+        en memoria, inserta con bulk_create y guarda los totales una sola vez.
+        """
+        if not lineas:
+            raise ValidationError('Debe agregar al menos un producto')
+
+        productos = Productos.objects.in_bulk({int(l['producto_id']) for l in lineas})
+
+        detalles = []
+        for linea in lineas:
+            producto = productos.get(int(linea['producto_id']))
+            if producto is None:
+                raise ValidationError(f"Producto inexistente: {linea['producto_id']}")
+
+            detalle = DetalleVenta(
+                venta=self,
+                producto=producto,
+                cantidad=int(linea['cantidad']),
+                precio_unitario=linea.get('precio_unitario'),
+                observacion=linea.get('observacion') or '',
+            )
+            detalle.calcular_importes()
+            detalle.clean_fields(exclude=['venta', 'producto'])
+            detalle.clean()
+            detalles.append(detalle)
+
+        with transaction.atomic():
+            self.detalles.all().delete()
+            DetalleVenta.objects.bulk_create(detalles)
+            self.calcular_total(detalles)
+        return detalles
+
     def confirmar(self, usuario=None):
         """
         Confirmar la venta: validar stock nuevamente y descontar.
         Debe llamarse en un contexto donde el usuario tenga permisos (ver views/admin).
+        Es confirmar_lote() con una sola venta.
         """
         if self.estado != self.ESTADO_PENDIENTE:
             raise ValidationError("Solo ventas pendientes pueden confirmarse.")
-
-        detalles = self.detalles.select_related('producto').all()
-
-        with transaction.atomic():
-            # Re-check stock y descontar
-            for det in detalles:
-                prod = det.producto
-                if det.cantidad > prod.stock:
-                    raise ValidationError(
-                        f"Stock insuficiente para el producto '{prod.nombre}'. "
-                        f"Disponible: {prod.stock}, requerido: {det.cantidad}"
-                    )
-                # descontar
-                prod.stock = prod.stock - det.cantidad
-                prod.save(update_fields=['stock'])
-
-            # cambiar estado
-            self.estado = self.ESTADO_CONFIRMADA
-            self.save(update_fields=['estado'])
+        resultado = Venta.confirmar_lote([self.pk], usuario=usuario)
+        if not resultado.procesadas:
+            raise ValidationError(resultado.errores.get(self.pk, "Solo ventas pendientes pueden confirmarse."))
+        self.estado = self.ESTADO_CONFIRMADA
 
     def cancelar(self, motivo=None):
         """
@@ -92,8 +133,175 @@ class Venta(models.Model):
         """
         if self.estado != self.ESTADO_PENDIENTE:
             raise ValidationError("Solo ventas pendientes pueden cancelarse.")
+        resultado = Venta.cancelar_lote([self.pk])
+        if not resultado.procesadas:
+            raise ValidationError(resultado.errores.get(self.pk, "Solo ventas pendientes pueden cancelarse."))
         self.estado = self.ESTADO_CANCELADA
-        self.save(update_fields=['estado'])
+
+    @classmethod
+    def _bloquear(cls, ventas, estado_requerido, mensaje, resultado):
+        """
+        Trae y bloquea las ventas (ids o queryset) de la más vieja a la más
+        nueva; las que no están en `estado_requerido` van a los errores.
+        """
+        seleccion = (
+            cls.objects.select_for_update(of=('self',))
+            .select_related('cliente')
+            .filter(pk__in=ventas)
+            .order_by('fecha_venta', 'idVenta')
+        )
+        validas = []
+        for venta in seleccion:
+            if venta.estado == estado_requerido:
+                validas.append(venta)
+            else:
+                resultado.errores[venta.pk] = [mensaje]
+        return validas
+
+    @classmethod
+    def _cambiar_estado(cls, ventas, estado_anterior, estado_nuevo):
+        # UPDATE condicional: si otra operación las cambió mientras tanto, se deshace todo
+        cambiadas = cls.objects.filter(
+            pk__in=[venta.pk for venta in ventas], estado=estado_anterior
+        ).update(estado=estado_nuevo)
+        if cambiadas != len(ventas):
+            raise ValidationError("Las ventas cambiaron durante la operación. Intente nuevamente.")
+        for venta in ventas:
+            venta.estado = estado_nuevo
+        venta_estado_cambiado.send(
+            sender=Venta, ventas=ventas, estado_anterior=estado_anterior, estado_nuevo=estado_nuevo,
+        )
+
+    @classmethod
+    def confirmar_lote(cls, ventas, usuario=None):
+        """
+        Confirma varias ventas (ids o queryset) en una transacción, con la
+        misma cantidad de consultas para 1 o 2000 ventas: un SELECT de las
+        ventas, uno de todos sus detalles, los productos bloqueados en una
+        consulta, un UPDATE de stock (condicional, stock >= cantidad) por
+        cada LOTE_STOCK productos y uno de estado.
+
+        El stock se asigna de la venta más vieja a la más nueva. Una venta
+        que no está pendiente o sin stock suficiente para todas sus líneas
+        no se confirma y queda en ResultadoLote.errores; las demás sí.
+        """
+        resultado = ResultadoLote()
+        with transaction.atomic():
+            pendientes = cls._bloquear(
+                ventas, cls.ESTADO_PENDIENTE, "Solo ventas pendientes pueden confirmarse.", resultado
+            )
+            if not pendientes:
+                return resultado
+
+            detalles = defaultdict(list)
+            for det in DetalleVenta.objects.filter(venta__in=pendientes):
+                detalles[det.venta_id].append(det)
+
+            productos = Productos.objects.select_for_update().in_bulk(
+                {det.producto_id for lineas in detalles.values() for det in lineas}
+            )
+            disponible = {prod_id: producto.stock for prod_id, producto in productos.items()}
+
+            # Demanda total por producto de las ventas que alcanzan a confirmarse
+            demanda_total = defaultdict(int)
+            for venta in pendientes:
+                demanda = defaultdict(int)
+                for det in detalles[venta.pk]:
+                    det.venta = venta
+                    demanda[det.producto_id] += det.cantidad
+
+                errores = [
+                    f"Stock insuficiente para el producto '{productos[prod_id].nombre}'. "
+                    f"Disponible: {disponible[prod_id]}, requerido: {cantidad}"
+                    for prod_id, cantidad in demanda.items()
+                    if cantidad > disponible[prod_id]
+                ]
+                if errores:
+                    resultado.errores[venta.pk] = errores
+                    continue
+                for prod_id, cantidad in demanda.items():
+                    disponible[prod_id] -= cantidad
+                    demanda_total[prod_id] += cantidad
+                resultado.procesadas.append(venta)
+
+            if not resultado.procesadas:
+                return resultado
+
+            descontar_stock(demanda_total)
+
+            cls._cambiar_estado(resultado.procesadas, cls.ESTADO_PENDIENTE, cls.ESTADO_CONFIRMADA)
+
+            # registrar salidas en el historial de stock
+            MovimientoStock.objects.bulk_create([
+                MovimientoStock.desde_detalle_venta(det)
+                for venta in resultado.procesadas for det in detalles[venta.pk]
+            ])
+        return resultado
+
+    @classmethod
+    def cancelar_lote(cls, ventas):
+        """Cancela varias ventas pendientes (ids o queryset) con un único UPDATE."""
+        resultado = ResultadoLote()
+        with transaction.atomic():
+            resultado.procesadas = cls._bloquear(
+                ventas, cls.ESTADO_PENDIENTE, "Solo ventas pendientes pueden cancelarse.", resultado
+            )
+            if resultado.procesadas:
+                cls._cambiar_estado(resultado.procesadas, cls.ESTADO_PENDIENTE, cls.ESTADO_CANCELADA)
+        return resultado
+
+
+class ResultadoLote:
+    """Ventas que cambiaron de estado y errores por venta de confirmar_lote / cancelar_lote."""
+
+    def __init__(self):
+        self.procesadas = []
+        self.errores = {}  # idVenta -> lista de mensajes
+
+    def resumen(self, verbo, maximo=10):
+        """Un solo mensaje para mostrar al usuario, ej. resumen('confirmadas')."""
+        texto = f"{len(self.procesadas)} ventas {verbo}."
+        if self.errores:
+            detalle = '; '.join(
+                f"#{pk}: {' '.join(mensajes)}" for pk, mensajes in list(self.errores.items())[:maximo]
+            )
+            restantes = len(self.errores) - maximo
+            if restantes > 0:
+                detalle += f"; y {restantes} más"
+            texto += f" {len(self.errores)} con errores: {detalle}."
+        return texto
+
+
+# productos por UPDATE al descontar stock: acota la cantidad de parámetros
+# de cada consulta aunque una confirmación toque miles de productos
+LOTE_STOCK = 500
+
+
+def descontar_stock(demanda):
+    """
+    Descuenta {producto_id: cantidad} con UPDATE ... SET stock = stock - qty
+    WHERE pk IN (...) AND stock >= qty, de a LOTE_STOCK productos. Debe
+    llamarse dentro de una transacción, con los productos ya bloqueados.
+
+    El mínimo por producto va en un CASE plano: un OR por producto supera la
+    profundidad máxima de expresión de SQLite (1000).
+    """
+    ids = list(demanda)
+    for inicio in range(0, len(ids), LOTE_STOCK):
+        parte = {prod_id: demanda[prod_id] for prod_id in ids[inicio:inicio + LOTE_STOCK]}
+        minimo = Case(
+            *[When(pk=prod_id, then=Value(cantidad)) for prod_id, cantidad in parte.items()],
+            output_field=models.IntegerField(),
+        )
+        descontados = Productos.objects.filter(pk__in=list(parte), stock__gte=minimo).update(
+            stock=Case(
+                *[When(pk=prod_id, then=F('stock') - cantidad) for prod_id, cantidad in parte.items()],
+                default=F('stock'),
+            )
+        )
+        if descontados != len(parte):
+            raise ValidationError("El stock cambió durante la confirmación. Intente nuevamente.")
+
 
 class DetalleVenta(models.Model):
     idDetalleVenta = models.AutoField(primary_key=True)
@@ -101,6 +309,8 @@ class DetalleVenta(models.Model):
     producto = models.ForeignKey(Productos, on_delete=models.PROTECT, related_name='detalles_venta')
     cantidad = models.IntegerField(default=1)
     precio_unitario = models.DecimalField(max_digits=12, decimal_places=2)
+    # cantidad * precio_unitario, guardado para sumar en SQL (ver calcular_importes)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), editable=False)
 
     iva_porcentaje = models.DecimalField(max_digits=6, decimal_places=2, default=Decimal('0.00'))
     iva_monto = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
@@ -111,16 +321,17 @@ class DetalleVenta(models.Model):
     class Meta:
         verbose_name = 'Detalle de venta'
         verbose_name_plural = 'Detalles de venta'
+        indexes = [
+            # ventas de un producto (ranking, historial) y sus unidades e
+            # ingresos sumados sin leer la tabla
+            models.Index(
+                fields=['producto', 'venta', 'cantidad', 'subtotal'], name='detventa_prod_venta_sub_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Detalle #{self.idDetalleVenta} - Venta #{self.venta.idVenta}"
 
-    @property
-    def subtotal(self):
-        if not self.cantidad or not self.precio_unitario:
-            return Decimal('0.00')
-        return (Decimal(self.cantidad) * Decimal(self.precio_unitario))
-
     @property
     def subtotal_con_iva_calc(self):
         base = self.subtotal
@@ -140,25 +351,18 @@ class DetalleVenta(models.Model):
         if self.cantidad > self.producto.stock:
             raise ValidationError(f"Cantidad ({self.cantidad}) supera el stock disponible ({self.producto.stock}) para el producto {self.producto.nombre}.")
 
-    def save(self, *args, **kwargs):
+    def calcular_importes(self):
+        """Completa precio, subtotal, IVA y subtotal con IVA a partir del producto (sin tocar la base)."""
         if not self.precio_unitario:
             self.precio_unitario = self.producto.precioUnitario
 
         self.iva_porcentaje = self.producto.iva or Decimal('0.00')
 
-        base = self.subtotal
-
-        # Calcular iva con 2 decimales
-        self.iva_monto = (
-            (base * self.iva_porcentaje / Decimal('100'))
-            .quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        )
+        self.subtotal = calcular_subtotal(self.cantidad, self.precio_unitario)
+        self.iva_monto, self.subtotal_con_iva = calcular_iva(self.subtotal, self.iva_porcentaje)
 
-        # Subtotal con iva redondeado
-        self.subtotal_con_iva = (
-            (base + self.iva_monto)
-            .quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        )
+    def save(self, *args, **kwargs):
+        self.calcular_importes()
 
         # Validación
         self.full_clean()
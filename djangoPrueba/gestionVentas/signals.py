@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Se envía dentro de la transacción que cambia el estado de una o más ventas.
+# Argumentos: ventas (lista de Venta), estado_anterior, estado_nuevo
+venta_estado_cambiado = Signal()
@@ -0,0 +1,41 @@
+from django.core.exceptions import ValidationError
+
+from gestionTareas.cola import registrar_tarea
+from .models import Venta
+
+# ventas por transacción: el progreso avanza de a un lote
+LOTE = 500
+
+
+def _procesar(contexto, ids, operacion, verbo):
+    ids = sorted(ids)
+    total = len(ids)
+    hechas, errores = 0, []
+    for inicio in range(0, total, LOTE):
+        parte = ids[inicio:inicio + LOTE]
+        try:
+            resultado = operacion(parte)
+        except ValidationError as e:
+            # el lote se deshizo entero
+            errores.extend({'venta': pk, 'error': ' '.join(e.messages)} for pk in parte)
+        else:
+            hechas += len(resultado.procesadas)
+            errores.extend(
+                {'venta': pk, 'error': ' '.join(mensajes)} for pk, mensajes in resultado.errores.items()
+            )
+        contexto.avanzar(inicio + len(parte), total, f'{hechas} {verbo}, {len(errores)} con error')
+    return {verbo: hechas, 'errores': errores}
+
+
+@registrar_tarea('confirmar_ventas')
+def confirmar_ventas(contexto, ids):
+    """Confirmación de ventas encolada desde el admin."""
+    return _procesar(
+        contexto, ids, lambda parte: Venta.confirmar_lote(parte, usuario=contexto.usuario), 'confirmadas'
+    )
+
+
+@registrar_tarea('cancelar_ventas')
+def cancelar_ventas(contexto, ids):
+    """Cancelación de ventas encolada desde el admin."""
+    return _procesar(contexto, ids, Venta.cancelar_lote, 'canceladas')
@@ -1,3 +1,214 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import datetime, timezone
 
-# Create your tests here.
+from collections import Counter
+from decimal import Decimal
+
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from djangoPrueba.fabricas import crear_escenario
+from djangoPrueba.fechas import RangoFechas
+from djangoPrueba.pruebas import ConsultasVistasMixin, PlanConsultaMixin, TestCase
+from gestionClientes.models import Cliente
+from gestionProductos.models import MovimientoStock, Productos
+from .models import Venta, DetalleVenta
+
+
+class IndicesVentasTests(PlanConsultaMixin, TestCase):
+    """Las consultas frecuentes sobre ventas usan índices."""
+
+    desde = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    hasta = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+    def test_estado_y_rango_de_fechas(self):
+        self.assertUsaIndice(
+            Venta.objects.filter(
+                estado=Venta.ESTADO_CONFIRMADA, fecha_venta__gte=self.desde, fecha_venta__lt=self.hasta
+            ),
+            'venta_estado_fecha_idx',
+        )
+
+    def test_contador_por_estado(self):
+        self.assertUsaIndice(
+            Venta.objects.filter(estado=Venta.ESTADO_PENDIENTE), 'venta_estado_fecha_idx'
+        )
+
+    def test_rango_de_fechas_del_listado(self):
+        rango = RangoFechas('2024-01-01', '2024-01-31')
+        self.assertUsaIndice(rango.filtrar(Venta.objects.all(), 'fecha_venta'), 'venta_fecha_idx')
+
+    def test_listado_paginado_sin_filtros(self):
+        self.assertUsaIndice(
+            Venta.objects.order_by('-fecha_venta', '-idVenta')[:11], 'venta_fecha_idx'
+        )
+
+    def test_ventas_de_un_producto(self):
+        self.assertUsaIndice(
+            DetalleVenta.objects.filter(producto_id=1).values('venta_id'),
+            'detventa_prod_venta_sub_idx',
+        )
+
+    def test_unidades_e_ingresos_de_un_producto(self):
+        self.assertUsaIndice(
+            DetalleVenta.objects.filter(producto_id=1).values('venta_id', 'cantidad', 'subtotal'),
+            'detventa_prod_venta_sub_idx',
+        )
+
+
+class ConsultasVentasTests(ConsultasVistasMixin, TestCase):
+    """Cantidad de consultas por vista; no debe depender de la cantidad de filas."""
+
+    def test_listado(self):
+        self.assertConsultas(6, reverse('ventas_list'))
+
+    def test_detalle(self):
+        self.assertConsultas(5, reverse('ventas_detalle', args=[self.datos.ventas[1].pk]))
+
+    def test_formularios(self):
+        self.assertConsultas(3, reverse('ventas_crear'))
+        # la primera venta de la fábrica está pendiente: se puede editar
+        self.assertConsultas(6, reverse('ventas_editar', args=[self.datos.ventas[0].pk]))
+
+    def test_exportaciones(self):
+        self.assertConsultas(3, reverse('ventas_exportar'))
+        self.assertConsultas(3, reverse('ventas_exportar_detalles'))
+
+    def test_api(self):
+        self.assertConsultas(3, reverse('get_producto_info', args=[self.datos.productos[1].pk]))
+        self.assertConsultas(3, reverse('get_cliente_info', args=[self.datos.clientes[1].pk]))
+
+    def test_admin(self):
+        self.assertConsultas(5, reverse('admin:gestionVentas_venta_changelist'))
+
+    def test_total_del_listado_se_actualiza(self):
+        antes = self.client.get(reverse('ventas_list')).context['ventas'].paginator.count
+        Venta.objects.create(cliente=self.datos.clientes[0], usuario=self.datos.perfil)
+        despues = self.client.get(reverse('ventas_list')).context['ventas'].paginator.count
+        self.assertEqual(despues, antes + 1)
+
+
+class ConsultasVentasEscalaTests(ConsultasVentasTests):
+    escala = 10
+
+
+class ExportacionVentasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_escenario()
+
+    def test_texto_con_formula_se_exporta_como_texto(self):
+        venta = self.datos.ventas[0]
+        Cliente.objects.filter(pk=venta.cliente_id).update(nombre='=HYPERLINK("http://x")', apellido='-1+1')
+        self.client.force_login(self.datos.usuario)
+
+        response = self.client.get(reverse('ventas_exportar'))
+        contenido = b''.join(response.streaming_content).decode('utf-8-sig')
+
+        fila = next(f for f in csv.reader(io.StringIO(contenido)) if f[0] == str(venta.pk))
+        self.assertEqual(fila[3:5], ['\'=HYPERLINK("http://x")', "'-1+1"])
+        # los importes no son texto del usuario: se exportan tal cual
+        self.assertEqual(fila[8], str(venta.total))
+
+
+class LoteVentasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = crear_escenario()
+        cls.pendientes = [v.pk for v in cls.datos.ventas if v.estado == Venta.ESTADO_PENDIENTE]
+
+    def _demanda(self, ids):
+        demanda = Counter()
+        for producto_id, cantidad in DetalleVenta.objects.filter(venta_id__in=ids).values_list(
+            'producto_id', 'cantidad'
+        ):
+            demanda[producto_id] += cantidad
+        return demanda
+
+    def test_confirma_y_descuenta_el_stock_agregado(self):
+        demanda = self._demanda(self.pendientes)
+        antes = dict(Productos.objects.values_list('pk', 'stock'))
+
+        resultado = Venta.confirmar_lote(self.pendientes, usuario=self.datos.usuario)
+
+        self.assertEqual(resultado.errores, {})
+        self.assertEqual(len(resultado.procesadas), len(self.pendientes))
+        self.assertFalse(Venta.objects.filter(pk__in=self.pendientes).exclude(estado=Venta.ESTADO_CONFIRMADA))
+        for producto_id, stock in Productos.objects.values_list('pk', 'stock'):
+            self.assertEqual(stock, antes[producto_id] - demanda[producto_id])
+        self.assertEqual(
+            MovimientoStock.objects.filter(referencia_id__in=self.pendientes, referencia_tipo='Venta').count(),
+            DetalleVenta.objects.filter(venta_id__in=self.pendientes).count(),
+        )
+
+    def test_consultas_no_dependen_de_la_cantidad(self):
+        with CaptureQueriesContext(connection) as pocas:
+            Venta.confirmar_lote(self.pendientes[:2])
+        # hasta 30 ventas: los movimientos entran en un solo INSERT también en SQLite
+        with CaptureQueriesContext(connection) as muchas:
+            Venta.confirmar_lote(self.pendientes[2:30])
+        self.assertEqual(len(pocas), len(muchas))
+
+    def test_sin_stock_falla_solo_esa_venta(self):
+        vieja, nueva = self.pendientes[:2]
+        detalle = DetalleVenta.objects.filter(venta_id=nueva).first()
+        # alcanza para la venta vieja pero no para las dos
+        necesario = self._demanda([vieja])[detalle.producto_id]
+        Productos.objects.filter(pk=detalle.producto_id).update(stock=necesario)
+        DetalleVenta.objects.filter(pk=detalle.pk).update(cantidad=1)
+
+        resultado = Venta.confirmar_lote([vieja, nueva, self.datos.ventas[1].pk])
+
+        self.assertEqual([v.pk for v in resultado.procesadas], [vieja])
+        self.assertIn('Stock insuficiente', resultado.errores[nueva][0])
+        self.assertIn(self.datos.ventas[1].pk, resultado.errores)
+        self.assertEqual(Venta.objects.get(pk=nueva).estado, Venta.ESTADO_PENDIENTE)
+        self.assertEqual(Productos.objects.get(pk=detalle.producto_id).stock, 0)
+
+    def test_cancelar_lote(self):
+        resultado = Venta.cancelar_lote(self.pendientes + [self.datos.ventas[1].pk])
+        self.assertEqual(len(resultado.procesadas), len(self.pendientes))
+        self.assertEqual(list(resultado.errores), [self.datos.ventas[1].pk])
+        self.assertEqual(
+            Venta.objects.filter(pk__in=self.pendientes, estado=Venta.ESTADO_CANCELADA).count(),
+            len(self.pendientes),
+        )
+
+    def test_accion_admin_un_solo_mensaje(self):
+        self.client.force_login(self.datos.usuario)
+        seleccion = self.pendientes[:20] + [self.datos.ventas[1].pk]
+        response = self.client.post(reverse('admin:gestionVentas_venta_changelist'), {
+            'action': 'action_confirmar_ventas',
+            '_selected_action': seleccion,
+        })
+        mensajes = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertEqual(len(mensajes), 1)
+        self.assertTrue(mensajes[0].startswith('20 ventas confirmadas. 1 con errores'))
+
+    def test_confirmar_venta_con_mas_de_mil_productos(self):
+        # un OR por producto superaba la profundidad máxima de expresión de SQLite
+        productos = Productos.objects.bulk_create([
+            Productos(
+                codProducto=f'M{i:05d}', nombre=f'Masivo {i}', descripcion='', precioUnitario=10, iva=Decimal('21.00'),
+                idMarca=self.datos.marcas[0], idCategoria=self.datos.categorias[0], stock=5,
+            )
+            for i in range(1200)
+        ])
+        venta = Venta.objects.create(cliente=self.datos.clientes[0], usuario=self.datos.perfil)
+        detalles = [DetalleVenta(venta=venta, producto=producto, cantidad=2) for producto in productos]
+        for detalle in detalles:
+            detalle.calcular_importes()
+        DetalleVenta.objects.bulk_create(detalles)
+
+        self.client.force_login(self.datos.usuario)
+        response = self.client.post(reverse('admin:gestionVentas_venta_changelist'), {
+            'action': 'action_confirmar_ventas',
+            '_selected_action': [venta.pk],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Venta.objects.get(pk=venta.pk).estado, Venta.ESTADO_CONFIRMADA)
+        self.assertFalse(Productos.objects.filter(codProducto__startswith='M').exclude(stock=3).exists())
@@ -4,6 +4,8 @@ from . import views
 urlpatterns = [
     # Listado y CRUD de ventas
     path('', views.ventas_list, name='ventas_list'),
+    path('exportar/', views.ventas_exportar, name='ventas_exportar'),
+    path('exportar/detalles/', views.ventas_exportar_detalles, name='ventas_exportar_detalles'),
     path('crear/', views.ventas_form, name='ventas_crear'),
     path('editar/<int:id>/', views.ventas_form, name='ventas_editar'),
     path('detalle/<int:id>/', views.ventas_detalle, name='ventas_detalle'),
@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
+from django.db import transaction
 from django.db.models import Q
 from django.core.exceptions import ValidationError
 from decimal import Decimal
@@ -9,13 +10,25 @@ from .models import Venta, DetalleVenta
 from gestionClientes.models import Cliente
 from gestionProductos.models import Productos
 from gestionUsuarios.models import Usuario
+from djangoPrueba.paginacion import CursorPaginator, CursorInvalido
+from djangoPrueba.fechas import RangoFechas, FechaInvalida
+from djangoPrueba.exportacion import CHUNK_SIZE
+from gestionTareas.tareas import exportar_o_encolar
+from gestionInformes.estadisticas import generacion_de, resumen_por_estado_sin_filtros
+
+def _filtrar_ventas(ventas, estado, cliente, rango):
+    """Filtros del listado de ventas (los usan también las exportaciones)."""
+    if estado:
+        ventas = ventas.filter(estado=estado)
+    
+    if cliente:
+        ventas = ventas.filter(cliente__idCliente=cliente)
+    
+    return rango.filtrar(ventas, 'fecha_venta')
 
 @login_required
 def ventas_list(request):
     """Listado de ventas con filtros y paginación"""
-    from django.core.paginator import Paginator
-    from django.db.models import Sum
-    
     ventas_query = Venta.objects.select_related('cliente', 'usuario').all()
     
     # Obtener parámetros de filtro
@@ -24,33 +37,31 @@ def ventas_list(request):
     fecha_desde = request.GET.get('fecha_desde', '')
     fecha_hasta = request.GET.get('fecha_hasta', '')
     
-    # Aplicar filtros
-    if estado_filtro:
-        ventas_query = ventas_query.filter(estado=estado_filtro)
-    
-    if cliente_filtro:
-        ventas_query = ventas_query.filter(cliente__idCliente=cliente_filtro)
-    
-    if fecha_desde:
-        ventas_query = ventas_query.filter(fecha_venta__date__gte=fecha_desde)
+    # Rango [desde 00:00, día siguiente a hasta 00:00) sobre la columna sin funciones
+    try:
+        rango = RangoFechas(fecha_desde, fecha_hasta)
+    except FechaInvalida as e:
+        messages.error(request, str(e))
+        rango = RangoFechas()
     
-    if fecha_hasta:
-        ventas_query = ventas_query.filter(fecha_venta__date__lte=fecha_hasta)
+    # Aplicar filtros
+    ventas_query = _filtrar_ventas(ventas_query, estado_filtro, cliente_filtro, rango)
     
-    # Calcular estadísticas
-    stats = {
-        'pendientes': Venta.objects.filter(estado='PENDIENTE').count(),
-        'confirmadas': Venta.objects.filter(estado='CONFIRMADA').count(),
-        'canceladas': Venta.objects.filter(estado='CANCELADA').count(),
-        'total': Venta.objects.filter(estado='CONFIRMADA').aggregate(
-            total=Sum('total_con_iva')
-        )['total'] or 0
-    }
+    # Calcular estadísticas (de todas las ventas, desde los contadores)
+    stats = resumen_por_estado_sin_filtros(Venta)
     
-    # Paginación
-    paginator = Paginator(ventas_query, 10)
-    page_number = request.GET.get('page', 1)
-    ventas = paginator.get_page(page_number)
+    # Paginación por cursor sobre (fecha_venta, idVenta)
+    paginator = CursorPaginator(
+        ventas_query, ordering=('-fecha_venta', '-idVenta'), per_page=10, contar=True,
+        clave_version=lambda: generacion_de(Venta),
+    )
+    try:
+        ventas = paginator.page(
+            request.GET.get('cursor'),
+            request.GET.get('direccion', CursorPaginator.SIGUIENTE),
+        )
+    except CursorInvalido:
+        ventas = paginator.page()
     
     # Lista de clientes para el filtro
     clientes = Cliente.objects.all().order_by('nombre', 'apellido')
@@ -67,11 +78,57 @@ def ventas_list(request):
     
     return render(request, 'ventas_list.html', context)
 
+def _ventas_a_exportar(parametros):
+    rango = RangoFechas.desde_request(parametros)
+    return _filtrar_ventas(
+        Venta.objects.all(), parametros.get('estado', ''), parametros.get('cliente', ''), rango
+    )
+
+def exportacion_ventas(parametros):
+    """Encabezados y filas de la exportación de ventas (también la usa la tarea en segundo plano)."""
+    ventas = _ventas_a_exportar(parametros)
+    filas = ventas.order_by('-fecha_venta', '-idVenta').values_list(
+        'idVenta', 'fecha_venta', 'cliente__dni', 'cliente__nombre', 'cliente__apellido',
+        'usuario__user__username', 'metodo_pago', 'estado', 'total', 'iva_total',
+        'total_con_iva', 'observaciones',
+    ).iterator(chunk_size=CHUNK_SIZE)
+    
+    encabezados = [
+        'Venta', 'Fecha', 'DNI cliente', 'Nombre', 'Apellido', 'Usuario', 'Método de pago',
+        'Estado', 'Total', 'IVA', 'Total con IVA', 'Observaciones',
+    ]
+    return encabezados, filas
+
+@login_required
+def ventas_exportar(request):
+    """Exporta las ventas del listado, con los mismos filtros, en CSV (o XLSX)."""
+    return exportar_o_encolar(request, 'ventas', exportacion_ventas)
+
+def exportacion_ventas_detalles(parametros):
+    """Una fila por producto vendido de las ventas filtradas."""
+    ventas = _ventas_a_exportar(parametros)
+    filas = DetalleVenta.objects.filter(venta__in=ventas).order_by(
+        '-venta__fecha_venta', '-venta_id', 'idDetalleVenta'
+    ).values_list(
+        'venta_id', 'venta__fecha_venta', 'venta__estado', 'venta__cliente__dni',
+        'producto__codProducto', 'producto__nombre', 'cantidad', 'precio_unitario',
+        'iva_porcentaje', 'iva_monto', 'subtotal_con_iva', 'observacion',
+    ).iterator(chunk_size=CHUNK_SIZE)
+    
+    encabezados = [
+        'Venta', 'Fecha', 'Estado', 'DNI cliente', 'Código', 'Producto', 'Cantidad',
+        'Precio unitario', 'IVA %', 'IVA', 'Subtotal con IVA', 'Observación',
+    ]
+    return encabezados, filas
+
+@login_required
+def ventas_exportar_detalles(request):
+    """Exporta una fila por producto vendido de las ventas del listado filtrado."""
+    return exportar_o_encolar(request, 'ventas_detalles', exportacion_ventas_detalles)
+
 @login_required
 def ventas_form(request, id=None):
     """Crear o editar venta"""
-    import json
-    
     venta = get_object_or_404(Venta, idVenta=id) if id else None
     
     # Solo se pueden editar ventas pendientes
@@ -98,20 +155,6 @@ def ventas_form(request, id=None):
             except Usuario.DoesNotExist:
                 raise ValidationError('El usuario actual no tiene un perfil de Usuario asociado')
             
-            # Crear o actualizar venta
-            if venta:
-                venta.cliente = cliente
-                venta.metodo_pago = metodo_pago
-                venta.observaciones = observaciones
-                venta.save()
-            else:
-                venta = Venta.objects.create(
-                    cliente=cliente,
-                    usuario=usuario,
-                    metodo_pago=metodo_pago,
-                    observaciones=observaciones
-                )
-            
             # Procesar detalles
             productos_ids = []
             cantidades = []
@@ -129,40 +172,39 @@ def ventas_form(request, id=None):
                 if key.startswith("observacion_"):
                     observaciones_det.append(request.POST[key])
             
-            if not productos_ids:
-                raise ValidationError('Debe agregar al menos un producto')
-            
-            # Eliminar detalles existentes si es edición
-            if venta.idVenta:
-                venta.detalles.all().delete()
-            
-            # Crear nuevos detalles
+            lineas = []
             for i, prod_id in enumerate(productos_ids):
                 if not prod_id:
                     continue
-                
-                producto = get_object_or_404(Productos, idProducto=prod_id)
-                cantidad = int(cantidades[i])
-                precio_unitario = Decimal(precios[i])
-                observacion = observaciones_det[i] if i < len(observaciones_det) else ''
-                
-                # Validar stock disponible
-                if cantidad > producto.stock:
-                    raise ValidationError(
-                        f'Stock insuficiente para {producto.nombre}. '
-                        f'Disponible: {producto.stock}, solicitado: {cantidad}'
+                lineas.append({
+                    'producto_id': prod_id,
+                    'cantidad': int(cantidades[i]),
+                    'precio_unitario': Decimal(precios[i]),
+                    'observacion': observaciones_det[i] if i < len(observaciones_det) else '',
+                })
+            
+            if not lineas:
+                raise ValidationError('Debe agregar al menos un producto')
+            
+            with transaction.atomic():
+                # Crear o actualizar venta
+                if venta:
+                    venta_guardada = venta
+                    venta_guardada.cliente = cliente
+                    venta_guardada.metodo_pago = metodo_pago
+                    venta_guardada.observaciones = observaciones
+                    venta_guardada.save()
+                else:
+                    venta_guardada = Venta.objects.create(
+                        cliente=cliente,
+                        usuario=usuario,
+                        metodo_pago=metodo_pago,
+                        observaciones=observaciones
                     )
                 
-                DetalleVenta.objects.create(
-                    venta=venta,
-                    producto=producto,
-                    cantidad=cantidad,
-                    precio_unitario=precio_unitario,
-                    observacion=observacion
-                )
-            
-            # Recalcular totales
-            venta.calcular_total()
+                # Reemplazar detalles en lote (valida stock y recalcula totales una vez)
+                venta_guardada.reemplazar_detalles(lineas)
+            venta = venta_guardada
             
             messages.success(
                 request, 
@@ -176,19 +218,8 @@ def ventas_form(request, id=None):
             messages.error(request, f'Error al procesar la venta: {str(e)}')
     
     # GET request
+    # Los productos se buscan bajo demanda (productos_buscar); acá solo van los de la venta
     clientes = Cliente.objects.all().order_by('nombre', 'apellido')
-    productos = Productos.objects.filter(stock__gt=0).order_by('nombre')
-    
-    # Preparar productos en formato JSON para JavaScript
-    productos_list = []
-    for prod in productos:
-        productos_list.append({
-            'id': prod.idProducto,
-            'nombre': prod.nombre,
-            'precio': str(prod.precioUnitario),
-            'stock': prod.stock,
-            'iva': str(prod.iva or 0)
-        })
     
     detalles = []
     if venta:
@@ -197,8 +228,6 @@ def ventas_form(request, id=None):
     context = {
         'venta': venta,
         'clientes': clientes,
-        'productos': productos,
-        'productos_json': json.dumps(productos_list),
         'metodos_pago': Venta.METODO_PAGO_CHOICES,
         'detalles': detalles,
     }
@@ -287,7 +316,7 @@ def get_producto_info(request, producto_id):
                 'precio': str(producto.precioUnitario),
                 'stock': producto.stock,
                 'iva': str(producto.iva or 0),
-                'codigo': producto.codigo or '',
+                'codigo': producto.codProducto or '',
             }
         })
     except Productos.DoesNotExist: